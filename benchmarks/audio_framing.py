@@ -0,0 +1,102 @@
+"""
+Compare the audio framing strategies of the Conversation client.
+
+Reports, for each strategy, the time taken to build a frame, the memory allocated
+while building it (measured with tracemalloc, including the returned frame), and the number
+of payload bytes copied per frame, as counted from the code of each strategy.
+
+    python benchmarks/audio_framing.py [--chunk-size 8000] [--frames 20000]
+"""
+
+import argparse
+import tracemalloc
+from array import array
+from timeit import timeit
+
+from common import joined_conversation
+
+from uhlive.stream.conversation import Conversation
+from uhlive.stream.conversation.client import B_JOIN_REF
+
+
+def legacy_send_audio_chunk(conversation: Conversation, chunk: bytes) -> bytes:
+    """The framing code of uhlive <= 2.1."""
+    ref = conversation.request_id.encode("ascii")
+    message = array("B", [0, 1, len(ref), conversation.topic_len, 11, B_JOIN_REF])
+    message.extend(ref)
+    message.extend(conversation.topic_bin)
+    message.extend(b"audio_chunk")
+    message.extend(chunk)
+    return message.tobytes()
+
+
+def allocated(build, samples: int = 100) -> int:
+    """Peak memory allocated by one call of `build`, in bytes (the smallest of `samples` calls)."""
+    tracemalloc.start()
+    try:
+        build()
+        best = None
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            frame = build()
+            peak = tracemalloc.get_traced_memory()[1] - before
+            del frame
+            if best is None or peak < best:
+                best = peak
+        return best or 0
+    finally:
+        tracemalloc.stop()
+
+
+def main(chunk_size: int, frames: int) -> None:
+    conversation = joined_conversation()
+    chunk = bytes(chunk_size)
+    header_size = len(conversation.send_audio_chunk_vectored(chunk)[0])
+    buffer = bytearray(conversation.max_frame_size(chunk_size))
+
+    # (name, callable, bytes copied per frame, as counted from the code)
+    strategies = [
+        # array.extend() copies the whole frame, then tobytes() copies it again.
+        (
+            "legacy array + tobytes",
+            lambda: legacy_send_audio_chunk(conversation, chunk),
+            2 * (header_size + chunk_size),
+        ),
+        # header is built once, then joined with the chunk.
+        (
+            "send_audio_chunk",
+            lambda: conversation.send_audio_chunk(chunk),
+            2 * header_size + chunk_size,
+        ),
+        # the whole frame is written into a preallocated buffer.
+        (
+            "frame_audio_into",
+            lambda: conversation.frame_audio_into(buffer, chunk),
+            header_size + chunk_size,
+        ),
+        # only the header is built, the chunk is handed over as is.
+        (
+            "send_audio_chunk_vectored",
+            lambda: conversation.send_audio_chunk_vectored(chunk),
+            header_size,
+        ),
+    ]
+
+    print(f"chunk size: {chunk_size} bytes, header size: {header_size} bytes")
+    print(
+        f"{'strategy':<28} {'µs/frame':>10} {'allocated/frame':>16} {'copied/frame (analytical)':>26}"
+    )
+    for name, build, copied in strategies:
+        elapsed = timeit(build, number=frames)
+        print(
+            f"{name:<28} {elapsed / frames * 1e6:>10.2f} {allocated(build):>16} {copied:>26}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=8000)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.chunk_size, args.frames)
@@ -0,0 +1,56 @@
+"""
+Compare the throughput of per chunk and batched audio framing.
+
+Frames a whole recording held in memory, as when backfilling recorded calls,
+and reports the number of frames built per second.
+
+    python benchmarks/bulk_framing.py [--seconds 3600] [--audio-codec linear] [--chunk-duration 0.06]
+"""
+
+import argparse
+from time import perf_counter
+
+from common import joined_conversation
+
+from uhlive.stream.audio import bytes_per_second, chunk_size
+from uhlive.stream.conversation import Conversation
+
+
+def per_chunk(conversation: Conversation, audio: bytes, size: int) -> int:
+    frames = 0
+    for i in range(0, len(audio), size):
+        conversation.send_audio_chunk(audio[i : i + size])
+        frames += 1
+    return frames
+
+
+def batched(conversation: Conversation, audio: bytes, size: int) -> int:
+    frames = 0
+    for _ in conversation.send_audio_chunks(audio, size):
+        frames += 1
+    return frames
+
+
+def main(seconds: int, audio_codec: str, chunk_duration: float) -> None:
+    audio = bytes(bytes_per_second(audio_codec) * seconds)
+    size = chunk_size(audio_codec, chunk_duration)
+    print(f"{seconds} s of {audio_codec} audio in chunks of {size} bytes")
+    print(f"{'strategy':<20} {'frames/s':>12}")
+    for name, strategy in [
+        ("send_audio_chunk", per_chunk),
+        ("send_audio_chunks", batched),
+    ]:
+        conversation = joined_conversation()
+        start = perf_counter()
+        frames = strategy(conversation, audio, size)
+        elapsed = perf_counter() - start
+        print(f"{name:<20} {frames / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument("--audio-codec", default="linear")
+    parser.add_argument("--chunk-duration", type=float, default=0.06)
+    args = parser.parse_args()
+    main(args.seconds, args.audio_codec, args.chunk_duration)
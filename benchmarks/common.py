@@ -0,0 +1,26 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import json
+
+from uhlive.stream.conversation import Conversation
+from uhlive.stream.conversation.client import S_JOIN_REF
+
+
+def joined_conversation() -> Conversation:
+    """A `Conversation` that got its join reply, ready to send audio."""
+    conversation = Conversation("customerid", "myconv", "bench")
+    conversation.join()
+    conversation.receive(
+        json.dumps(
+            [
+                S_JOIN_REF,
+                S_JOIN_REF,
+                conversation.topic,
+                "phx_reply",
+                {"status": "ok", "response": {}},
+            ]
+        )
+    )
+    return conversation
@@ -0,0 +1,115 @@
+"""
+Measure the memory retained per conversation event with tracemalloc.
+
+Decodes a stream of final transcript segments and keeps the events in memory,
+as a live dashboard would, with different event representations.
+
+    python benchmarks/event_memory.py [--events 5000] [--words 20]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, List
+
+from uhlive.stream.conversation.client import S_JOIN_REF
+from uhlive.stream.conversation.events import AudioSegmentDecoded, Event
+
+
+class DictSegment(AudioSegmentDecoded):
+    """Same event with a per instance __dict__, as in uhlive <= 2.1."""
+
+
+def segment_message(index: int, words: int) -> str:
+    start = 1760715687595 + index * 10000
+    components = [
+        {
+            "confidence": 0.93,
+            "end": start + 300 * (i + 1),
+            "length": 300,
+            "start": start + 300 * i,
+            "value": f"word{i}",
+        }
+        for i in range(words)
+    ]
+    return json.dumps(
+        [
+            S_JOIN_REF,
+            str(index),
+            "conversation:rtxm@test",
+            "audio_segment_decoded",
+            {
+                "meta": {
+                    "model": "generic.lm11.am17.dicGeneric211206.lmwt10",
+                    "previous_utterance_id": str(index - 1),
+                },
+                "value": " ".join(f"word{i}" for i in range(words)),
+                "components": components,
+                "country": "fr",
+                "start": start,
+                "speaker": "Alice",
+                "client_id": "toto",
+                "lang": "fr",
+                "conversation": "conversation:rtxm@test",
+                "confidence": 0.93,
+                "length": 300 * words,
+                "id": str(index),
+                "campaign_id": "titi",
+                "end": start + 300 * words,
+            },
+        ],
+        ensure_ascii=False,
+    )
+
+
+def legacy(message: List) -> Event:
+    return DictSegment(*message)
+
+
+def slots(message: List) -> Event:
+    return Event.from_message(message)
+
+
+def compact(message: List) -> Event:
+    event = Event.from_message(message)
+    event.compact()
+    return event
+
+
+def compact_extra(message: List) -> Event:
+    event = Event.from_message(message)
+    event.compact(keep_extra=True)
+    return event
+
+
+def measure(messages: List[str], build: Callable[[List], Event]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    events = [build(json.loads(message)) for message in messages]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(events) == len(messages)
+    return retained / len(messages)
+
+
+def main(count: int, words: int) -> None:
+    messages = [segment_message(i, words) for i in range(count)]
+    print(f"{count} segments of {words} words")
+    print(f"{'representation':<24} {'bytes/event':>12}")
+    for name, build in [
+        ("dict (uhlive <= 2.1)", legacy),
+        ("slots", slots),
+        ("compact", compact),
+        ("compact + keep_extra", compact_extra),
+    ]:
+        print(f"{name:<24} {measure(messages, build):>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=20)
+    args = parser.parse_args()
+    main(args.events, args.words)
@@ -0,0 +1,87 @@
+"""
+Compare the available JSON codecs on the test fixtures.
+
+Decodes every conversation and recognition event of the test suite, and encodes
+typical command frames, with each codec installed in the current environment.
+
+    python benchmarks/json_codecs.py [--rounds 20000]
+"""
+
+import argparse
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tests import conversation_events, recog_events  # noqa: E402
+from uhlive.stream.codec import CODECS, JSONCodec, available_codecs  # noqa: E402
+
+COMMANDS = [
+    [
+        "1",
+        "1",
+        "conversation:customerid@myconv",
+        "phx_join",
+        {
+            "readonly": False,
+            "speaker": "john_test",
+            "model": "fr",
+            "country": "fr",
+            "interim_results": True,
+            "rescoring": True,
+            "origin": 1629453934909,
+            "audio_codec": "linear",
+        },
+    ],
+    {
+        "command": "RECOGNIZE",
+        "request_id": 2,
+        "channel_id": "testuie46e4ui6",
+        "headers": {
+            "recognition_mode": "normal",
+            "content_type": "text/uri-list",
+            "start_input_timers": True,
+            "no_input_timeout": 5000,
+            "confidence_threshold": 0.7,
+        },
+        "body": "session:parcel_num",
+    },
+]
+
+
+def messages():
+    stdlib = JSONCodec()
+    found = [
+        stdlib.dumps(value)
+        for value in vars(conversation_events).values()
+        if isinstance(value, list)
+    ]
+    found.extend(
+        value
+        for name, value in vars(recog_events).items()
+        if isinstance(value, str) and not name.startswith("_")
+    )
+    return found
+
+
+def main(rounds: int) -> None:
+    fixtures = messages()
+    print(f"{len(fixtures)} fixtures, {len(COMMANDS)} commands, {rounds} rounds")
+    print(f"{'codec':<10} {'decode µs/msg':>14} {'encode µs/msg':>14}")
+    for name in available_codecs():
+        json_codec = CODECS[name]()
+        decode = timeit(
+            lambda: [json_codec.loads(m) for m in fixtures], number=rounds
+        ) / (rounds * len(fixtures))
+        encode = timeit(
+            lambda: [json_codec.dumps(c) for c in COMMANDS], number=rounds
+        ) / (rounds * len(COMMANDS))
+        print(f"{name:<10} {decode * 1e6:>14.2f} {encode * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,50 @@
+"""
+Compare the formatting of event timestamps.
+
+Formats a sequence of timestamps as found in a transcript, with
+`datetime.fromtimestamp(...).isoformat()`, as `human_datetime` used to do,
+and with the cached `TimestampFormatter`, and reports the time per timestamp.
+
+    python benchmarks/timestamp_format.py [--count 100000] [--step 137] [--repeat 5]
+"""
+
+import argparse
+import timeit
+from datetime import datetime
+
+from uhlive.stream.conversation.human_datetime import TimestampFormatter
+
+
+def main(count: int, step: int, repeat: int) -> None:
+    formatter = TimestampFormatter()
+    tz = formatter.tz
+    timestamps = [1_700_000_000_000 + i * step for i in range(count)]
+
+    def baseline():
+        for ts in timestamps:
+            datetime.fromtimestamp(ts / 1000.0, tz).isoformat(sep=" ")
+
+    def cached():
+        for ts in timestamps:
+            formatter(ts)
+
+    assert [formatter(ts) for ts in timestamps[:1000]] == [
+        datetime.fromtimestamp(ts / 1000.0, tz).isoformat(sep=" ")
+        for ts in timestamps[:1000]
+    ]
+    for name, func in (("isoformat", baseline), ("TimestampFormatter", cached)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(
+            f"{name:>20}: {best * 1000:8.1f} ms, {best / count * 1e9:6.0f} ns/timestamp"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000, help="timestamps")
+    parser.add_argument(
+        "--step", type=int, default=137, help="milliseconds between timestamps"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.count, args.step, args.repeat)
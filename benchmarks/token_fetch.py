@@ -0,0 +1,110 @@
+"""
+Compare the token requests against a local stub server.
+
+Sends a burst of requests from several threads, as after a deploy, with `urllib_fetch`, that opens
+a new connection per request, and with the keep-alive `HTTPTokenClient`, and reports the time per token
+and the number of connections opened. Pass a certificate and its key to measure with TLS,
+where the handshakes cost the most:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -subj /CN=localhost -keyout key.pem -out cert.pem
+    python benchmarks/token_fetch.py [--requests 2000] [--threads 16] [--certfile cert.pem --keyfile key.pem]
+"""
+
+import argparse
+import json
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from uhlive.auth import HTTPTokenClient, urllib_fetch
+
+PAYLOAD = json.dumps(
+    {"access_token": "x" * 1200, "expires_in": 300, "token_type": "Bearer"}
+).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send each response in one write, or Nagle and delayed ACKs stall the kept-alive connections
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            type(self).connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def run(fetch, url, requests, threads):
+    data = {"grant_type": "client_credentials", "client_id": "c", "client_secret": "s"}
+    StubHandler.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for response in executor.map(lambda _: fetch(url, data), range(requests)):
+            assert response["expires_in"] == 300
+    return time.perf_counter() - start, StubHandler.connections
+
+
+def main(
+    requests: int,
+    threads: int,
+    max_connections: int,
+    certfile: Optional[str],
+    keyfile: Optional[str],
+) -> None:
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    scheme = "http"
+    client_context = None
+    if certfile:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+        client_context = ssl._create_unverified_context()
+        # self-signed certificate: used by urllib_fetch
+        ssl._create_default_https_context = ssl._create_unverified_context  # type: ignore
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/realms/bench/protocol/openid-connect/token"
+
+    client = HTTPTokenClient(max_connections, ssl_context=client_context)
+    candidates = [("urllib_fetch", urllib_fetch), ("HTTPTokenClient", client)]
+    for name, fetch in candidates:
+        elapsed, connections = run(fetch, url, requests, threads)
+        print(
+            f"{name:>16}: {elapsed * 1000:8.1f} ms, "
+            f"{elapsed / requests * 1e6:7.0f} µs/token, {connections} connections"
+        )
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--max-connections", type=int, default=4)
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+    main(args.requests, args.threads, args.max_connections, args.certfile, args.keyfile)
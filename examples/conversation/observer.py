@@ -4,7 +4,6 @@ Get the events of an ongoing conversation.
 
 import argparse
 import os
-from time import time
 
 import requests
 import websocket as ws  # type: ignore
@@ -34,19 +33,21 @@ client = Conversation(uhlive_client, args.conversation_id, "observer")
 socket.send(client.join(readonly=True))
 
 print("Listening to events")
-last_ping = time()
+heartbeat = client.heartbeat
 try:
     while True:
-        # As we don't stream audio, we need to regularly ping the server to keep the connection open
-        if time() - last_ping > 15:
-            socket.ping()
-            last_ping = time()
+        # As we don't stream audio, we need to send heartbeats to keep the connection open
+        if heartbeat.expired():
+            print("Connection lost")
+            break
+        if heartbeat.due():
+            socket.send(heartbeat.beat())
+        socket.settimeout(heartbeat.delay())
         try:
             event = client.receive(socket.recv())
         except WebSocketTimeoutException:
-            print("Silence")
             continue
-        if isinstance(event, Ok):
+        if event is None or isinstance(event, Ok):
             continue
         else:
             print(event)
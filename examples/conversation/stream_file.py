@@ -12,6 +12,7 @@ import websocket as ws  # type: ignore
 from websocket import WebSocketTimeoutException  # type: ignore
 
 from uhlive.auth import build_authentication_request
+from uhlive.stream.audio import Pacer, chunk_size
 from uhlive.stream.conversation import Conversation, Ok, build_conversation_url
 
 
@@ -21,19 +22,20 @@ class AudioSender(Thread):
         self.socket = socket
         self.client = client
         self.audio_file = audio_file
-        self.chunk_size = 4000 if codec.startswith("g711") else 8000
+        self.chunk_size = chunk_size(codec, 0.5)
+        self.pacer = Pacer(codec)
 
     def run(self):
         print(f"Streaming file in realtime: {self.audio_file} for transcription!")
         with open(self.audio_file, "rb") as audio_file:
-            while True:
-                audio_chunk = audio_file.read(self.chunk_size)
-                if not audio_chunk:
-                    break
+            chunks = iter(lambda: audio_file.read(self.chunk_size), b"")
+            for audio_chunk in self.pacer.paced(chunks):
                 self.socket.send_binary(self.client.send_audio_chunk(audio_chunk))
-                time.sleep(0.5)
 
-        print(f"File {self.audio_file} successfully streamed")
+        print(
+            f"File {self.audio_file} successfully streamed,",
+            f"max lag {self.pacer.max_lag:.3f}s, {self.pacer.late_chunks} late chunks",
+        )
         self.socket.send(self.client.leave())
 
 
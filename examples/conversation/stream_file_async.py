@@ -4,21 +4,30 @@ import time
 from aiohttp import ClientSession  # type: ignore
 
 from uhlive.auth import build_authentication_request
-from uhlive.stream.conversation import Conversation, Ok, build_conversation_url
+from uhlive.stream.audio import chunk_size
+from uhlive.stream.conversation import (
+    AsyncBackfill,
+    Conversation,
+    Ok,
+    build_conversation_url,
+)
+from uhlive.stream.conversation.aio import AsyncConversation
+from uhlive.stream.transport import AiohttpTransport
 
 
-async def stream_file(audio_path, socket, client, codec):
-    chunk_size = 4000 if codec.startswith("g711") else 8000
+async def stream_file(audio_path, client, codec, backfill):
+    size = chunk_size(codec, 0.5)
     with open(audio_path, "rb") as audio_file:
-        while True:
-            audio_chunk = audio_file.read(chunk_size)
-            if not audio_chunk:
-                break
-            # audio is sent as binary frames
-            await socket.send_bytes(client.send_audio_chunk(audio_chunk))
-            await asyncio.sleep(0.5)  # Simulate real time audio
-    print(f"File {audio_path} successfully streamed")
-    await socket.send_str(client.leave())
+        chunks = iter(lambda: audio_file.read(size), b"")
+        async for audio_chunk in backfill.paced(chunks):
+            await client.send_audio(audio_chunk)
+    pacer = backfill.pacer
+    print(
+        f"File {audio_path} successfully streamed,",
+        f"max lag {pacer.max_lag:.3f}s, {pacer.late_chunks} late chunks,",
+        f"waited {backfill.waits} times for the transcription",
+    )
+    await client.leave()
 
 
 async def main(uhlive_client, uhlive_secret, cmdline_args):
@@ -32,44 +41,44 @@ async def main(uhlive_client, uhlive_secret, cmdline_args):
             uhlive_token = body["access_token"]
 
         async with session.ws_connect(build_conversation_url(uhlive_token)) as socket:
-            client = Conversation(uhlive_client, cmdline_args.conversation_id, "Alice")
-            # shortcut
-            await socket.send_str(
-                client.join(
+            conversation = Conversation(
+                uhlive_client, cmdline_args.conversation_id, "Alice"
+            )
+            async with AsyncConversation(
+                AiohttpTransport(socket), conversation
+            ) as client:
+                join = time.time()
+                origin = int(join * 1000)
+                reply = await client.join(
                     model=cmdline_args.model,
                     interim_results=cmdline_args.interim_results,
                     rescoring=cmdline_args.rescoring,
-                    origin=int(time.time() * 1000),
+                    origin=origin,
                     country=cmdline_args.country,
                     audio_codec=cmdline_args.codec,
                 )
-            )
-            join = time.time()
-            # check we didn't get an error on join
-            msg = await socket.receive()
-            print(
-                "join resp =",
-                client.receive(msg.data),
-                "in",
-                time.time() - join,
-                "seconds",
-            )
+                print("join resp =", reply, "in", time.time() - join, "seconds")
 
-            streamer = asyncio.create_task(
-                stream_file(cmdline_args.audio_file, socket, client, cmdline_args.codec)
-            )
-            print("Listening…")
-            try:
-                while True:
-                    msg = await socket.receive()
-                    event = client.receive(msg.data)
-                    if client.left:
-                        break
-                    if not isinstance(event, Ok):
-                        print(event)
-            finally:
-                streamer.cancel()
-                await streamer
+                # Real time by default, to simulate live audio, or faster
+                # as far as the transcription keeps up
+                backfill = AsyncBackfill(
+                    cmdline_args.codec, speed=cmdline_args.speed, origin=origin
+                )
+                streamer = asyncio.create_task(
+                    stream_file(
+                        cmdline_args.audio_file, client, cmdline_args.codec, backfill
+                    )
+                )
+                print("Listening…")
+                try:
+                    # The iteration stops when we have left the conversation
+                    async for event in client:
+                        backfill.observe(event)
+                        if not isinstance(event, Ok):
+                            print(event)
+                finally:
+                    streamer.cancel()
+                print(client.metrics)
 
 
 if __name__ == "__main__":
@@ -90,6 +99,12 @@ if __name__ == "__main__":
         action="store_false",
     )
     parser.add_argument("--without_rescoring", dest="rescoring", action="store_false")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1,
+        help="streaming speed, relative to real time (0 for as fast as possible)",
+    )
     parser.add_argument("--user", dest="user_id", default="")
     parser.add_argument("--password", dest="user_pwd", default="")
 
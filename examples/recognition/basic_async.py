@@ -4,6 +4,7 @@ import os
 from aiohttp import ClientSession  # type: ignore
 
 from uhlive.auth import build_authentication_request
+from uhlive.stream.audio import AsyncPacer
 from uhlive.stream.recognition import (
     Closed,
 )
@@ -21,23 +22,20 @@ from uhlive.stream.recognition import (
 
 
 async def stream(socket, client, audio_files):
+    pacer = AsyncPacer("linear")
     try:
         for audio in audio_files:
             print(f"Streaming file in realtime: {audio} for transcription!")
-            audio_file = open(audio, "rb")
-            while True:
-                audio_chunk = audio_file.read(960)
-                if not audio_chunk:
-                    break
-                await socket.send_bytes(client.send_audio_chunk(audio_chunk))
-                await asyncio.sleep(0.06)
+            with open(audio, "rb") as audio_file:
+                chunks = iter(lambda: audio_file.read(960), b"")
+                async for audio_chunk in pacer.paced(chunks):
+                    await socket.send_bytes(client.send_audio_chunk(audio_chunk))
 
             print(f"File {audio} successfully streamed")
-            audio_file.close()
         # stream silence
         while True:
+            await pacer.wait(bytes(960))
             await socket.send_bytes(client.send_audio_chunk(bytes(960)))
-            await asyncio.sleep(0.06)
     except asyncio.CancelledError:
         pass
 
@@ -7,6 +7,7 @@ import requests
 import websocket as ws  # type: ignore
 
 from uhlive.auth import build_authentication_request
+from uhlive.stream.audio import Pacer
 from uhlive.stream.recognition import (
     Closed,
 )
@@ -42,6 +43,7 @@ class AudioStreamer(Thread):
         self._suspended = False
         self._chunk_size = 960
         self._silence = init_bytes(self._chunk_size, 0)
+        self._pacers = {codec: Pacer(codec) for codec in CODEC_HINTS}
 
     def stop(self):
         self._should_stop = True
@@ -63,26 +65,27 @@ class AudioStreamer(Thread):
                 continue
             self.socket.send_binary(self.client.send_audio_chunk(self._silence))
             try:
-                audio = self.fileq.get(timeout=0.06)
+                audio, codec = self.fileq.get(timeout=0.06)
             except Empty:
                 continue
             self._should_skip = False
+            self._chunk_size, silence_value = CODEC_HINTS[codec]
+            self._silence = init_bytes(self._chunk_size, silence_value)
+            pacer = self._pacers[codec]
+            pacer.reset()
             if self.verbose:
                 print(f"Streaming file in realtime: {audio} for transcription!")
             with open(audio, "rb") as audio_file:
-                while not (self._should_skip or self._suspended):
-                    audio_chunk = audio_file.read(self._chunk_size)
-                    if not audio_chunk:
+                chunks = iter(lambda: audio_file.read(self._chunk_size), b"")
+                for audio_chunk in pacer.paced(chunks):
+                    if self._should_skip or self._suspended:
                         break
                     self.socket.send_binary(self.client.send_audio_chunk(audio_chunk))
-                    time.sleep(0.06)
             if self.verbose:
                 print(f"File {audio} successfully streamed")
 
     def play(self, filename, codec="linear"):
-        self._chunk_size, silence_value = CODEC_HINTS[codec]
-        self._silence = init_bytes(self._chunk_size, silence_value)
-        self.fileq.put_nowait(filename)
+        self.fileq.put_nowait((filename, codec))
 
 
 def main(socket: ws.WebSocket, client: Recognizer, stream: AudioStreamer):
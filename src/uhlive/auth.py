@@ -2,8 +2,18 @@
 Authentication helpers
 """
 
+import asyncio
+import http.client
+import json
 import os
-from typing import Dict, Tuple
+import ssl
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
 
 SERVER = os.getenv("UHLIVE_AUTH_SERVER", "id.uh.live")
 REALM = os.getenv("UHLIVE_AUTH_REALM", "uhlive")
@@ -34,3 +44,355 @@ def build_authentication_request(
         data["username"] = user_id
         data["password"] = user_pwd
     return url, data
+
+
+DEFAULT_EXPIRES_IN = 300.0
+"""Token lifetime assumed when the server doesn't tell, in seconds."""
+
+# Fetch functions take the URL and the form of the token request
+# and return the decoded JSON response.
+Fetch = Callable[[str, Dict[str, str]], Dict[str, Any]]
+AsyncFetch = Callable[[str, Dict[str, str]], Awaitable[Dict[str, Any]]]
+
+
+class AuthenticationError(Exception):
+    """The authentication server refused to deliver a token."""
+
+    def __init__(self, status: int, body: str) -> None:
+        self.status = status
+        """The HTTP status code."""
+        self.body = body
+        """The response body."""
+        super().__init__(f"Authentication failed ({status}): {body}")
+
+
+def urllib_fetch(url: str, data: Dict[str, str]) -> Dict[str, Any]:
+    """Post a token request with `urllib`.
+
+    Raises:
+        AuthenticationError: if the server refused.
+    """
+    request = urllib.request.Request(
+        url, data=urlencode(data).encode("ascii"), method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise AuthenticationError(e.code, e.read().decode("utf-8", "replace"))
+
+
+# Errors on a reused connection that the server may have closed in the meantime.
+_STALE_CONNECTION = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class HTTPTokenClient:
+    """Token request client that keeps its connections open between requests.
+
+    After a deploy, thousands of sessions may need a token at the same time: instead of a new
+    TCP and TLS handshake for each, the requests are queued on at most `max_connections`
+    persistent connections per server. Connections closed by the server are reopened transparently.
+
+    Only uses the standard library. It is the default `fetch` of [`TokenProvider`][uhlive.auth.TokenProvider],
+    and can also be used directly:
+
+    ```python
+    tokens = HTTPTokenClient()
+    uhlive_token = tokens.fetch(uhlive_client, uhlive_secret)["access_token"]
+    ```
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        timeout: float = 10.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """Create a client.
+
+        Args:
+            max_connections: the maximum number of simultaneous connections per server.
+            timeout: the connection and response timeout, in seconds.
+            ssl_context: for HTTPS connections, defaults to `ssl.create_default_context()`.
+        """
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str], Deque[http.client.HTTPConnection]] = {}
+        self._slots: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self.connections_opened = 0
+        """The number of connections opened so far."""
+
+    def fetch(
+        self, client_id: str, client_secret: str, user_id: str = "", user_pwd: str = ""
+    ) -> Dict[str, Any]:
+        """Request a token, see [build_authentication_request][uhlive.auth.build_authentication_request] for the arguments.
+
+        Returns:
+            The decoded response, with the `access_token` and its `expires_in`.
+
+        Raises:
+            AuthenticationError: if the server refused.
+        """
+        return self(
+            *build_authentication_request(client_id, client_secret, user_id, user_pwd)
+        )
+
+    def __call__(self, url: str, data: Dict[str, str]) -> Dict[str, Any]:
+        """Post a token request, as [`urllib_fetch`][uhlive.auth.urllib_fetch].
+
+        Thread safe.
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        body = urlencode(data).encode("ascii")
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+        with self._slot(key):
+            connection, reused = self._acquire(key)
+            try:
+                try:
+                    status, payload, will_close = self._post(
+                        connection, path, body, headers
+                    )
+                except _STALE_CONNECTION:
+                    if not reused:
+                        raise
+                    # closed by the server while idle: retry once on a new connection
+                    connection.close()
+                    connection, _ = self._connect(key)
+                    status, payload, will_close = self._post(
+                        connection, path, body, headers
+                    )
+            except BaseException:
+                connection.close()
+                raise
+            if will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+        if status != 200:
+            raise AuthenticationError(status, payload.decode("utf-8", "replace"))
+        return json.loads(payload)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self._lock:
+            idle = [c for connections in self._idle.values() for c in connections]
+            self._idle.clear()
+        for connection in idle:
+            connection.close()
+
+    def _slot(self, key: Tuple[str, str]) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(
+                    self.max_connections
+                )
+            return slot
+
+    def _acquire(self, key: Tuple[str, str]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key)
+
+    def _release(
+        self, key: Tuple[str, str], connection: http.client.HTTPConnection
+    ) -> None:
+        with self._lock:
+            self._idle.setdefault(key, deque()).append(connection)
+
+    def _connect(self, key: Tuple[str, str]) -> Tuple[http.client.HTTPConnection, bool]:
+        scheme, netloc = key
+        connection: http.client.HTTPConnection
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(
+                netloc,
+                timeout=self.timeout,
+                context=self.ssl_context or ssl.create_default_context(),
+            )
+        else:
+            connection = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return connection, False
+
+    @staticmethod
+    def _post(
+        connection: http.client.HTTPConnection,
+        path: str,
+        body: bytes,
+        headers: Dict[str, str],
+    ) -> Tuple[int, bytes, bool]:
+        connection.request("POST", path, body, headers)
+        response = connection.getresponse()
+        # the body must be read entirely before the connection can be reused
+        payload = response.read()
+        return response.status, payload, response.will_close
+
+
+class _Token(NamedTuple):
+    access_token: str
+    refresh_at: float
+    expires_at: float
+
+
+class TokenProvider:
+    """Cache of API access tokens.
+
+    Tokens are kept until `refresh_margin` seconds before they expire, according to the `expires_in` field
+    of the server response. Then, the first caller fetches a new one while the others keep getting the current one.
+    Once a token has expired, the callers wait for a single request to the server, whatever their number:
+    in threads, with [`get`][uhlive.auth.TokenProvider.get], and in asyncio tasks, with
+    [`aget`][uhlive.auth.TokenProvider.aget].
+
+    Tokens are cached by client id (and user id, for password grants), so one provider can serve several accounts.
+
+    Example:
+        ```python
+        tokens = TokenProvider()
+        # for every new connection
+        uhlive_token = tokens.get(uhlive_client, uhlive_secret)
+        ```
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Fetch] = None,
+        afetch: Optional[AsyncFetch] = None,
+        refresh_margin: float = 30.0,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Create a token cache.
+
+        Args:
+            fetch: function that posts a token request and returns the decoded response,
+                   like [`urllib_fetch`][uhlive.auth.urllib_fetch]. Defaults to a new
+                   keep-alive [`HTTPTokenClient`][uhlive.auth.HTTPTokenClient].
+            afetch: coroutine function that does the same for asyncio. By default, `fetch` is run in the
+                    default executor.
+            refresh_margin: how long before expiration a token is renewed, in seconds.
+            clock: the time source, in seconds.
+        """
+        self._fetch = fetch or HTTPTokenClient()
+        self._afetch = afetch
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._tokens: Dict[Tuple[str, str], _Token] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._refreshing: Dict[Tuple[str, str], "asyncio.Task[_Token]"] = {}
+
+    def get(
+        self, client_id: str, client_secret: str, user_id: str = "", user_pwd: str = ""
+    ) -> str:
+        """Get a valid access token, see [build_authentication_request][uhlive.auth.build_authentication_request] for the arguments.
+
+        Thread safe.
+
+        Raises:
+            AuthenticationError: if the server refused.
+        """
+        key = (client_id, user_id)
+        token = self._tokens.get(key)
+        now = self._clock()
+        if token is not None and now < token.refresh_at:
+            return token.access_token
+        lock = self._lock(key)
+        if token is not None and now < token.expires_at:
+            # Still valid: let a single thread renew it.
+            if not lock.acquire(blocking=False):
+                return token.access_token
+        else:
+            lock.acquire()
+        try:
+            token = self._tokens.get(key)
+            if token is not None and self._clock() < token.refresh_at:
+                # renewed by another thread while we were waiting
+                return token.access_token
+            url, data = build_authentication_request(
+                client_id, client_secret, user_id, user_pwd
+            )
+            return self._store(key, self._fetch(url, data)).access_token
+        finally:
+            lock.release()
+
+    async def aget(
+        self, client_id: str, client_secret: str, user_id: str = "", user_pwd: str = ""
+    ) -> str:
+        """Get a valid access token, see [build_authentication_request][uhlive.auth.build_authentication_request] for the arguments.
+
+        Concurrent tasks share the same request to the server.
+
+        Raises:
+            AuthenticationError: if the server refused.
+        """
+        key = (client_id, user_id)
+        token = self._tokens.get(key)
+        now = self._clock()
+        if token is not None and now < token.refresh_at:
+            return token.access_token
+        task = self._refreshing.get(key)
+        if task is None:
+            url, data = build_authentication_request(
+                client_id, client_secret, user_id, user_pwd
+            )
+            task = asyncio.ensure_future(self._arefresh(key, url, data))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda t: self._refresh_done(key, t))
+        if token is not None and now < token.expires_at:
+            # Still valid: renew in the background.
+            return token.access_token
+        return (await asyncio.shield(task)).access_token
+
+    def invalidate(self, client_id: str, user_id: str = "") -> None:
+        """Forget the token of a client, for example if the API rejected it."""
+        self._tokens.pop((client_id, user_id), None)
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _store(self, key: Tuple[str, str], response: Dict[str, Any]) -> _Token:
+        now = self._clock()
+        expires_in = float(response.get("expires_in") or DEFAULT_EXPIRES_IN)
+        token = _Token(
+            response["access_token"],
+            now + max(0.0, expires_in - self.refresh_margin),
+            now + expires_in,
+        )
+        self._tokens[key] = token
+        return token
+
+    async def _arefresh(
+        self, key: Tuple[str, str], url: str, data: Dict[str, str]
+    ) -> _Token:
+        if self._afetch is not None:
+            response = await self._afetch(url, data)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, self._fetch, url, data)
+        return self._store(key, response)
+
+    def _refresh_done(self, key: Tuple[str, str], task: "asyncio.Task[_Token]") -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if not task.cancelled():
+            # Background renewals may have nobody to report the error to.
+            task.exception()
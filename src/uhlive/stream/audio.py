@@ -0,0 +1,220 @@
+"""
+Audio helpers shared by the Conversation and Recognition APIs.
+
+Both APIs accept the same speech audio codecs, all sampled at 8khz:
+
+- `"linear"`: linear 16 bit SLE raw PCM audio;
+- `"g711a"`: G711 a-law audio;
+- `"g711u"`: G711 μ-law audio.
+
+To stream recorded audio as if it were live, pace the chunks with a
+[`Pacer`][uhlive.stream.audio.Pacer] (or an [`AsyncPacer`][uhlive.stream.audio.AsyncPacer]).
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional
+
+SAMPLE_RATE = 8000
+"""Sample rate of all supported codecs, in Hz."""
+
+SAMPLE_WIDTH = {"linear": 2, "g711a": 1, "g711u": 1}
+"""Size of one sample in bytes, by codec name."""
+
+
+def bytes_per_second(audio_codec: str) -> int:
+    """Number of bytes of audio data per second of speech for the given codec.
+
+    Raises:
+        ValueError: if the codec is unknown.
+    """
+    try:
+        return SAMPLE_RATE * SAMPLE_WIDTH[audio_codec]
+    except KeyError:
+        raise ValueError(f"Unknown audio codec '{audio_codec}'") from None
+
+
+def chunk_size(audio_codec: str, duration: float = 0.5) -> int:
+    """Size in bytes of an audio chunk of `duration` seconds for the given codec.
+
+    The result is always a whole number of samples.
+
+    Raises:
+        ValueError: if the codec is unknown.
+    """
+    rate = bytes_per_second(audio_codec)
+    width = SAMPLE_WIDTH[audio_codec]
+    return int(rate * duration) // width * width
+
+
+class _Schedule:
+    """The deadlines of the audio chunks, shared by the sync and async pacers."""
+
+    def __init__(
+        self,
+        audio_codec: str = "linear",
+        speed: Optional[float] = 1.0,
+        resync_after: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.bytes_per_second = bytes_per_second(audio_codec)
+        self.speed = speed
+        self.resync_after = resync_after
+        self._clock = clock
+        self._start: Optional[float] = None
+        self._position = 0
+        self.chunks = 0
+        """The number of chunks paced."""
+        self.late_chunks = 0
+        """The number of chunks that were already late when their turn came."""
+        self.lag = 0.0
+        """How late the last chunk was, in seconds."""
+        self.max_lag = 0.0
+        """The highest lag so far, in seconds."""
+        self.resyncs = 0
+        """The number of times the schedule was restarted because the lag exceeded `resync_after`."""
+
+    @property
+    def audio_time(self) -> float:
+        """The duration of the audio paced since the last (re)start, in seconds of speech."""
+        return self._position / self.bytes_per_second
+
+    def reset(self) -> None:
+        """Restart the schedule at the next chunk, after a pause for example.
+
+        The metrics are kept.
+        """
+        self._start = None
+        self._position = 0
+
+    def delay(self, size: int) -> float:
+        """Schedule a chunk of `size` bytes.
+
+        This is the sans-io core of the pacers: call it before sending each chunk and wait
+        the returned number of seconds.
+
+        Returns:
+            How long to wait before sending the chunk, in seconds: 0 if it is late.
+        """
+        speed = self.speed
+        if not speed:
+            self._position += size
+            self.chunks += 1
+            return 0.0
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+        # The deadline is computed from the total audio size, not by adding up the chunk
+        # durations or the sleeps, so that neither rounding nor the time spent sending accumulate.
+        delay = self._start + self._position / (self.bytes_per_second * speed) - now
+        if delay < 0:
+            self.lag = -delay
+            self.late_chunks += 1
+            if self.lag > self.max_lag:
+                self.max_lag = self.lag
+            if self.resync_after is not None and self.lag > self.resync_after:
+                # Too late to catch up: start again from now rather than bursting.
+                self.resyncs += 1
+                self._start = now
+                self._position = 0
+            delay = 0.0
+        else:
+            self.lag = 0.0
+        self._position += size
+        self.chunks += 1
+        return delay
+
+
+class Pacer(_Schedule):
+    """Pace audio chunks at real time, to stream recorded audio as if it were live.
+
+    Each chunk is due when all the audio sent before it has been played: the deadlines are
+    computed from the start time and the audio size, using the byte rate of the codec.
+    So the stream does not drift, whatever the time spent sending. If a chunk is late,
+    it is sent at once, and the next ones too until the stream has caught up, unless the
+    lag exceeds `resync_after`.
+
+    To stream faster than real time, for a backfill for example, set a `speed` factor.
+
+    Example:
+        ```python
+        pacer = Pacer("g711a")
+        with open(audio_path, "rb") as audio_file:
+            for chunk in pacer.paced(iter(lambda: audio_file.read(4000), b"")):
+                socket.send_binary(client.send_audio_chunk(chunk))
+        print(f"max lag: {pacer.max_lag:.3f}s, {pacer.late_chunks} late chunks")
+        ```
+    """
+
+    def __init__(
+        self,
+        audio_codec: str = "linear",
+        speed: Optional[float] = 1.0,
+        resync_after: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a pacer.
+
+        Args:
+            audio_codec: the codec of the audio, see the module documentation.
+            speed: how many times faster than real time to stream; `None` or `0` for no limit.
+            resync_after: if a chunk is late by more than that, in seconds, restart the schedule
+                     instead of catching up.
+            clock: the monotonic time source, in seconds.
+            sleep: the function to wait, in seconds.
+
+        Raises:
+            ValueError: if the codec is unknown.
+        """
+        super().__init__(audio_codec, speed, resync_after, clock)
+        self._sleep = sleep
+
+    def wait(self, chunk: bytes) -> None:
+        """Wait until it is time to send `chunk`."""
+        delay = self.delay(len(chunk))
+        if delay > 0:
+            self._sleep(delay)
+
+    def paced(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Yield the chunks, each when it is time to send it."""
+        for chunk in chunks:
+            self.wait(chunk)
+            yield chunk
+
+
+class AsyncPacer(_Schedule):
+    """The asyncio version of [`Pacer`][uhlive.stream.audio.Pacer].
+
+    Example:
+        ```python
+        pacer = AsyncPacer("linear")
+        with open(audio_path, "rb") as audio_file:
+            async for chunk in pacer.paced(iter(lambda: audio_file.read(8000), b"")):
+                await client.send_audio(chunk)
+        ```
+    """
+
+    def __init__(
+        self,
+        audio_codec: str = "linear",
+        speed: Optional[float] = 1.0,
+        resync_after: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Create a pacer, see [`Pacer`][uhlive.stream.audio.Pacer] for the arguments."""
+        super().__init__(audio_codec, speed, resync_after, clock)
+        self._sleep = sleep
+
+    async def wait(self, chunk: bytes) -> None:
+        """Wait until it is time to send `chunk`."""
+        delay = self.delay(len(chunk))
+        if delay > 0:
+            await self._sleep(delay)
+
+    async def paced(self, chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+        """Yield the chunks, each when it is time to send it."""
+        for chunk in chunks:
+            await self.wait(chunk)
+            yield chunk
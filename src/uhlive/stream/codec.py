@@ -0,0 +1,215 @@
+"""
+Pluggable JSON codec used to encode and decode the API messages.
+
+By default, the `json` module of the standard library is used. You can select a faster library,
+[orjson](https://github.com/ijl/orjson), [msgspec](https://jcristharif.com/msgspec/) or
+[ujson](https://github.com/ultrajson/ultrajson), by name with the `UHLIVE_JSON_CODEC` environment variable,
+or at runtime, where `set_codec()` without argument picks the fastest one installed:
+
+```python
+from uhlive.stream import codec
+
+codec.set_codec("orjson")
+```
+
+Whatever the codec, the messages sent to the server are byte-identical to the compact
+`json.dumps(..., ensure_ascii=False, separators=(",", ":"))` output: the values that some libraries
+would format differently (floats in exponent notation, non finite floats, integers that don't fit in 64 bits,
+non string keys and strings with lone surrogates) are encoded by the standard library instead.
+Likewise, the documents that some libraries refuse to decode (non finite floats, for example) are decoded
+by the standard library. However, orjson and msgspec decode the integers that don't fit in 64 bits as floats,
+which is why they are not the default: the server doesn't send such integers, but only opt in if you can tell.
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+class JSONCodec:
+    """Base class of JSON codecs, backed by the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> str:
+        """Encode `obj` as compact JSON."""
+        return json.dumps(obj, ensure_ascii=False, indent=None, separators=(",", ":"))
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a JSON document."""
+        return json.loads(data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+def _unencodable(text: str) -> bool:
+    """Does `text` contain lone surrogates, that third party libraries refuse to encode?"""
+    if text.isascii():
+        return False
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def _stdlib_only(obj: Any) -> bool:
+    """Does `obj` contain values that third party libraries may encode differently?"""
+    if isinstance(obj, str):
+        return _unencodable(obj)
+    if obj is None or obj is True or obj is False:
+        return False
+    if isinstance(obj, dict):
+        return any(
+            type(k) is not str or _unencodable(k) or _stdlib_only(v)
+            for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple)):
+        return any(_stdlib_only(v) for v in obj)
+    if isinstance(obj, float):
+        return not math.isfinite(obj) or "e" in repr(obj)
+    if isinstance(obj, int):
+        return not -(2**63) <= obj < 2**63
+    return True
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by orjson."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._error = orjson.JSONDecodeError
+
+    def dumps(self, obj: Any) -> str:
+        if _stdlib_only(obj):
+            return super().dumps(obj)
+        return self._dumps(obj).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._loads(data)
+        except self._error:
+            return super().loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """Codec backed by msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec  # type: ignore
+
+        self._encode = msgspec.json.Encoder().encode
+        self._decode = msgspec.json.Decoder().decode
+        self._error = msgspec.DecodeError
+
+    def dumps(self, obj: Any) -> str:
+        if _stdlib_only(obj):
+            return super().dumps(obj)
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._decode(data)
+        except self._error:
+            return super().loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec backed by ujson."""
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson  # type: ignore
+
+        self._dumps = ujson.dumps
+        self._loads = ujson.loads
+
+    def dumps(self, obj: Any) -> str:
+        if _stdlib_only(obj):
+            return super().dumps(obj)
+        return self._dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+CODECS: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+"""Known codecs by name, by order of preference."""
+
+
+def available_codecs() -> List[str]:
+    """Names of the codecs that can be used in this environment."""
+    names = []
+    for name, factory in CODECS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+_codec: JSONCodec = JSONCodec()
+
+
+def get_codec() -> JSONCodec:
+    """The codec currently in use."""
+    return _codec
+
+
+def set_codec(codec: Optional[Union[str, JSONCodec]] = None) -> JSONCodec:
+    """Change the codec used to encode and decode the messages.
+
+    Args:
+        codec: a codec name from `CODECS`, a `JSONCodec` instance, or `None` to
+               pick the fastest one available.
+
+    Returns:
+        The codec now in use.
+
+    Raises:
+        ValueError: if the codec name is unknown.
+        ImportError: if the library backing the codec is not installed.
+    """
+    global _codec
+    if codec is None:
+        codec = available_codecs()[0]
+    if isinstance(codec, str):
+        try:
+            factory = CODECS[codec]
+        except KeyError:
+            raise ValueError(f"Unknown JSON codec '{codec}'") from None
+        codec = factory()
+    _codec = codec
+    return codec
+
+
+def dumps(obj: Any) -> str:
+    """Encode `obj` as compact JSON with the current codec."""
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document with the current codec."""
+    return _codec.loads(data)
+
+
+set_codec(os.getenv("UHLIVE_JSON_CODEC") or "json")
@@ -77,13 +77,23 @@ async def main(uhlive_client, uhlive_secret):
 As you can see, the I/O is cleanly decoupled from the protocol handling: the `Conversation` object is only used
 to create the messages to send to the API and to decode the received messages as `Event` objects.
 
+Several conversations can share the same connection thanks to a [`ConversationMux`][uhlive.stream.conversation.ConversationMux],
+that routes the received messages to the right `Conversation`.
+
+To transcribe recordings faster than real time, pace the audio with a [`Backfill`][uhlive.stream.conversation.Backfill].
+
+If you don't stream audio, send a [heartbeat][uhlive.stream.conversation.Heartbeat] regularly to keep the connection open.
+
 See the [complete examples in the source distribution](https://github.com/uhlive/python-sdk/tree/main/examples/conversation).
 """
 
 import os
 from urllib.parse import urljoin
 
+from .backfill import AsyncBackfill, Backfill
+from .buffers import FrameBufferPool
 from .client import Conversation, ProtocolError
+from .entities import EntityStore
 from .events import (
     AudioSegmentDecoded,
     AudioSpeechDecoded,
@@ -99,7 +109,14 @@ from .events import (
     TagsSet,
     Unknown,
     Word,
+    WordColumns,
+    register_event,
 )
+from .heartbeat import Heartbeat
+from .interim import HypothesisDiff, InterimCoalescer
+from .mux import ConversationMux
+from .timeline import TimelineIndex
+from .transcript import TranscriptBuffer
 
 SERVER = os.getenv("UHLIVE_API_URL", "wss://api.uh.live")
 
@@ -113,15 +130,25 @@ def build_conversation_url(token: str) -> str:
 
 __all__ = [
     "build_conversation_url",
+    "register_event",
+    "AsyncBackfill",
     "AudioSegmentDecoded",
     "AudioSpeechDecoded",
     "AudioWordsDecoded",
+    "Backfill",
     "Conversation",
+    "ConversationMux",
+    "FrameBufferPool",
     "ProtocolError",
     "SpeakerJoined",
     "Word",
+    "WordColumns",
     "EntityRecognized",
+    "EntityStore",
     "Event",
+    "Heartbeat",
+    "HypothesisDiff",
+    "InterimCoalescer",
     "Ok",
     "EntityReference",
     "RelationRecognized",
@@ -129,4 +156,6 @@ __all__ = [
     "Unknown",
     "Tag",
     "TagsSet",
+    "TimelineIndex",
+    "TranscriptBuffer",
 ]
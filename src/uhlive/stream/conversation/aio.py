@@ -0,0 +1,396 @@
+"""
+Asyncio client for the Conversation API.
+
+[`AsyncConversation`][uhlive.stream.conversation.aio.AsyncConversation] runs the I/O of a
+[`Conversation`][uhlive.stream.conversation.Conversation] over any websocket library,
+through a [`Transport`][uhlive.stream.transport.Transport] adapter:
+
+```python
+from uhlive.stream.conversation import Conversation
+from uhlive.stream.conversation.aio import AsyncConversation
+from uhlive.stream.transport import AiohttpTransport
+
+async with session.ws_connect(build_conversation_url(token)) as socket:
+    conversation = Conversation(identifier, conversation_id, "Alice")
+    async with AsyncConversation(AiohttpTransport(socket), conversation) as client:
+        await client.join(model="fr", country="fr")
+        streamer = asyncio.create_task(stream(client))  # calls client.send_audio(), then client.leave()
+        async for event in client:
+            print(event)
+```
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+
+from ..transport import Transport
+from .client import Conversation, ProtocolError
+from .events import Event, Ok
+
+_END = object()
+
+
+def _retrieve(task: "asyncio.Future[None]") -> None:
+    # The error of a task is reported by the `AsyncConversation` methods, don't let asyncio log it too.
+    if not task.cancelled():
+        task.exception()
+
+
+class ConnectionMetrics:
+    """Counters of an [`AsyncConversation`][uhlive.stream.conversation.aio.AsyncConversation] connection."""
+
+    __slots__ = (
+        "bytes_received",
+        "bytes_sent",
+        "events",
+        "heartbeat_latency",
+        "messages_received",
+        "messages_sent",
+        "receive_queue_peak",
+        "receive_waits",
+        "send_queue_peak",
+        "send_waits",
+    )
+
+    messages_sent: int
+    """Messages (text and binary) sent to the server."""
+    bytes_sent: int
+    """Payload bytes sent to the server."""
+    messages_received: int
+    """Messages received from the server."""
+    bytes_received: int
+    """Payload bytes received from the server."""
+    events: int
+    """Events queued for the application."""
+    send_waits: int
+    """How many times a send waited because the send queue was full."""
+    receive_waits: int
+    """How many times the reception waited because the application didn't consume the events fast enough."""
+    send_queue_peak: int
+    """Highest number of messages waiting to be sent."""
+    receive_queue_peak: int
+    """Highest number of events waiting to be consumed."""
+    heartbeat_latency: Optional[float]
+    """Round trip time of the last answered heartbeat, in seconds."""
+
+    def __init__(self) -> None:
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.events = 0
+        self.send_waits = 0
+        self.receive_waits = 0
+        self.send_queue_peak = 0
+        self.receive_queue_peak = 0
+        self.heartbeat_latency = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value}" for name, value in self.as_dict().items())
+        return f"ConnectionMetrics({fields})"
+
+
+class AsyncConversation:
+    """Asyncio driver of a [`Conversation`][uhlive.stream.conversation.Conversation] on a connection.
+
+    Messages to send go through a bounded queue: when it is full,
+    [`send_audio`][uhlive.stream.conversation.aio.AsyncConversation.send_audio] waits, and
+    [`send_audio_nowait`][uhlive.stream.conversation.aio.AsyncConversation.send_audio_nowait] raises
+    `asyncio.QueueFull`. Received events also go through a bounded queue, that you consume by iterating
+    over the `AsyncConversation`: when it is full, the connection is not read anymore until you catch up.
+
+    Iteration stops when the server confirms we left the conversation. If the connection fails, or
+    the server returns an error, the iteration raises it once the events received before are consumed.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        conversation: Conversation,
+        send_queue_size: int = 32,
+        receive_queue_size: int = 256,
+        heartbeat: bool = True,
+    ) -> None:
+        """Create an asyncio client.
+
+        Args:
+            transport: the open websocket connection.
+            conversation: the conversation to join on that connection.
+            send_queue_size: the maximum number of messages waiting to be sent.
+            receive_queue_size: the maximum number of events waiting to be consumed.
+            heartbeat: send the [heartbeats][uhlive.stream.conversation.Heartbeat] of the conversation
+                       to keep the connection open.
+        """
+        self.transport = transport
+        self.conversation = conversation
+        self.metrics = ConnectionMetrics()
+        self._outgoing: "asyncio.Queue[Union[str, bytes]]" = asyncio.Queue(
+            send_queue_size
+        )
+        # The events queue is bounded by `_room`, so that the end marker always fits.
+        self._events: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._room = asyncio.Semaphore(receive_queue_size)
+        self._heartbeat = heartbeat
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._joined: Optional["asyncio.Future[Ok]"] = None
+        self._error: Optional[BaseException] = None
+        self._leaving = False
+        self._finished = False
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncConversation":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def joined(self) -> bool:
+        """Are we in the conversation, and the connection still up?"""
+        return (
+            self._joined is not None
+            and self._joined.done()
+            and not self._joined.cancelled()
+            and self._joined.exception() is None
+            and not self._finished
+        )
+
+    async def join(self, **kwargs: Any) -> Ok:
+        """Join the conversation and wait for the server confirmation.
+
+        Args:
+            kwargs: the arguments of [`Conversation.join`][uhlive.stream.conversation.Conversation.join].
+
+        Returns:
+            The server reply.
+
+        Raises:
+            ProtocolError: if already joined.
+            UhliveError: if the server refused.
+        """
+        message = self.conversation.join(**kwargs)
+        self._joined = asyncio.get_running_loop().create_future()
+        if not self._tasks:
+            self._spawn(self._read())
+            self._spawn(self._write())
+            if self._heartbeat:
+                self._spawn(self._beat())
+        await self._send(message)
+        return await self._joined
+
+    async def send_audio(self, chunk: bytes) -> None:
+        """Queue an audio chunk for sending, waiting if the send queue is full."""
+        await self._send(self.conversation.send_audio_chunk(chunk))
+
+    def send_audio_nowait(self, chunk: bytes) -> None:
+        """Queue an audio chunk for sending.
+
+        Raises:
+            asyncio.QueueFull: if the send queue is full. The chunk is not sent.
+        """
+        self._check()
+        if self._outgoing.full():
+            raise asyncio.QueueFull()
+        self._outgoing.put_nowait(self.conversation.send_audio_chunk(chunk))
+        self._sent()
+
+    async def flush(self) -> None:
+        """Wait until all the queued messages are sent.
+
+        Raises:
+            ProtocolError: if the connection is closed.
+            Exception: the connection error, if the connection failed.
+        """
+        self._check()
+        await self._outgoing.join()
+        self._check()
+
+    async def leave(self) -> None:
+        """Leave the conversation, once the queued audio is sent.
+
+        Keep iterating, or call [`drain`][uhlive.stream.conversation.aio.AsyncConversation.drain],
+        to get the last events: the iteration stops when the server confirms.
+        Even if this call is cancelled, the leave message is sent.
+
+        Raises:
+            ProtocolError: if not in the conversation.
+        """
+        self._check()
+        message = self.conversation.leave()
+        self._leaving = True
+        if self._outgoing.full():
+            self.metrics.send_waits += 1
+        await asyncio.shield(self._outgoing.put(message))
+        if self._finished:
+            self._discard()
+            self._check()
+        self._sent()
+
+    async def drain(self) -> List[Event]:
+        """Consume the remaining events, until we have left the conversation.
+
+        Returns:
+            The events not consumed yet.
+        """
+        return [event async for event in self]
+
+    async def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Leave the conversation if needed, and close the connection.
+
+        The events not consumed yet are discarded. Safe to call more than once.
+
+        Args:
+            timeout: how long to wait for the server to confirm we left, in seconds.
+
+        Raises:
+            Exception: the connection error, if the connection failed while leaving.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.joined:
+                await asyncio.wait_for(self._leave_and_drain(), timeout)
+        except (asyncio.TimeoutError, ProtocolError):
+            # We are closing anyway.
+            pass
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._finish()
+            await self.transport.close()
+
+    async def _leave_and_drain(self) -> None:
+        if not self._leaving:
+            await self.leave()
+        await self.drain()
+
+    def __aiter__(self) -> "AsyncConversation":
+        return self
+
+    async def __anext__(self) -> Event:
+        item = await self._events.get()
+        if item is _END:
+            self._events.put_nowait(_END)
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+        self._room.release()
+        return item
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._finished:
+            raise ProtocolError("Connection closed!")
+
+    async def _send(self, message: Union[str, bytes]) -> None:
+        self._check()
+        if self._outgoing.full():
+            self.metrics.send_waits += 1
+        await self._outgoing.put(message)
+        if self._finished:
+            # The connection ended while we were waiting for room.
+            self._discard()
+            self._check()
+        self._sent()
+
+    def _discard(self) -> None:
+        # Nothing will be sent anymore: wake up `flush` and the blocked producers.
+        outgoing = self._outgoing
+        while not outgoing.empty():
+            outgoing.get_nowait()
+            outgoing.task_done()
+
+    def _sent(self) -> None:
+        size = self._outgoing.qsize()
+        if size > self.metrics.send_queue_peak:
+            self.metrics.send_queue_peak = size
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.ensure_future(self._guard(coro))
+        task.add_done_callback(_retrieve)
+        self._tasks.append(task)
+
+    async def _guard(self, coro: Any) -> None:
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if self._error is None:
+                self._error = exc
+            self._finish()
+            raise
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._discard()
+        self._events.put_nowait(_END)
+        joined = self._joined
+        if joined is not None and not joined.done():
+            joined.set_exception(self._error or ConnectionError("Connection closed"))
+
+    async def _read(self) -> None:
+        transport = self.transport
+        conversation = self.conversation
+        metrics = self.metrics
+        events = self._events
+        room = self._room
+        while not self._finished:
+            data = await transport.receive()
+            if data is None:
+                raise ConnectionError("Connection closed by the server")
+            metrics.messages_received += 1
+            metrics.bytes_received += len(data)
+            event = conversation.receive_filtered(data)
+            if event is None:
+                continue
+            joined = self._joined
+            if joined is not None and not joined.done():
+                if isinstance(event, Ok) and not conversation.left:
+                    joined.set_result(event)
+                    continue
+            if room.locked():
+                metrics.receive_waits += 1
+            await room.acquire()
+            events.put_nowait(event)
+            metrics.events += 1
+            size = events.qsize()
+            if size > metrics.receive_queue_peak:
+                metrics.receive_queue_peak = size
+            if conversation.left and joined is not None and joined.done():
+                return
+
+    async def _write(self) -> None:
+        transport = self.transport
+        outgoing = self._outgoing
+        metrics = self.metrics
+        while True:
+            message = await outgoing.get()
+            try:
+                if isinstance(message, str):
+                    await transport.send_str(message)
+                else:
+                    await transport.send_bytes(message)
+            finally:
+                outgoing.task_done()
+            metrics.messages_sent += 1
+            metrics.bytes_sent += len(message)
+
+    async def _beat(self) -> None:
+        heartbeat = self.conversation.heartbeat
+        while True:
+            await asyncio.sleep(heartbeat.delay())
+            if heartbeat.expired():
+                raise ConnectionError("The server doesn't answer heartbeats")
+            self.metrics.heartbeat_latency = heartbeat.latency
+            if heartbeat.due():
+                await self._send(heartbeat.beat())
@@ -0,0 +1,209 @@
+"""
+Faster than real time streaming, for backfills.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from ..audio import AsyncPacer, Pacer, bytes_per_second
+from .events import AudioSpeechDecoded, Event
+
+
+class _Backlog:
+    """The audio sent, against the audio transcribed so far."""
+
+    def __init__(
+        self,
+        audio_codec: str,
+        window: Optional[float],
+        origin: int,
+        patience: float,
+    ) -> None:
+        self.bytes_per_second = bytes_per_second(audio_codec)
+        self.window = window
+        self.origin = origin
+        self.patience = patience
+        self._sent = 0
+        self._decoded_ms = 0
+        self.waits = 0
+        """How many times the sender waited for the transcription to catch up."""
+        self.stalls = 0
+        """How many times the sender stopped waiting because no transcript came within `patience`."""
+
+    @property
+    def sent(self) -> float:
+        """The duration of the audio sent, in seconds of speech."""
+        return self._sent / self.bytes_per_second
+
+    @property
+    def transcribed(self) -> float:
+        """The end of the last transcript received, in seconds from the start of the audio."""
+        return self._decoded_ms / 1000
+
+    @property
+    def backlog(self) -> float:
+        """How far the transcription lags behind the audio sent, in seconds."""
+        return max(self.sent - self.transcribed, 0.0)
+
+    def _blocked(self) -> bool:
+        return self.window is not None and self.backlog > self.window
+
+    def _progress(self, event: Optional[Event]) -> bool:
+        if not isinstance(event, AudioSpeechDecoded):
+            return False
+        position = event.end - self.origin
+        if position <= self._decoded_ms:
+            return False
+        self._decoded_ms = position
+        return True
+
+    def _stalled(self) -> None:
+        # No transcript for a while: the server is probably decoding silence,
+        # consider it caught up.
+        self.stalls += 1
+        self._decoded_ms = self._sent * 1000 // self.bytes_per_second
+
+
+class Backfill(_Backlog):
+    """Stream recorded audio as fast as the server transcribes it.
+
+    The audio is sent at `speed` times real time (no limit by default), but never more than
+    `window` seconds ahead of the transcription: pass the received events to
+    [`observe`][uhlive.stream.conversation.Backfill.observe], the `end` timestamps of the
+    transcripts (interim results, or final segments) tell how far the server got.
+    As the server doesn't send anything while it decodes silence, the sender stops waiting
+    if no transcript comes within `patience` seconds.
+
+    The audio and the events are handled in two threads, like in live streaming:
+
+    ```python
+    backfill = Backfill("linear", origin=origin)
+
+    def send_audio():
+        with open(audio_path, "rb") as audio_file:
+            for chunk in backfill.paced(iter(lambda: audio_file.read(8000), b"")):
+                socket.send_binary(conversation.send_audio_chunk(chunk))
+        socket.send(conversation.leave())
+
+    Thread(target=send_audio).start()
+    while not conversation.left:
+        event = conversation.receive(socket.recv())
+        backfill.observe(event)
+        ...
+    ```
+
+    The `origin` must be the one given to [`Conversation.join`][uhlive.stream.conversation.Conversation.join].
+    """
+
+    def __init__(
+        self,
+        audio_codec: str = "linear",
+        speed: Optional[float] = None,
+        window: Optional[float] = 30.0,
+        origin: int = 0,
+        patience: float = 10.0,
+    ) -> None:
+        """Create a backfill throttle.
+
+        Args:
+            audio_codec: the codec of the audio.
+            speed: how many times faster than real time to stream at most; `None` or `0` for no limit.
+            window: how far ahead of the transcription the audio can be, in seconds;
+                    `None` to ignore the transcription.
+            origin: the time origin given to [`Conversation.join`][uhlive.stream.conversation.Conversation.join],
+                    in milliseconds.
+            patience: how long to wait for a transcript before considering that the server caught up, in seconds.
+
+        Raises:
+            ValueError: if the codec is unknown.
+        """
+        super().__init__(audio_codec, window, origin, patience)
+        self.pacer = Pacer(audio_codec, speed)
+        """The [pacer][uhlive.stream.audio.Pacer] that enforces the speed limit."""
+        self._progressed = threading.Condition()
+
+    def observe(self, event: Optional[Event]) -> None:
+        """Take a received event into account. Other events than transcripts are ignored.
+
+        Thread safe.
+        """
+        if isinstance(event, AudioSpeechDecoded):
+            with self._progressed:
+                if self._progress(event):
+                    self._progressed.notify_all()
+
+    def wait(self, chunk: bytes) -> None:
+        """Wait until `chunk` can be sent."""
+        self.pacer.wait(chunk)
+        with self._progressed:
+            if self._blocked():
+                self.waits += 1
+                while self._blocked():
+                    if not self._progressed.wait(self.patience):
+                        self._stalled()
+            self._sent += len(chunk)
+
+    def paced(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Yield the chunks, each when it can be sent."""
+        for chunk in chunks:
+            self.wait(chunk)
+            yield chunk
+
+
+class AsyncBackfill(_Backlog):
+    """The asyncio version of [`Backfill`][uhlive.stream.conversation.Backfill].
+
+    ```python
+    backfill = AsyncBackfill("linear", origin=origin)
+
+    async def send_audio():
+        with open(audio_path, "rb") as audio_file:
+            async for chunk in backfill.paced(iter(lambda: audio_file.read(8000), b"")):
+                await client.send_audio(chunk)
+        await client.leave()
+
+    streamer = asyncio.create_task(send_audio())
+    async for event in client:
+        backfill.observe(event)
+        ...
+    ```
+    """
+
+    def __init__(
+        self,
+        audio_codec: str = "linear",
+        speed: Optional[float] = None,
+        window: Optional[float] = 30.0,
+        origin: int = 0,
+        patience: float = 10.0,
+    ) -> None:
+        """Create a backfill throttle, see [`Backfill`][uhlive.stream.conversation.Backfill] for the arguments."""
+        super().__init__(audio_codec, window, origin, patience)
+        self.pacer = AsyncPacer(audio_codec, speed)
+        """The [pacer][uhlive.stream.audio.AsyncPacer] that enforces the speed limit."""
+        self._progressed = asyncio.Event()
+
+    def observe(self, event: Optional[Event]) -> None:
+        """Take a received event into account. Other events than transcripts are ignored."""
+        if self._progress(event):
+            self._progressed.set()
+
+    async def wait(self, chunk: bytes) -> None:
+        """Wait until `chunk` can be sent."""
+        await self.pacer.wait(chunk)
+        if self._blocked():
+            self.waits += 1
+            while self._blocked():
+                self._progressed.clear()
+                try:
+                    await asyncio.wait_for(self._progressed.wait(), self.patience)
+                except asyncio.TimeoutError:
+                    self._stalled()
+        self._sent += len(chunk)
+
+    async def paced(self, chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+        """Yield the chunks, each when it can be sent."""
+        for chunk in chunks:
+            await self.wait(chunk)
+            yield chunk
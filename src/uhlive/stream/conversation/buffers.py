@@ -0,0 +1,88 @@
+"""
+Reusable buffers for allocation free audio streaming.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator
+
+from ..audio import chunk_size
+from .client import Conversation
+
+
+class FrameBufferPool:
+    """A small pool of reusable frame buffers.
+
+    Use it with [`Conversation.frame_audio_into`][uhlive.stream.conversation.Conversation.frame_audio_into]
+    to stream audio without allocating a new message for each chunk:
+
+    ```python
+    pool = FrameBufferPool.for_conversation(conversation, audio_codec="linear")
+    while chunk := audio_file.read(pool.chunk_size):
+        with pool.frame(conversation, chunk) as frame:
+            socket.send_binary(frame)
+    ```
+
+    Acquiring and releasing buffers is thread safe, so a pool may be shared by several sender threads.
+    If the pool is empty, a new buffer is allocated, and kept on release up to `count` buffers.
+    """
+
+    def __init__(self, buffer_size: int, count: int = 2, chunk_size: int = 0) -> None:
+        """Create a pool of `count` buffers of `buffer_size` bytes.
+
+        Args:
+            buffer_size: the size of each buffer.
+            count: the number of buffers to keep in the pool.
+            chunk_size: the audio chunk size the buffers were sized for, if any.
+        """
+        self.buffer_size = buffer_size
+        self.count = count
+        self.chunk_size = chunk_size
+        self._buffers: Deque[bytearray] = deque(
+            bytearray(buffer_size) for _ in range(count)
+        )
+
+    @classmethod
+    def for_conversation(
+        cls,
+        conversation: Conversation,
+        audio_codec: str = "linear",
+        chunk_duration: float = 0.5,
+        count: int = 2,
+    ) -> "FrameBufferPool":
+        """Create a pool whose buffers can hold the frames of `conversation` for audio chunks of
+        `chunk_duration` seconds in the given codec.
+        """
+        size = chunk_size(audio_codec, chunk_duration)
+        return cls(conversation.max_frame_size(size), count, size)
+
+    def acquire(self) -> bytearray:
+        """Take a buffer from the pool."""
+        try:
+            return self._buffers.pop()
+        except IndexError:
+            return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray) -> None:
+        """Give back a buffer to the pool."""
+        if len(self._buffers) < self.count and len(buffer) == self.buffer_size:
+            self._buffers.append(buffer)
+
+    @contextmanager
+    def frame(self, conversation: Conversation, chunk: bytes) -> Iterator[memoryview]:
+        """Build an audio chunk frame for `conversation` in a pooled buffer.
+
+        The frame is only valid inside the `with` block: the buffer goes back to the pool on exit.
+
+        Raises:
+            ProtocolError: if not currently in a converstation.
+            ValueError: if the chunk doesn't fit in the pool buffers.
+        """
+        buffer = self.acquire()
+        try:
+            with memoryview(buffer) as view:
+                length = conversation.frame_audio_into(view, chunk)
+                with view[:length] as frame:
+                    yield frame
+        finally:
+            self.release(buffer)
@@ -2,12 +2,24 @@
 Object oriented abstraction over the Conversation API protocol and workflow.
 """
 
-import json
-from array import array
+import re
 from enum import Enum
-from typing import Any, Dict, Union
-
-from .events import Event, Ok, SpeakerLeft
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ..codec import dumps, loads
+from .events import Event, Ok, RawPayload, SpeakerLeft, event_class
+from .heartbeat import PHOENIX_TOPIC, Heartbeat
 
 # *** Phoenix channel protocol V2 ***
 #
@@ -34,8 +46,44 @@ from .events import Event, Ok, SpeakerLeft
 # >>
 # where @push = 0
 
+# Leading `join_ref, ref, topic, event_name,` fields of a JSON message.
+_REF = r'null|-?\d+|"(?:[^"\\]|\\.)*"'
+_STR = r'"(?:[^"\\]|\\.)*"'
+ENVELOPE = re.compile(
+    rf"\s*\[\s*({_REF})\s*,\s*({_REF})\s*,\s*({_STR})\s*,\s*({_STR})\s*,"
+)
+
+# Events we always need to decode to track the protocol state.
+STATE_EVENTS = frozenset(("phx_reply", "phx_error", "phx_close", "speaker_left"))
+
 B_JOIN_REF = ord("1")
 S_JOIN_REF = "1"
+AUDIO_CHUNK = b"audio_chunk"
+MAX_REF_SIZE = 20  # decimal digits of the largest 64 bit ref
+
+
+def _token(token: str) -> Any:
+    if token == "null":
+        return None
+    if token[0] != '"':
+        return int(token)
+    if "\\" in token:
+        return loads(token)
+    return token[1:-1]
+
+
+def parse_envelope(data: str) -> Optional[Tuple[Any, Any, str, str, int]]:
+    """Extract the `join_ref, ref, topic, event_name` fields of a JSON message without decoding its payload.
+
+    Returns:
+        The four fields and the offset of the payload in `data`, or `None`
+        if the message doesn't look like a Phoenix V2 message.
+    """
+    m = ENVELOPE.match(data)
+    if m is None:
+        return None
+    join_ref, ref, topic, event = m.groups()
+    return _token(join_ref), _token(ref), _token(topic), _token(event), m.end()
 
 
 class ProtocolError(RuntimeError):
@@ -55,24 +103,67 @@ class Conversation:
     """To join a conversation on the API, you need a `Conversation` object.
 
     You can only have one `Conversation` per connection (socket) otherwise you risk
-    unexpected behavior (and exceptions!).
+    unexpected behavior (and exceptions!). To join several conversations on the same connection,
+    use a [ConversationMux][uhlive.stream.conversation.ConversationMux].
     """
 
-    def __init__(self, identifier: str, conversation_id: str, speaker: str) -> None:
+    def __init__(
+        self,
+        identifier: str,
+        conversation_id: str,
+        speaker: str,
+        event_filter: Optional[Iterable[Union[str, Type[Event]]]] = None,
+        lazy: bool = False,
+        compact: bool = False,
+        keep_extra: bool = False,
+        join_ref: int = int(S_JOIN_REF),
+    ) -> None:
         """Create a `Conversation`.
 
         Args:
             identifier: is the identifier you got when you subscribed to the service;
             conversation_id: is the conversation you wish to join,
             speaker: is your alias in the conversation, to identify you and your events
+            event_filter: if given, only the events with those names (e.g. `"audio_segment_decoded"`)
+                          or of those [Event][uhlive.stream.conversation.Event] classes
+                          (e.g. `EntityRecognized`) are decoded by
+                          [`receive`][uhlive.stream.conversation.Conversation.receive]; the others
+                          are skipped without decoding their payload.
+            lazy: if `True`, [`receive`][uhlive.stream.conversation.Conversation.receive] only decodes
+                  the message envelope, and the event payload is decoded the first time one of its
+                  properties is read. Useful if you forward most events without inspecting them.
+            compact: if `True`, the received events are [compacted][uhlive.stream.conversation.Event.compact]
+                     to save memory when you keep them around. This implies decoding the payloads,
+                     so it overrides `lazy`.
+            keep_extra: when compacting events, keep the payload fields that are not used by the event properties.
+            join_ref: the ref of the join message, that identifies this channel on the connection.
+                      It must be unique among the conversations sharing a connection.
         """
         self._state: State = State.Idle
+        self.heartbeat = Heartbeat()
+        """The [heartbeat][uhlive.stream.conversation.Heartbeat] schedule of the connection."""
         self.identifier = identifier
         self.topic = f"conversation:{self.identifier}@{conversation_id}"
         self.topic_bin = self.topic.encode("utf-8")
         self.topic_len = len(self.topic_bin)
         self.speaker = speaker
-        self._request_id = int(S_JOIN_REF) - 1
+        self.join_ref = str(join_ref)
+        self._request_id = join_ref - 1
+        # The binary push header only varies by its ref, so cache the constant parts.
+        self._join_ref_bin = self.join_ref.encode("ascii")
+        self._header_tail = self.topic_bin + AUDIO_CHUNK
+        self._header_heads: Dict[int, bytes] = {}
+        self._lazy = lazy
+        self._compact = compact
+        self._keep_extra = keep_extra
+        self._wanted: Optional[Dict[str, bool]] = None
+        if event_filter is not None:
+            self._wanted = {}
+            filters = list(event_filter)
+            self._wanted_names: FrozenSet[str] = frozenset(
+                f for f in filters if isinstance(f, str)
+            )
+            self._wanted_classes = tuple(f for f in filters if not isinstance(f, str))
 
     def join(
         self,
@@ -151,15 +242,139 @@ class Conversation:
         Raises:
             ProtocolError: if not currently in a converstation.
         """
+        return b"".join(self.send_audio_chunk_vectored(chunk))
+
+    def send_audio_chunk_vectored(self, chunk: bytes) -> Tuple[memoryview, bytes]:
+        """Build an audio chunk for streaming, as a sequence of buffers.
+
+        Same as [`send_audio_chunk`][uhlive.stream.conversation.Conversation.send_audio_chunk],
+        but the frame is returned as a `(header, chunk)` couple instead of a single `bytes` object:
+        the audio data is not copied. The concatenation of both buffers is the binary websocket message
+        to send to the server, so this is meant for transports that support vectored (scatter/gather) writes.
+
+        Returns:
+            The header as a `memoryview` and the untouched audio chunk.
+        Raises:
+            ProtocolError: if not currently in a converstation.
+        """
+        if self._state != State.Joined:
+            raise ProtocolError("Not in a conversation!")
+        return memoryview(self._audio_header(self.request_id.encode("ascii"))), chunk
+
+    def send_audio_chunks(
+        self,
+        audio: Union[bytes, bytearray, memoryview, Iterable[bytes]],
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """Build audio chunk messages in bulk, for offline streaming.
+
+        Args:
+            audio: either an iterable of audio chunks, or a single buffer of audio data
+                   that will be cut into chunks of `chunk_size` bytes (the last one may be shorter).
+            chunk_size: the size of the chunks to cut `audio` into, if it is a buffer.
+                        See [`uhlive.stream.audio.chunk_size`][uhlive.stream.audio.chunk_size].
+
+        Returns:
+            An iterator over the binary websocket messages to send to the server, in order.
+            The messages are built lazily, as you iterate, but the conversation state
+            is only checked once, by this call.
+
+        Raises:
+            ProtocolError: if not currently in a converstation.
+            ValueError: if `audio` is a buffer and `chunk_size` is missing.
+        """
         if self._state != State.Joined:
             raise ProtocolError("Not in a conversation!")
-        ref = self.request_id.encode("ascii")
-        message = array("B", [0, 1, len(ref), self.topic_len, 11, B_JOIN_REF])
-        message.extend(ref)
-        message.extend(self.topic_bin)
-        message.extend(b"audio_chunk")
-        message.extend(chunk)
-        return message.tobytes()
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            if not chunk_size or chunk_size < 0:
+                raise ValueError("A positive chunk_size is needed to split a buffer")
+            view = memoryview(audio)
+            chunks: Iterable[Any] = (
+                view[i : i + chunk_size] for i in range(0, len(view), chunk_size)
+            )
+        else:
+            chunks = audio
+        return self._frame_chunks(chunks)
+
+    def _frame_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        tail = self._header_tail
+        ref_len = 0
+        head = b""
+        for chunk in chunks:
+            ref = self._request_id + 1
+            self._request_id = ref
+            ref_bin = b"%d" % ref
+            if len(ref_bin) != ref_len:
+                ref_len = len(ref_bin)
+                head = self._header_head(ref_len)
+            yield b"".join((head, ref_bin, tail, chunk))
+
+    def frame_audio_into(
+        self, buffer: Union[bytearray, memoryview], chunk: bytes
+    ) -> int:
+        """Write an audio chunk frame for streaming into a caller supplied buffer.
+
+        Same as [`send_audio_chunk`][uhlive.stream.conversation.Conversation.send_audio_chunk],
+        but no message is allocated per frame: it is written at the start of `buffer`.
+        A buffer of [`max_frame_size(len(chunk))`][uhlive.stream.conversation.Conversation.max_frame_size]
+        bytes is always big enough.
+
+        Returns:
+            The length of the message written, so that `memoryview(buffer)[:length]` is
+            the binary websocket message to send to the server.
+        Raises:
+            ProtocolError: if not currently in a converstation.
+            ValueError: if the buffer is too small.
+        """
+        if self._state != State.Joined:
+            raise ProtocolError("Not in a conversation!")
+        ref = str(self._request_id + 1).encode("ascii")
+        head = self._header_head(len(ref))
+        tail = self._header_tail
+        i = len(head)
+        j = i + len(ref)
+        k = j + len(tail)
+        length = k + len(chunk)
+        if length > len(buffer):
+            raise ValueError(f"Buffer too small: {length} bytes needed")
+        self._request_id += 1
+        # Through a memoryview: a bytearray copies the assigned value to a temporary first.
+        with memoryview(buffer) as view:
+            view[:i] = head
+            view[i:j] = ref
+            view[j:k] = tail
+            view[k:length] = chunk
+        return length
+
+    def max_frame_size(self, chunk_size: int) -> int:
+        """The maximum size of the binary message for an audio chunk of `chunk_size` bytes."""
+        return (
+            5
+            + len(self._join_ref_bin)
+            + MAX_REF_SIZE
+            + len(self._header_tail)
+            + chunk_size
+        )
+
+    def _audio_header(self, ref: bytes) -> bytes:
+        return b"".join((self._header_head(len(ref)), ref, self._header_tail))
+
+    def _header_head(self, ref_len: int) -> bytes:
+        head = self._header_heads.get(ref_len)
+        if head is None:
+            head = self._header_heads[ref_len] = (
+                bytes(
+                    (
+                        0,
+                        len(self._join_ref_bin),
+                        ref_len,
+                        self.topic_len,
+                        len(AUDIO_CHUNK),
+                    )
+                )
+                + self._join_ref_bin
+            )
+        return head
 
     @property
     def request_id(self) -> str:
@@ -171,19 +386,104 @@ class Conversation:
 
         The server only sends text messages.
 
+        Every message is decoded, whatever the `event_filter` given to the constructor: use
+        [`receive_filtered`][uhlive.stream.conversation.Conversation.receive_filtered] to skip the unwanted events.
+
         Returns:
             The appropriate [Event][uhlive.stream.conversation.Event] subclass instance.
+            The replies to [heartbeats][uhlive.stream.conversation.Conversation.heartbeat] are
+            [Ok][uhlive.stream.conversation.Ok] events of the `phoenix` topic.
+        """
+        envelope = None
+        if self._lazy:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            envelope = parse_envelope(data)
+        return self._decode(data, envelope)
+
+    def receive_filtered(self, data: Union[str, bytes]) -> Optional[Event]:
+        """Decode received websocket message, if it is wanted.
+
+        Like [`receive`][uhlive.stream.conversation.Conversation.receive], but the events that are not
+        selected by the `event_filter` given to the constructor are skipped without decoding their payload,
+        and the replies to [heartbeats][uhlive.stream.conversation.Conversation.heartbeat] are only acknowledged.
+
+        Returns:
+            The appropriate [Event][uhlive.stream.conversation.Event] subclass instance,
+            or `None` if the event was skipped, or if the message is a reply to a heartbeat.
         """
-        event = Event.from_message(json.loads(data))
+        envelope = None
+        if self._wanted is not None or self._lazy:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            envelope = parse_envelope(data)
+        return self._receive(data, envelope)
+
+    def _receive(
+        self,
+        data: Union[str, bytes],
+        envelope: Optional[Tuple[Any, Any, str, str, int]],
+    ) -> Optional[Event]:
+        if envelope is None:
+            message = loads(data)
+            if message[2] == PHOENIX_TOPIC:
+                self.heartbeat.acknowledge(message)
+                return None
+            return self._handle(message)
+        if envelope[2] == PHOENIX_TOPIC:
+            self.heartbeat.acknowledge(loads(data))
+            return None
+        if self._wanted is not None:
+            name = envelope[3]
+            wanted = self._wanted.get(name)
+            if wanted is None:
+                wanted = self._wanted[name] = self._is_wanted(name)
+            if not wanted:
+                assert (
+                    envelope[2] == self.topic
+                ), "Topic mismatch! Are you trying to mix several conversations on the same socket? Use a ConversationMux."
+                return None
+        return self._decode(data, envelope)
+
+    def _decode(
+        self,
+        data: Union[str, bytes],
+        envelope: Optional[Tuple[Any, Any, str, str, int]],
+    ) -> Event:
+        if envelope is not None and self._lazy and not self._compact:
+            assert isinstance(data, str)
+            join_ref, ref, topic, name, offset = envelope
+            if name not in STATE_EVENTS:
+                assert (
+                    topic == self.topic
+                ), "Topic mismatch! Are you trying to mix several conversations on the same socket? Use a ConversationMux."
+                payload = RawPayload(data[offset : data.rindex("]")])
+                return event_class(name)(join_ref, ref, topic, name, payload)
+        return self._handle(loads(data))
+
+    def _handle(self, message: List[Any]) -> Event:
+        if message[2] == PHOENIX_TOPIC:
+            self.heartbeat.acknowledge(message)
+            return Event.from_message(message)
+        event = Event.from_message(message)
         assert (
             event.conversation == self.topic
-        ), "Topic mismatch! Are you trying to mix several conversations on the same socket? This is not supported."
+        ), "Topic mismatch! Are you trying to mix several conversations on the same socket? Use a ConversationMux."
         if isinstance(event, Ok) and event.ref == event.join_ref:
             self._state = State.Joined
         elif isinstance(event, SpeakerLeft) and event.speaker == self.speaker:
             self._state = State.Idle
+        if self._compact:
+            event.compact(self._keep_extra)
         return event
 
+    def _is_wanted(self, name: str) -> bool:
+        return (
+            name in STATE_EVENTS
+            or name in self._wanted_names
+            or issubclass(event_class(name), self._wanted_classes)
+        )
+
     @property
     def left(self):
         """Did the server confirm we left the conversation?"""
@@ -191,12 +491,10 @@ class Conversation:
 
     def command(self, name: str, payload: Dict[str, Any] = {}) -> str:
         message = [
-            S_JOIN_REF,
+            self.join_ref,
             self.request_id,
             self.topic,
             name,
             payload,
         ]
-        return json.dumps(
-            message, ensure_ascii=False, indent=None, separators=(",", ":")
-        )
+        return dumps(message)
@@ -0,0 +1,71 @@
+"""
+Store of the entities found in a conversation.
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .events import EntityRecognized, EntityReference, Event, RelationRecognized
+
+
+class EntityStore:
+    """Keep the recent entities of a conversation to resolve the references of relations.
+
+    [`RelationRecognized.components`][uhlive.stream.conversation.RelationRecognized.components]
+    are [references][uhlive.stream.conversation.EntityReference] to entities found earlier in the conversation.
+    Feed the store with the events you receive, and it resolves them with a dictionary lookup:
+
+    ```python
+    entities = EntityStore()
+    while True:
+        event = conversation.receive(socket.recv())
+        entities.add(event)
+        if isinstance(event, RelationRecognized):
+            print(event.relation_name, entities.resolve_relation(event))
+    ```
+
+    Entities are keyed by `(speaker, entity id)`. When the store holds more than `max_entities`
+    entities, the oldest ones are evicted.
+    """
+
+    def __init__(self, max_entities: int = 10000) -> None:
+        self.max_entities = max_entities
+        self._entities: "OrderedDict[Tuple[str, str], EntityRecognized]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(self, event: Optional[Event]) -> bool:
+        """Store an entity event.
+
+        Other events are ignored, so you can pass all the events you receive.
+
+        Returns:
+            `True` if the event was stored.
+        """
+        if not isinstance(event, EntityRecognized):
+            return False
+        key = (event.speaker, event.id)
+        self._entities[key] = event
+        self._entities.move_to_end(key)
+        if len(self._entities) > self.max_entities:
+            self._entities.popitem(last=False)
+        return True
+
+    def get(self, speaker: str, id: str) -> Optional[EntityRecognized]:
+        """The entity found for `speaker` with the given id, if still in store."""
+        return self._entities.get((speaker, id))
+
+    def resolve(self, reference: EntityReference) -> Optional[EntityRecognized]:
+        """The entity referenced, if still in store."""
+        return self._entities.get((reference.speaker, reference.id))
+
+    def resolve_relation(
+        self, relation: RelationRecognized
+    ) -> List[Optional[EntityRecognized]]:
+        """The entities involved in a relation, in the order of its components.
+
+        Entities that are not in store anymore are `None`.
+        """
+        entities = self._entities
+        return [entities.get((ref.speaker, ref.id)) for ref in relation.components]
@@ -1,8 +1,21 @@
 """Event definitions."""
 
 import re
-from typing import Any, List
-
+import sys
+from array import array
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Type,
+)
+
+from ..codec import loads
 from .error import UhliveError
 from .human_datetime import human_datetime
 
@@ -13,6 +26,8 @@ RELATION_NAME = re.compile(r"relation_([\w_]+)_recognized")
 class Word(dict):
     """Timestamped word."""
 
+    __slots__ = ()
+
     @property
     def start(self) -> int:
         """Start time as Unix timestamp in millisecond, according to audio timeline."""
@@ -39,14 +54,250 @@ class Word(dict):
         return self["confidence"]
 
 
+class RawPayload:
+    """The JSON text of an event payload, to be decoded on first use."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class WordColumns:
+    """The words of a transcript event, stored by columns.
+
+    Each attribute holds one field for all the words, in order, so that time alignment
+    and confidence computations can run without creating a Python object per word.
+    The arrays support the buffer protocol, so you can wrap them with NumPy without copy:
+
+    ```python
+    starts = numpy.frombuffer(event.columns.starts, dtype=numpy.int64)
+    ```
+    """
+
+    __slots__ = ("confidences", "ends", "lengths", "starts", "values")
+
+    starts: array
+    """Start times as Unix timestamps in millisecond (`array('q')`)."""
+    ends: array
+    """End times as Unix timestamps in millisecond (`array('q')`)."""
+    lengths: array
+    """Word lengths in millisecond (`array('q')`)."""
+    confidences: array
+    """ASR confidences (`array('d')`)."""
+    values: Tuple[str, ...]
+    """Transcript tokens, as interned strings."""
+
+    def __init__(self, words: List[Any]) -> None:
+        self.starts = array("q", [w["start"] for w in words])
+        self.ends = array("q", [w["end"] for w in words])
+        self.lengths = array("q", [w["length"] for w in words])
+        self.confidences = array("d", [w["confidence"] for w in words])
+        self.values = tuple(sys.intern(w["value"]) for w in words)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class CompactWord:
+    """Memory efficient storage of a word of a [compact][uhlive.stream.conversation.Event.compact] event.
+
+    It can be turned into a [`Word`][uhlive.stream.conversation.Word] with `Word(compact_word)`.
+    """
+
+    __slots__ = ("confidence", "end", "length", "start", "value")
+    # in the order of the server's words
+    _fields = ("start", "end", "length", "value", "confidence")
+
+    start: int
+    end: int
+    length: int
+    value: str
+    confidence: float
+
+    def __init__(self, word: Dict[str, Any]) -> None:
+        for key in self._fields:
+            if key in word:
+                setattr(self, key, word[key])
+
+    def keys(self) -> List[str]:
+        return [key for key in self._fields if hasattr(self, key)]
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CompactPayload:
+    """Memory efficient storage of the payload of a [compact][uhlive.stream.conversation.Event.compact] event.
+
+    The fields exposed by the event properties are stored as attributes, the others are
+    kept in the `extra` dictionary if requested, or dropped.
+    It implements the read-only subset of the `dict` API used by the events.
+    """
+
+    __slots__ = (
+        "components",
+        "confidence",
+        "country",
+        "display",
+        "end",
+        "extra",
+        "id",
+        "interim_results",
+        "lang",
+        "length",
+        "rescoring",
+        "source",
+        "speaker",
+        "start",
+        "timestamp",
+        "value",
+    )
+    # the payload fields stored as attributes, in the order of the server's payloads
+    _fields = (
+        "start",
+        "end",
+        "length",
+        "speaker",
+        "value",
+        "confidence",
+        "lang",
+        "country",
+        "id",
+        "components",
+        "display",
+        "source",
+        "timestamp",
+        "interim_results",
+        "rescoring",
+    )
+
+    start: int
+    end: int
+    length: int
+    speaker: str
+    value: Any
+    confidence: float
+    lang: str
+    country: str
+    id: str
+    components: Any
+    display: Optional[str]
+    source: str
+    timestamp: int
+    interim_results: bool
+    rescoring: bool
+    extra: Optional[Dict[str, Any]]
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        keep_extra: bool = False,
+        compact_components: Any = None,
+    ) -> None:
+        extra: Optional[Dict[str, Any]] = {} if keep_extra else None
+        for key, value in payload.items():
+            if key in _COMPACT_FIELDS:
+                if key == "components" and compact_components is not None:
+                    value = compact_components(value)
+                setattr(self, key, value)
+            elif extra is not None:
+                extra[key] = value
+        self.extra = extra
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _COMPACT_FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self._fields:
+            if hasattr(self, key):
+                yield key, getattr(self, key)
+        if self.extra:
+            yield from self.extra.items()
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+_COMPACT_FIELDS = frozenset(CompactPayload._fields)
+_MISSING = object()
+
+
 class Event(object):
     """The base class of all events."""
 
+    __slots__ = ("_conversation", "_join_ref", "_payload", "_raw", "_ref")
+
+    name_pattern: ClassVar[Optional[Pattern[str]]] = None
+
     def __init__(self, join_ref, ref, conversation, event, payload) -> None:
         self._join_ref = join_ref
         self._ref = ref
         self._conversation = conversation
-        self._payload = payload
+        if type(payload) is RawPayload:
+            self._raw = payload.text
+        else:
+            self._payload = payload
+
+    def compact(self, keep_extra: bool = False) -> None:
+        """Switch the event to a memory efficient representation.
+
+        Only the payload fields used by the event properties are kept, as
+        attributes of a [`CompactPayload`][uhlive.stream.conversation.events.CompactPayload],
+        and the transcript words are stored as [`CompactWord`][uhlive.stream.conversation.events.CompactWord]s.
+        The properties keep working as before, but are slightly slower to read.
+        The values built on first access, like `components`, are dropped.
+
+        Args:
+            keep_extra: keep the other payload fields too, in a dictionary.
+        """
+        payload = self._payload
+        if type(payload) is not CompactPayload:
+            self._payload = CompactPayload(
+                payload, keep_extra, self._compact_components
+            )
+        for name in self._memoized:
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
+
+    _compact_components: Any = None
+    # The slots of the values built on first access, dropped by `compact`.
+    _memoized: Tuple[str, ...] = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails, i.e. for the payload of lazy events
+        # that was not decoded yet.
+        if name != "_payload":
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            )
+        payload = self._payload = loads(self._raw)
+        del self._raw
+        return payload
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(payload={self._payload})"
@@ -77,26 +328,93 @@ class Event(object):
         [join_ref, ref, topic, event, payload] = message
         if event == "phx_reply" and payload["status"] == "error":
             raise UhliveError(payload["response"]["reason"])
-        if event in EVENT_MAP:
-            return EVENT_MAP[event](*message)
-        if event.startswith("entity_"):
-            return EntityRecognized(*message)
-        if event.startswith("relation_"):
-            return RelationRecognized(*message)
         if event == "phx_error":
             raise UhliveError("Server error, channel crashed!")
-        return Unknown(*message)
+        return event_class(event)(*message)
+
+
+def event_class(name: str) -> Type[Event]:
+    """The [Event][uhlive.stream.conversation.Event] subclass that represents the server events named `name`."""
+    return dispatch(name)[0]
+
+
+def dispatch(name: str) -> Tuple[Type[Event], Optional[str]]:
+    """Resolve a server event name.
+
+    Returns:
+        The [Event][uhlive.stream.conversation.Event] subclass that represents the events named `name`,
+        and the sub name parsed from it by the `name_pattern` of that class, if any
+        (e.g. the entity name of entity events).
+        Results are cached.
+    """
+    try:
+        return _DISPATCH[name]
+    except KeyError:
+        pass
+    cls = EVENT_MAP.get(name)
+    if cls is None:
+        cls = next(
+            (c for prefix, c in EVENT_PREFIXES.items() if name.startswith(prefix)),
+            Unknown,
+        )
+    sub_name = None
+    if cls.name_pattern is not None:
+        m = cls.name_pattern.match(name)
+        if m is not None:
+            sub_name = sys.intern(m.group(1))
+    if len(_DISPATCH) >= _MAX_DISPATCH:
+        _DISPATCH.clear()
+    resolved = _DISPATCH[sys.intern(name)] = (cls, sub_name)
+    return resolved
+
+
+def register_event(
+    name: str, cls: Optional[Type[Event]] = None, prefix: bool = False
+) -> Any:
+    """Register an [Event][uhlive.stream.conversation.Event] subclass for server events
+    that this SDK doesn't know (yet), instead of getting `Unknown` events.
+
+    Can be used as a class decorator:
+
+    ```python
+    @register_event("speaker_muted")
+    class SpeakerMuted(Event):
+        __slots__ = ()
+    ```
+
+    Args:
+        name: the event name.
+        cls: the class to instantiate for those events. If omitted, returns a decorator.
+        prefix: if `True`, `name` is a prefix and `cls` is used for all the events whose name starts with it
+                and are not registered by their full name.
+                The class may define a `name_pattern` regular expression whose first group is extracted from the
+                event name, as `EntityRecognized` does for entity names.
+    """
+
+    def register(cls: Type[Event]) -> Type[Event]:
+        if prefix:
+            EVENT_PREFIXES[name] = cls
+        else:
+            EVENT_MAP[name] = cls
+        _DISPATCH.clear()
+        return cls
+
+    if cls is None:
+        return register
+    return register(cls)
 
 
 class Ok(Event):
     """API asynchronous command aknowledgements."""
 
-    pass
+    __slots__ = ()
 
 
 class Unknown(Event):
     """The server emitted an event unkown to this SDK. Time to upgrade!"""
 
+    __slots__ = ("_name",)
+
     def __init__(self, join_ref, ref, topic, event, payload):
         self._name = event
         super().__init__(join_ref, ref, topic, event, payload)
@@ -108,6 +426,8 @@ class Unknown(Event):
 class TimeScopedEvent(Event):
     """Base class for events that are anchored to the audio time line."""
 
+    __slots__ = ()
+
     @property
     def start(self) -> int:
         """Start time as Unix timestamp in millisecond, according to audio timeline."""
@@ -127,6 +447,12 @@ class TimeScopedEvent(Event):
 class AudioSpeechDecoded(TimeScopedEvent):
     """The base class of all transcription events."""
 
+    __slots__ = ("_columns", "_components")
+    _memoized = __slots__
+
+    _components: List[Word]
+    _columns: WordColumns
+
     @property
     def value(self) -> str:
         """Get the transcript of the whole segment as a string"""
@@ -153,10 +479,35 @@ class AudioSpeechDecoded(TimeScopedEvent):
         """The Utterance id identifies the speech utterance this event transcribes."""
         return self._payload["id"]
 
+    @staticmethod
+    def _compact_components(
+        components: List[Dict[str, Any]],
+    ) -> Tuple[CompactWord, ...]:
+        return tuple(CompactWord(w) for w in components)
+
     @property
     def components(self) -> List[Word]:
-        """Get the transcript of the whole segment as a list of timestamped [words][uhlive.stream.conversation.Word]."""
-        return [Word(w) for w in self._payload["components"]]
+        """Get the transcript of the whole segment as a list of timestamped [words][uhlive.stream.conversation.Word].
+
+        The list is built on first access, and the same list is returned afterwards.
+        """
+        try:
+            return self._components
+        except AttributeError:
+            words = self._components = [Word(w) for w in self._payload["components"]]
+            return words
+
+    @property
+    def columns(self) -> WordColumns:
+        """Get the transcript of the whole segment as [columns][uhlive.stream.conversation.WordColumns] of word fields.
+
+        The columns are built on first access, and the same object is returned afterwards.
+        """
+        try:
+            return self._columns
+        except AttributeError:
+            columns = self._columns = WordColumns(self._payload["components"])
+            return columns
 
     def __str__(self) -> str:
         return f"[{self.speaker} — {human_datetime(self.start)}] {self.value}"
@@ -170,24 +521,26 @@ class AudioSpeechDecoded(TimeScopedEvent):
 class AudioWordsDecoded(AudioSpeechDecoded):
     """Interim segment transcript event."""
 
-    pass
+    __slots__ = ()
 
 
 class AudioSegmentDecoded(AudioSpeechDecoded):
     """Final segment transcript event."""
 
-    pass
+    __slots__ = ()
 
 
 class AudioSegmentNormalized(AudioSpeechDecoded):
     """Normalized segment event."""
 
-    pass
+    __slots__ = ()
 
 
 class SpeakerJoined(Event):
     """A new speaker joined the conversation (after us)."""
 
+    __slots__ = ()
+
     @property
     def timestamp(self) -> int:
         """The UNIX time when the speaker joined the conversation."""
@@ -223,6 +576,8 @@ class SpeakerJoined(Event):
 class SpeakerLeft(Event):
     """Event emitted by the associated speaker when they left the conversation."""
 
+    __slots__ = ()
+
     @property
     def timestamp(self) -> int:
         """UNIX time when the speaker left the conversation."""
@@ -232,10 +587,12 @@ class SpeakerLeft(Event):
 class EntityRecognized(TimeScopedEvent):
     """The class for all entity annotation events."""
 
+    __slots__ = ("_name",)
+
+    name_pattern = ENTITY_NAME
+
     def __init__(self, join_ref, ref, conversation, event, payload):
-        self._name = ENTITY_NAME.match(event).group(
-            1
-        )  # let it raise if it doesn't match
+        self._name = _sub_name(event)
         super().__init__(join_ref, ref, conversation, event, payload)
 
     @property
@@ -243,6 +600,11 @@ class EntityRecognized(TimeScopedEvent):
         """The name of the named entity found."""
         return self._name
 
+    @property
+    def id(self) -> str:
+        """The id of the entity, by which [relations][uhlive.stream.conversation.RelationRecognized] reference it."""
+        return self._payload["id"]
+
     @property
     def lang(self) -> str:
         """Natural Language of the interpretation.
@@ -303,6 +665,8 @@ class Tag:
 
     confidence: float
 
+    __slots__ = ("confidence", "display", "value")
+
     def __init__(self, value: str, display: str, confidence: float) -> None:
         self.value = value
         self.display = display
@@ -315,6 +679,8 @@ class Tag:
 class TagsSet(TimeScopedEvent):
     """One or more tags were found on this time range."""
 
+    __slots__ = ()
+
     @property
     def lang(self) -> str:
         """Natural Language of the interpretation.
@@ -358,6 +724,8 @@ class EntityReference:
     id: str
     """The id the referenced `Entity`."""
 
+    __slots__ = ("id", "kind", "speaker")
+
     def __init__(self, entity_name: str, speaker: str, id: str) -> None:
         self.kind = entity_name
         self.speaker = speaker
@@ -373,10 +741,12 @@ class RelationRecognized(TimeScopedEvent):
     Relations express a semantic relationship between two or more entities.
     """
 
+    __slots__ = ("_name",)
+
+    name_pattern = RELATION_NAME
+
     def __init__(self, join_ref, ref, conversation, event, payload):
-        self._name = RELATION_NAME.match(event).group(
-            1
-        )  # let it raise if it doesn't match
+        self._name = _sub_name(event)
         super().__init__(join_ref, ref, conversation, event, payload)
 
     @property
@@ -402,20 +772,18 @@ class RelationRecognized(TimeScopedEvent):
         """[References to the Entities][uhlive.stream.conversation.EntityReference] involved in this relationship."""
         m = []
         speaker = self.speaker
-        print(self._payload)
         for ref in self._payload["components"]:
-            kind = (
-                ENTITY_NAME.match(ref["class"]).group(1) if ref["class"] else None  # type: ignore
-            )
-            if kind is not None:
-                m.append(EntityReference(kind, speaker, ref["id"]))
+            if ref["class"]:
+                m.append(
+                    EntityReference(_entity_name(ref["class"]), speaker, ref["id"])
+                )
         return m
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__} <{self._name}> for {self.components} [confidence: {self.confidence:.2f}]"
 
 
-EVENT_MAP = {
+EVENT_MAP: Dict[str, Type[Event]] = {
     "audio_words_decoded": AudioWordsDecoded,
     "audio_segment_decoded": AudioSegmentDecoded,
     "audio_segment_normalized": AudioSegmentNormalized,
@@ -425,3 +793,25 @@ EVENT_MAP = {
     "phx_reply": Ok,
     "phx_close": Ok,
 }
+
+EVENT_PREFIXES: Dict[str, Type[Event]] = {
+    "entity_": EntityRecognized,
+    "relation_": RelationRecognized,
+}
+
+_DISPATCH: Dict[str, Tuple[Type[Event], Optional[str]]] = {}
+_MAX_DISPATCH = 4096
+
+
+def _sub_name(event: str) -> str:
+    name = dispatch(event)[1]
+    if name is None:
+        raise ValueError(f"Unexpected event name '{event}'")
+    return name
+
+
+def _entity_name(name: str) -> str:
+    cls, entity_name = dispatch(name)
+    if entity_name is None or not issubclass(cls, EntityRecognized):
+        raise ValueError(f"Unexpected entity class '{name}'")
+    return entity_name
@@ -0,0 +1,120 @@
+"""
+Phoenix heartbeats, to keep idle connections open.
+"""
+
+from time import monotonic
+from typing import Any, Callable, List, Optional
+
+from ..codec import dumps
+
+PHOENIX_TOPIC = "phoenix"
+HEARTBEAT_INTERVAL = 30.0  # seconds, as the Phoenix javascript client
+
+
+class Heartbeat:
+    """Heartbeat messages of a connection.
+
+    The server closes connections on which it doesn't receive anything for a while.
+    When you don't stream audio, for example as a readonly observer, you have to send
+    heartbeats regularly. This object builds the heartbeat messages and tracks the server replies,
+    but doesn't do any I/O: your event loop schedules the sending from
+    [`delay()`][uhlive.stream.conversation.Heartbeat.delay] and passes
+    the received messages to [Conversation.receive][uhlive.stream.conversation.Conversation.receive]
+    (or [ConversationMux.receive][uhlive.stream.conversation.ConversationMux.receive]), as usual.
+
+    Example:
+        ```python
+        heartbeat = conversation.heartbeat
+        while True:
+            if heartbeat.expired():
+                raise ConnectionError("Server is not responding")
+            if heartbeat.due():
+                socket.send(heartbeat.beat())
+            socket.settimeout(heartbeat.delay())
+            try:
+                event = conversation.receive(socket.recv())
+            except WebSocketTimeoutException:
+                continue
+            ...
+        ```
+    """
+
+    def __init__(
+        self,
+        interval: float = HEARTBEAT_INTERVAL,
+        timeout: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Create a heartbeat schedule.
+
+        Args:
+            interval: the time between two heartbeats, in seconds.
+            timeout: the time after which an unanswered heartbeat means the connection is dead, in seconds.
+                     Defaults to `interval`.
+            clock: the time source, in seconds.
+        """
+        self.interval = interval
+        self.timeout = interval if timeout is None else timeout
+        self._clock = clock
+        self._ref = 0
+        self._pending: Optional[str] = None
+        self._sent_at = 0.0
+        self._next_due = clock() + interval
+        self._latency: Optional[float] = None
+
+    @property
+    def next_due(self) -> float:
+        """When the next heartbeat is due, according to the clock."""
+        return self._next_due
+
+    def delay(self) -> float:
+        """Time until the next heartbeat is due, in seconds; 0 if it is already due."""
+        return max(0.0, self._next_due - self._clock())
+
+    def due(self) -> bool:
+        """Is it time to send a heartbeat?"""
+        return self._clock() >= self._next_due
+
+    def expired(self) -> bool:
+        """Did the last heartbeat stay unanswered for more than `timeout`?"""
+        return (
+            self._pending is not None and self._clock() - self._sent_at >= self.timeout
+        )
+
+    @property
+    def pending(self) -> bool:
+        """Are we waiting for the reply to a heartbeat?"""
+        return self._pending is not None
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Round trip time of the last answered heartbeat, in seconds."""
+        return self._latency
+
+    def beat(self) -> str:
+        """Build a heartbeat message and schedule the next one.
+
+        Returns:
+            The text websocket message to send to the server.
+        """
+        self._ref += 1
+        ref = str(self._ref)
+        now = self._clock()
+        self._pending = ref
+        self._sent_at = now
+        self._next_due = now + self.interval
+        return dumps([None, ref, PHOENIX_TOPIC, "heartbeat", {}])
+
+    def acknowledge(self, message: List[Any]) -> bool:
+        """Handle a decoded message of the `phoenix` topic.
+
+        Returns:
+            Whether the message is the reply to the pending heartbeat.
+        """
+        if message[3] != "phx_reply" or message[1] is None:
+            return False
+        if str(message[1]) != self._pending:
+            return False
+        self._pending = None
+        self._latency = self._clock() - self._sent_at
+        return True
@@ -2,13 +2,90 @@
 Display helpers.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
-local_tz = datetime.now().astimezone().tzinfo
+
+def _local_tz() -> Optional[tzinfo]:
+    return datetime.now().astimezone().tzinfo
+
+
+# isoformat omits the fraction when it is zero
+_SECONDS = [f":{second:02d}" for second in range(60)]
+_MILLISECONDS = [""] + [f".{millisecond:03d}000" for millisecond in range(1, 1000)]
+
+
+class TimestampFormatter:
+    """Format Unix timestamps in millisecond as human readable dates.
+
+    The output is the same as `datetime.fromtimestamp(timestamp / 1000.0, tz).isoformat(sep=" ")`,
+    but the date, hour, minute and UTC offset part is cached for the current minute, so formatting
+    consecutive timestamps mostly costs the formatting of the seconds and milliseconds.
+    """
+
+    __slots__ = ("_cache", "_tz")
+
+    def __init__(self, tz: Union[tzinfo, str, None] = None) -> None:
+        """Create a formatter.
+
+        Args:
+            tz: the time zone of the output, as `tzinfo` or IANA name (e.g. `"Europe/Paris"`).
+                By default, the local time zone, resolved on first use.
+        """
+        self._tz = tz
+        self._cache: Tuple[Optional[int], str, str] = (None, "", "")
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        """The time zone of the output."""
+        tz = self._tz
+        if tz is None:
+            tz = self._tz = _local_tz()
+        elif isinstance(tz, str):
+            tz = self._tz = ZoneInfo(tz)
+        return tz
+
+    def __call__(self, timestamp: int) -> str:
+        """Human readable representation of a unix timestamp in millisecond."""
+        if type(timestamp) is not int:
+            return self._format(timestamp)
+        minute, millisecond = divmod(timestamp, 60_000)
+        cached_minute, prefix, suffix = self._cache
+        if minute != cached_minute:
+            at = datetime.fromtimestamp(minute * 60, self.tz)
+            offset = at.utcoffset()
+            if offset is not None and offset % timedelta(minutes=1):
+                # Historical offsets with seconds don't align on UTC minutes.
+                return self._format(timestamp)
+            # "YYYY-MM-DD HH:MM" + UTC offset, if any
+            formatted = at.isoformat(sep=" ", timespec="minutes")
+            prefix = formatted[:16]
+            suffix = formatted[16:]
+            self._cache = (minute, prefix, suffix)
+        second, millisecond = divmod(millisecond, 1000)
+        return prefix + _SECONDS[second] + _MILLISECONDS[millisecond] + suffix
+
+    def _format(self, timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp / 1000.0, self.tz).isoformat(sep=" ")
+
+
+_formatter = TimestampFormatter()
+
+
+def set_timezone(tz: Union[tzinfo, str, None]) -> None:
+    """Set the time zone used by `human_datetime`, see [TimestampFormatter][uhlive.stream.conversation.human_datetime.TimestampFormatter]."""
+    global _formatter
+    _formatter = TimestampFormatter(tz)
 
 
 def human_datetime(timestamp):
     """Human readable representation of unix timestamp date."""
-    utc_dt = datetime.fromtimestamp(timestamp / 1000.0, local_tz)
+    return _formatter(timestamp)
+
 
-    return utc_dt.isoformat(sep=" ")
+def __getattr__(name: str) -> Any:
+    # `local_tz` used to be computed at import time.
+    if name == "local_tz":
+        return _local_tz()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
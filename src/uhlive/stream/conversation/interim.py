@@ -0,0 +1,129 @@
+"""
+Reduce the interim results of a conversation to incremental updates.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .events import AudioSegmentDecoded, AudioWordsDecoded, Event, SpeakerLeft, Word
+
+
+class HypothesisDiff:
+    """An update of the transcript hypothesis of an utterance.
+
+    The new hypothesis is made of the first `keep` words of the previous one, followed by `words`.
+    """
+
+    __slots__ = ("final", "id", "keep", "speaker", "words")
+
+    speaker: str
+    """The speaker of the utterance."""
+    id: str
+    """The utterance id."""
+    keep: int
+    """Length of the stable prefix: how many words of the previous hypothesis are kept."""
+    words: List[Word]
+    """The words that replace the rest of the previous hypothesis."""
+    final: bool
+    """Is it the final transcript of the utterance?"""
+
+    def __init__(
+        self, speaker: str, id: str, keep: int, words: List[Word], final: bool
+    ) -> None:
+        self.speaker = speaker
+        self.id = id
+        self.keep = keep
+        self.words = words
+        self.final = final
+
+    def apply(self, words: List[Any]) -> List[Any]:
+        """Compute the new hypothesis from the previous one."""
+        return words[: self.keep] + self.words
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A JSON serializable representation, to forward the diff."""
+        return {
+            "speaker": self.speaker,
+            "id": self.id,
+            "keep": self.keep,
+            "words": self.words,
+            "final": self.final,
+        }
+
+    def __repr__(self) -> str:
+        return f"HypothesisDiff({self.speaker}/{self.id}: keep {self.keep}, {[w.value for w in self.words]}{', final' if self.final else ''})"
+
+
+class InterimCoalescer:
+    """Turn the stream of interim results into compact diffs.
+
+    With `interim_results=True`, the server sends several
+    [`AudioWordsDecoded`][uhlive.stream.conversation.AudioWordsDecoded] events for each utterance,
+    each repeating the whole hypothesis so far, then an
+    [`AudioSegmentDecoded`][uhlive.stream.conversation.AudioSegmentDecoded] with the final transcript.
+    The coalescer tracks the current hypothesis of each utterance and only reports what changed:
+
+    ```python
+    coalescer = InterimCoalescer()
+    while True:
+        event = conversation.receive(socket.recv())
+        diff = coalescer.feed(event)
+        if diff is not None:
+            fan_out(diff.to_dict())
+    ```
+
+    Words are compared by value and start time: a hypothesis that only differs from the previous one
+    by the confidence of its words is not reported.
+
+    The state of an utterance is evicted when its final transcript arrives, when its speaker
+    leaves, or when more than `max_utterances` utterances are pending.
+    """
+
+    def __init__(self, max_utterances: int = 1000) -> None:
+        self.max_utterances = max_utterances
+        self._hypotheses: "OrderedDict[Tuple[str, str], List[Word]]" = OrderedDict()
+
+    def feed(self, event: Optional[Event]) -> Optional[HypothesisDiff]:
+        """Update the state with a received event.
+
+        Returns:
+            The diff to the previous hypothesis if the event is a transcript event that changed it,
+            otherwise `None`.
+        """
+        if isinstance(event, AudioWordsDecoded):
+            final = False
+        elif isinstance(event, AudioSegmentDecoded):
+            final = True
+        else:
+            if isinstance(event, SpeakerLeft):
+                self.discard(event.speaker)
+            return None
+        key = (event.speaker, event.id)
+        words = event.components
+        if final:
+            previous = self._hypotheses.pop(key, [])
+        else:
+            previous = self._hypotheses.get(key, [])
+            self._hypotheses[key] = words
+            self._hypotheses.move_to_end(key)
+            if len(self._hypotheses) > self.max_utterances:
+                self._hypotheses.popitem(last=False)
+        keep = 0
+        for old, new in zip(previous, words):
+            # the confidence and the timing of the end of a word can change from one interim
+            # to the next, that's not worth a diff
+            if old["value"] != new["value"] or old["start"] != new["start"]:
+                break
+            keep += 1
+        if not final and keep == len(previous) == len(words):
+            return None
+        return HypothesisDiff(key[0], key[1], keep, words[keep:], final)
+
+    def discard(self, speaker: str) -> None:
+        """Forget the pending utterances of `speaker`."""
+        for key in [key for key in self._hypotheses if key[0] == speaker]:
+            del self._hypotheses[key]
+
+    def __len__(self) -> int:
+        """Number of pending utterances."""
+        return len(self._hypotheses)
@@ -0,0 +1,113 @@
+"""
+Several conversations over a single connection.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from ..codec import loads
+from .client import Conversation, ProtocolError, parse_envelope
+from .events import Event
+from .heartbeat import PHOENIX_TOPIC, Heartbeat
+
+
+class ConversationMux:
+    """Join several conversations on the same connection (socket).
+
+    The Phoenix protocol multiplexes channels, identified by their topic, over a single
+    websocket. The `ConversationMux` creates the [Conversation][uhlive.stream.conversation.Conversation]
+    objects, each with its own join ref, request counter and state, and routes the received messages
+    to them by topic.
+
+    You still use each `Conversation` to build the messages to send (join, audio chunks, leave), and
+    send them on the shared connection. The connection [heartbeat][uhlive.stream.conversation.Heartbeat]
+    is the one of the mux.
+
+    Example:
+        ```python
+        mux = ConversationMux()
+        for speaker in speakers:
+            conversation = mux.conversation(identifier, conversation_id, speaker)
+            socket.send(conversation.join(readonly=True))
+        while True:
+            conversation, event = mux.receive(socket.recv())
+            ...
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._conversations: Dict[str, Conversation] = {}
+        self._join_ref = 0
+        self.heartbeat = Heartbeat()
+        """The [heartbeat][uhlive.stream.conversation.Heartbeat] schedule of the connection."""
+
+    def conversation(
+        self, identifier: str, conversation_id: str, speaker: str, **kwargs: Any
+    ) -> Conversation:
+        """Create a [Conversation][uhlive.stream.conversation.Conversation] on this connection.
+
+        The arguments are those of the `Conversation` constructor, except `join_ref` that is
+        allocated by the mux.
+
+        Raises:
+            ProtocolError: if there is already a conversation with the same topic on this connection.
+        """
+        conversation = Conversation(
+            identifier, conversation_id, speaker, join_ref=self._join_ref + 1, **kwargs
+        )
+        if conversation.topic in self._conversations:
+            raise ProtocolError(f"Already in {conversation.topic} on this connection!")
+        self._join_ref += 1
+        self._conversations[conversation.topic] = conversation
+        return conversation
+
+    def remove(self, conversation: Conversation) -> None:
+        """Forget a conversation, once it is [left][uhlive.stream.conversation.Conversation.left].
+
+        Raises:
+            ProtocolError: if the conversation is still joined.
+        """
+        if not conversation.left:
+            raise ProtocolError("Leave the conversation first!")
+        del self._conversations[conversation.topic]
+
+    def get(self, topic: str) -> Optional[Conversation]:
+        """The conversation of the given topic, if any."""
+        return self._conversations.get(topic)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __iter__(self) -> Iterator[Conversation]:
+        return iter(list(self._conversations.values()))
+
+    def receive(
+        self, data: Union[str, bytes]
+    ) -> Tuple[Optional[Conversation], Optional[Event]]:
+        """Decode received websocket message and route it to its conversation.
+
+        Only the envelope of the message is parsed to find the conversation; the event itself
+        is decoded by the conversation, with its own settings.
+
+        Returns:
+            The conversation the message is for, and the event, as returned by
+            [`Conversation.receive`][uhlive.stream.conversation.Conversation.receive].
+            Heartbeat replies are for the connection: they give `(None, None)`.
+            So do the messages for a topic that is not, or no longer, on this connection,
+            like the late replies for a conversation [removed][uhlive.stream.conversation.ConversationMux.remove].
+        """
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        envelope = parse_envelope(data)
+        if envelope is None or envelope[2] == PHOENIX_TOPIC:
+            message = loads(data)
+            if message[2] == PHOENIX_TOPIC:
+                self.heartbeat.acknowledge(message)
+                return None, None
+            conversation = self._conversations.get(message[2])
+            if conversation is None:
+                return None, None
+            return conversation, conversation._handle(message)
+        conversation = self._conversations.get(envelope[2])
+        if conversation is None:
+            return None, None
+        return conversation, conversation._receive(data, envelope)
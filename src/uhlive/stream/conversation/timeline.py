@@ -0,0 +1,185 @@
+"""
+Time index of the annotations of a conversation.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Type
+
+from .events import (
+    AudioSegmentDecoded,
+    AudioSegmentNormalized,
+    EntityRecognized,
+    Event,
+    RelationRecognized,
+    TagsSet,
+    TimeScopedEvent,
+)
+
+DEFAULT_KINDS: Tuple[Type[TimeScopedEvent], ...] = (
+    AudioSegmentDecoded,
+    AudioSegmentNormalized,
+    EntityRecognized,
+    TagsSet,
+    RelationRecognized,
+)
+"""The events indexed by default: final segments and annotations."""
+
+
+class _Index:
+    """The indexed events of one class, sorted by start time."""
+
+    __slots__ = ("ends", "events", "max_length", "starts")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.events: List[TimeScopedEvent] = []
+        # min-heap, to find the events to evict
+        self.ends: List[int] = []
+        self.max_length = 0
+
+    def add(self, event: TimeScopedEvent, start: int, end: int) -> None:
+        if end - start > self.max_length:
+            self.max_length = end - start
+        heapq.heappush(self.ends, end)
+        if not self.starts or start >= self.starts[-1]:
+            self.starts.append(start)
+            self.events.append(event)
+        else:
+            i = bisect_right(self.starts, start)
+            self.starts.insert(i, start)
+            self.events.insert(i, event)
+
+    def evict(self, horizon: int) -> int:
+        """Remove the events that ended before `horizon`, return how many."""
+        ends = self.ends
+        expired = 0
+        while ends and ends[0] < horizon:
+            heapq.heappop(ends)
+            expired += 1
+        if not expired:
+            return 0
+        events = self.events
+        count = 0
+        for event in events:
+            if event.end >= horizon:
+                break
+            count += 1
+        if count == expired:
+            # usual case: the expired events are the oldest ones
+            longest = max(event.end - event.start for event in events[:count])
+            del self.starts[:count]
+            del events[:count]
+            if longest < self.max_length:
+                return expired
+        else:
+            # an event that started earlier is still running
+            events[:] = [event for event in events if event.end >= horizon]
+            self.starts = array("q", (event.start for event in events))
+        self.max_length = max((event.end - event.start for event in events), default=0)
+        return expired
+
+    def overlapping(self, t0: int, t1: int) -> List[TimeScopedEvent]:
+        lo = bisect_left(self.starts, t0 - self.max_length)
+        hi = bisect_right(self.starts, t1)
+        return [event for event in self.events[lo:hi] if event.end >= t0]
+
+
+class TimelineIndex:
+    """An incremental interval index over [time scoped events][uhlive.stream.conversation.events.TimeScopedEvent].
+
+    Feed it the events as they arrive, and ask which segments, entities, tags or relations
+    cover a given instant or overlap a given time range:
+
+    ```python
+    timeline = TimelineIndex(retention=15 * 60 * 1000)
+    while True:
+        event = conversation.receive(socket.recv())
+        timeline.add(event)
+        ...
+    # What was going on at that instant?
+    timeline.at(t, EntityRecognized, TagsSet)
+    ```
+
+    Events are kept sorted by start time, separately for each event class. Queries bisect the start
+    times, widened by the length of the longest event of the class, so they run in logarithmic time
+    plus the size of the result: a long segment doesn't slow down the queries on entities.
+    """
+
+    def __init__(
+        self,
+        kinds: Tuple[Type[TimeScopedEvent], ...] = DEFAULT_KINDS,
+        retention: Optional[int] = None,
+    ) -> None:
+        """Create an empty index.
+
+        Args:
+            kinds: the event classes to index, others are ignored.
+            retention: if given, the events that ended more than `retention` milliseconds
+                       before the end of the latest event are evicted from the index.
+        """
+        self.kinds = kinds
+        self.retention = retention
+        self._indexes: Dict[type, _Index] = {}
+        self._count = 0
+        self._latest_end = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, event: Optional[Event]) -> bool:
+        """Index an event.
+
+        Events that are not of the indexed kinds are ignored, so you can pass all the events you receive.
+
+        Returns:
+            `True` if the event was indexed, `False` if it is ignored or already out of the retention period.
+        """
+        if not isinstance(event, self.kinds):
+            return False
+        end = event.end
+        if self.retention is not None and end < self._latest_end - self.retention:
+            return False
+        index = self._indexes.get(type(event))
+        if index is None:
+            index = self._indexes[type(event)] = _Index()
+        index.add(event, event.start, end)
+        self._count += 1
+        if end > self._latest_end:
+            self._latest_end = end
+            if self.retention is not None:
+                horizon = end - self.retention
+                for index in self._indexes.values():
+                    self._count -= index.evict(horizon)
+        return True
+
+    def overlapping(
+        self, t0: int, t1: int, *kinds: Type[TimeScopedEvent]
+    ) -> List[TimeScopedEvent]:
+        """The indexed events that overlap the time range [t0, t1], sorted by start time.
+
+        Args:
+            t0: start of the range, as Unix timestamp in millisecond, according to audio timeline.
+            t1: end of the range (included).
+            *kinds: if given, only return events of those classes.
+        """
+        found = [
+            index.overlapping(t0, t1)
+            for cls, index in self._indexes.items()
+            if not kinds or issubclass(cls, kinds)
+        ]
+        if len(found) == 1:
+            return found[0]
+        return list(heapq.merge(*found, key=lambda event: event.start))
+
+    def at(
+        self, timestamp: int, *kinds: Type[TimeScopedEvent]
+    ) -> List[TimeScopedEvent]:
+        """The indexed events that cover `timestamp`, sorted by start time.
+
+        Args:
+            timestamp: as Unix timestamp in millisecond, according to audio timeline.
+            *kinds: if given, only return events of those classes.
+        """
+        return self.overlapping(timestamp, timestamp, *kinds)
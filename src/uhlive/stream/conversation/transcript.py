@@ -0,0 +1,193 @@
+"""
+In memory transcript of long conversations, indexed by time.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from .events import (
+    AudioSegmentDecoded,
+    AudioSegmentNormalized,
+    AudioSpeechDecoded,
+    Event,
+    Word,
+)
+
+
+class _SpeakerWords:
+    """Columns of the words of a speaker, sorted by start time."""
+
+    __slots__ = ("confidences", "ends", "lengths", "max_ends", "starts", "values")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.ends = array("q")
+        self.lengths = array("q")
+        self.confidences = array("d")
+        self.values: List[str] = []
+        # running maximum of `ends`: the words before `bisect_right(max_ends, t)` all end by `t`
+        self.max_ends = array("q")
+
+    def add(self, event: AudioSpeechDecoded) -> None:
+        columns = event.columns
+        if not columns:
+            return
+        if not self.starts or columns.starts[0] >= self.starts[-1]:
+            i = len(self.starts)
+            self.starts.extend(columns.starts)
+            self.ends.extend(columns.ends)
+            self.lengths.extend(columns.lengths)
+            self.confidences.extend(columns.confidences)
+            self.values.extend(columns.values)
+        else:
+            # Late segment: merge its words with the ones that start after it, in one pass.
+            i = bisect_left(self.starts, columns.starts[0])
+            rows = list(
+                merge(
+                    zip(
+                        self.starts[i:],
+                        self.ends[i:],
+                        self.lengths[i:],
+                        self.confidences[i:],
+                        self.values[i:],
+                    ),
+                    zip(
+                        columns.starts,
+                        columns.ends,
+                        columns.lengths,
+                        columns.confidences,
+                        columns.values,
+                    ),
+                    key=itemgetter(0),
+                )
+            )
+            starts, ends, lengths, confidences, values = zip(*rows)
+            self.starts[i:] = array("q", starts)
+            self.ends[i:] = array("q", ends)
+            self.lengths[i:] = array("q", lengths)
+            self.confidences[i:] = array("d", confidences)
+            self.values[i:] = values
+        del self.max_ends[i:]
+        running = self.max_ends[-1] if self.max_ends else self.ends[i]
+        for end in self.ends[i:]:
+            if end > running:
+                running = end
+            self.max_ends.append(running)
+
+    def range(self, t0: int, t1: int) -> Iterator[int]:
+        """Indexes of the words overlapping [t0, t1)."""
+        ends = self.ends
+        for i in range(bisect_right(self.max_ends, t0), bisect_left(self.starts, t1)):
+            if ends[i] > t0:
+                yield i
+
+    def word(self, i: int) -> Word:
+        return Word(
+            start=self.starts[i],
+            end=self.ends[i],
+            length=self.lengths[i],
+            value=self.values[i],
+            confidence=self.confidences[i],
+        )
+
+
+class TranscriptBuffer:
+    """Accumulate the final transcript of a conversation and query it by time range.
+
+    Feed it the events you receive; it keeps the words of the final segments
+    in compact array columns per speaker, and answers time range queries in
+    logarithmic time, however long the conversation.
+
+    ```python
+    transcript = TranscriptBuffer()
+    while True:
+        event = conversation.receive(socket.recv())
+        transcript.add(event)
+        ...
+    # What was said in the last minute?
+    print(transcript.text(now - 60000, now))
+    ```
+    """
+
+    def __init__(self, normalized: bool = False) -> None:
+        """Create an empty transcript.
+
+        Args:
+            normalized: if `True`, the transcript is built from the
+                        `AudioSegmentNormalized` events instead of the `AudioSegmentDecoded` ones.
+        """
+        self._source: Type[AudioSpeechDecoded] = (
+            AudioSegmentNormalized if normalized else AudioSegmentDecoded
+        )
+        self._speakers: Dict[str, _SpeakerWords] = {}
+
+    def add(self, event: Optional[Event]) -> bool:
+        """Add the words of a final transcript event.
+
+        Other events are ignored, so you can pass all the events you receive.
+
+        Returns:
+            `True` if the event was added.
+        """
+        if not isinstance(event, self._source):
+            return False
+        speaker = event.speaker
+        words = self._speakers.get(speaker)
+        if words is None:
+            words = self._speakers[speaker] = _SpeakerWords()
+        words.add(event)
+        return True
+
+    @property
+    def speakers(self) -> List[str]:
+        """The speakers found in the transcript so far."""
+        return list(self._speakers)
+
+    def __len__(self) -> int:
+        return sum(len(words.values) for words in self._speakers.values())
+
+    def words(
+        self, t0: int, t1: int, speaker: Optional[str] = None
+    ) -> List[Tuple[str, Word]]:
+        """The words that overlap the time range [t0, t1).
+
+        Args:
+            t0: start of the range, as Unix timestamp in millisecond, according to audio timeline.
+            t1: end of the range (excluded).
+            speaker: restrict the search to that speaker.
+
+        Returns:
+            `(speaker, word)` couples, sorted by start time.
+        """
+        if speaker is not None:
+            speakers = [speaker] if speaker in self._speakers else []
+        else:
+            speakers = list(self._speakers)
+        found = [
+            [
+                (self._speakers[s].starts[i], s, i)
+                for i in self._speakers[s].range(t0, t1)
+            ]
+            for s in speakers
+        ]
+        ordered: Iterable[Tuple[int, str, int]] = (
+            found[0] if len(found) == 1 else merge(*found)
+        )
+        return [(s, self._speakers[s].word(i)) for _, s, i in ordered]
+
+    def text(self, t0: int, t1: int, speaker: Optional[str] = None) -> str:
+        """The transcript of the time range [t0, t1), as a string."""
+        return " ".join(word.value for _, word in self.words(t0, t1, speaker))
+
+    def text_around(
+        self,
+        timestamp: int,
+        before: int = 5000,
+        after: int = 5000,
+        speaker: Optional[str] = None,
+    ) -> str:
+        """The transcript from `before` milliseconds before `timestamp` to `after` milliseconds after it."""
+        return self.text(timestamp - before, timestamp + after, speaker)
@@ -75,7 +75,7 @@ import os
 from typing import Tuple
 from urllib.parse import urljoin
 
-from .client import ProtocolError, Recognizer
+from .client import PipelineError, ProtocolError, Recognizer
 from .events import (
     Closed,
     CompletionCause,
@@ -98,6 +98,8 @@ from .events import (
     Stopped,
     Transcript,
 )
+from .pending import PendingRequests, RequestFailed
+from .pool import RecognitionSession, RecognizerPool
 
 SERVER = os.getenv("UHLIVE_API_URL", "wss://api.uh.live")
 
@@ -111,7 +113,12 @@ def build_connection_request(token) -> Tuple[str, dict]:
 
 __all__ = [
     "ProtocolError",
+    "PipelineError",
     "Recognizer",
+    "PendingRequests",
+    "RequestFailed",
+    "RecognitionSession",
+    "RecognizerPool",
     "build_connection_request",
     "Event",
     "CompletionCause",
@@ -2,23 +2,29 @@
 Object oriented abstraction over the H2B API protocol and workflow.
 """
 
-import json
+from collections import deque
 from enum import Enum
-from typing import Any, Dict, Union
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple, Type, Union
 
+from ..codec import dumps
 from .events import (
     Closed,
+    DefaultParams,
     Event,
+    GrammarDefined,
+    InputTimersStarted,
     Opened,
+    ParamsSet,
     RecognitionComplete,
     RecognitionInProgress,
+    StartOfInput,
     Stopped,
     deserialize,
 )
 
 
 def serialize(cmd: Dict[str, Any]) -> str:
-    return json.dumps(cmd, ensure_ascii=False, indent=None, separators=(",", ":"))
+    return dumps(cmd)
 
 
 class ProtocolError(RuntimeError):
@@ -35,6 +41,42 @@ class State(Enum):
     Recognition = "On-going Recognition State"
 
 
+class PipelinedCommand(NamedTuple):
+    """A command sent in pipelining mode, waiting for its reply."""
+
+    request_id: int
+    command: str
+    reply: Type[Event]
+    state: Optional[State]  # the state after success, if it changes
+
+
+class PipelineError(ProtocolError):
+    """Exception raised by [Recognizer.receive][uhlive.stream.recognition.Recognizer.receive]
+    in pipelining mode, when a command didn't get the expected reply."""
+
+    def __init__(self, command: PipelinedCommand, event: Event) -> None:
+        self.command = command
+        """The offending command."""
+        self.event = event
+        """The reply the server sent instead."""
+        super().__init__(
+            f"{command.command} (request {command.request_id}) failed: {event.__class__.__name__} – {event.completion_reason}"
+        )
+
+
+# The successful reply to each command, and the state it leads to.
+REPLIES: Dict[str, Tuple[Type[Event], Optional[State]]] = {
+    "OPEN": (Opened, State.IdleSession),
+    "SET-PARAMS": (ParamsSet, None),
+    "GET-PARAMS": (DefaultParams, None),
+    "DEFINE-GRAMMAR": (GrammarDefined, None),
+    "RECOGNIZE": (RecognitionInProgress, State.Recognition),
+    "START-INPUT-TIMERS": (InputTimersStarted, None),
+    "STOP": (Stopped, State.IdleSession),
+    "CLOSE": (Closed, State.NoSession),
+}
+
+
 class Recognizer:
     """The connection state machine.
 
@@ -42,12 +84,35 @@ class Recognizer:
     make command frames by calling the appropriate methods.
     If you call a method that is not appropriate in the current protocol
     state, a `ProtocolError` is raised.
+
+    By default, the current protocol state is the one confirmed by the server,
+    so you have to wait for the reply to a command before you can send a command
+    that depends on it (e.g. `set_params()` after `open()`).
+    In pipelining mode, the commands are checked against the state the server will be in
+    once all the commands sent are successful, so you can send a whole session setup in one burst:
+
+    ```python
+    recognizer = Recognizer(pipelining=True)
+    socket.send(recognizer.open())
+    socket.send(recognizer.set_params(speech_language="fr"))
+    socket.send(recognizer.define_grammar("speech/keywords?alternatives=oui|non", "yesno"))
+    # Each reply is checked, in order, against the command it answers
+    while recognizer.in_flight:
+        recognizer.receive(socket.recv())  # raises PipelineError if a command failed
+    ```
     """
 
-    def __init__(self) -> None:
+    def __init__(self, pipelining: bool = False) -> None:
+        """Create a new protocol state machine.
+
+        Args:
+            pipelining: enable the pipelining mode.
+        """
         self._state: State = State.NoSession
         self._request_id = 0
         self._channel_id = ""
+        self._pipelining = pipelining
+        self._in_flight: Deque[PipelinedCommand] = deque()
 
     # Workflow methods
 
@@ -80,12 +145,12 @@ class Recognizer:
         Raises:
             ProtocolError: if a session is already open.
         """
-        if self._state != State.NoSession:
+        if self._command_state != State.NoSession:
             raise ProtocolError("Session already opened!")
         return serialize(
             {
                 "command": "OPEN",
-                "request_id": self.request_id,
+                "request_id": self._track("OPEN"),
                 "channel_id": channel_id,
                 "headers": {
                     "custom_id": custom_id,
@@ -105,7 +170,7 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state == State.NoSession:
+        if self._command_state == State.NoSession:
             raise ProtocolError("You must open a session first!")
         return chunk
 
@@ -122,8 +187,9 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state != State.IdleSession:
-            raise ProtocolError(f"Method not available in this state ({self._state})!")
+        state = self._command_state
+        if state != State.IdleSession:
+            raise ProtocolError(f"Method not available in this state ({state})!")
         return self.command("SET-PARAMS", params)
 
     def get_params(self) -> str:
@@ -135,8 +201,9 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state != State.IdleSession:
-            raise ProtocolError(f"Method not available in this state ({self._state})!")
+        state = self._command_state
+        if state != State.IdleSession:
+            raise ProtocolError(f"Method not available in this state ({state})!")
         return self.command("GET-PARAMS")
 
     def define_grammar(self, builtin: str, alias: str) -> str:
@@ -152,8 +219,9 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state != State.IdleSession:
-            raise ProtocolError(f"Method not available in this state ({self._state})!")
+        state = self._command_state
+        if state != State.IdleSession:
+            raise ProtocolError(f"Method not available in this state ({state})!")
         return self.command(
             "DEFINE-GRAMMAR",
             {"content_id": alias, "content_type": "text/uri-list"},
@@ -183,8 +251,9 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state != State.IdleSession:
-            raise ProtocolError(f"Method not available in this state ({self._state})!")
+        state = self._command_state
+        if state != State.IdleSession:
+            raise ProtocolError(f"Method not available in this state ({state})!")
         return self.command(
             "RECOGNIZE",
             headers={
@@ -205,8 +274,9 @@ class Recognizer:
         Raises:
             ProtocolError: if no session opened.
         """
-        if self._state != State.IdleSession:
-            raise ProtocolError(f"Method not available in this state ({self._state})!")
+        state = self._command_state
+        if state != State.IdleSession:
+            raise ProtocolError(f"Method not available in this state ({state})!")
         return self.command("CLOSE")
 
     def start_input_timers(self) -> str:
@@ -219,7 +289,7 @@ class Recognizer:
         Raises:
             ProtocolError: if no on-going recognition process
         """
-        if self._state != State.Recognition:
+        if self._command_state != State.Recognition:
             raise ProtocolError("Command is only valid during recognition!")
         return self.command("START-INPUT-TIMERS")
 
@@ -232,7 +302,7 @@ class Recognizer:
         Raises:
             ProtocolError: if no on-going recognition process
         """
-        if self._state != State.Recognition:
+        if self._command_state != State.Recognition:
             raise ProtocolError("Command is only valid during recognition!")
         return self.command("STOP")
 
@@ -243,6 +313,46 @@ class Recognizer:
         self._request_id += 1
         return self._request_id
 
+    @property
+    def last_request_id(self) -> int:
+        """The `request_id` of the last command built, to correlate it with its reply.
+
+        See [`PendingRequests`][uhlive.stream.recognition.PendingRequests].
+        """
+        return self._request_id
+
+    @property
+    def in_flight(self) -> int:
+        """In pipelining mode, the number of commands waiting for their reply."""
+        return len(self._in_flight)
+
+    @property
+    def _command_state(self) -> State:
+        # The state in which the next command will be processed by the server.
+        if self._pipelining:
+            for command in reversed(self._in_flight):
+                if command.state is not None:
+                    return command.state
+        return self._state
+
+    def _track(self, name: str) -> int:
+        request_id = self.request_id
+        if self._pipelining and name in REPLIES:
+            reply, state = REPLIES[name]
+            self._in_flight.append(PipelinedCommand(request_id, name, reply, state))
+        return request_id
+
+    def _check_reply(self, event: Event) -> None:
+        if (
+            isinstance(event, (StartOfInput, RecognitionComplete))
+            or not self._in_flight
+        ):
+            return
+        # The server processes the commands in order.
+        command = self._in_flight.popleft()
+        if not isinstance(event, command.reply):
+            raise PipelineError(command, event)
+
     @property
     def channel_id(self) -> str:
         """The current session ID."""
@@ -255,9 +365,14 @@ class Recognizer:
 
         Returns:
             The appropriate `Event` subclass.
+
+        Raises:
+            PipelineError: in pipelining mode, if the event is not the expected reply to the oldest command in flight.
         """
         assert type(data) is str  # to please mypy
         event = deserialize(data)
+        if self._pipelining:
+            self._check_reply(event)
         if isinstance(event, RecognitionInProgress):
             self._state = State.Recognition
         elif isinstance(event, (RecognitionComplete, Stopped)):
@@ -273,7 +388,7 @@ class Recognizer:
         return serialize(
             {
                 "command": name,
-                "request_id": self.request_id,
+                "request_id": self._track(name),
                 "channel_id": self.channel_id,
                 "headers": headers,
                 "body": body,
@@ -4,11 +4,12 @@ Data model for events returned by the H2B server.
 See also https://docs.allo-media.net/stream-h2b/protocols/websocket/#websocket-for-voicebots.
 """
 
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+from ..codec import loads
+
 
 class CompletionCause(Enum):
     """The set of possible completion causes.
@@ -30,15 +31,33 @@ class CompletionCause(Enum):
     PartialMatch = "PartialMatch"
 
 
+def _utc_datetime(timestamp: int) -> datetime:
+    # naive UTC datetime, as the deprecated `datetime.utcfromtimestamp`
+    return datetime.fromtimestamp(timestamp / 1000.0, timezone.utc).replace(tzinfo=None)
+
+
 class Transcript:
     """The Transcript part of a recognition result"""
 
+    __slots__ = (
+        "_confidence",
+        "_end",
+        "_end_ms",
+        "_phones",
+        "_start",
+        "_start_ms",
+        "_transcript",
+    )
+
+    _start: datetime
+    _end: datetime
+
     def __init__(self, data: Dict[str, Any]) -> None:
         self._transcript: str = data["transcript"]
         self._phones: str = data.get("phones", "")
         self._confidence: float = float(data["confidence"])
-        self._start = datetime.utcfromtimestamp(data["start"] / 1000.0)
-        self._end = datetime.utcfromtimestamp(data["end"] / 1000.0)
+        self._start_ms: int = data["start"]
+        self._end_ms: int = data["end"]
 
     @property
     def transcript(self) -> str:
@@ -57,13 +76,31 @@ class Transcript:
 
     @property
     def start(self) -> datetime:
-        """Start of speech."""
-        return self._start
+        """Start of speech, as naive UTC datetime."""
+        try:
+            return self._start
+        except AttributeError:
+            start = self._start = _utc_datetime(self._start_ms)
+            return start
 
     @property
     def end(self) -> datetime:
-        """End of speech."""
-        return self._end
+        """End of speech, as naive UTC datetime."""
+        try:
+            return self._end
+        except AttributeError:
+            end = self._end = _utc_datetime(self._end_ms)
+            return end
+
+    @property
+    def start_ms(self) -> int:
+        """Start of speech, as Unix timestamp in millisecond."""
+        return self._start_ms
+
+    @property
+    def end_ms(self) -> int:
+        """End of speech, as Unix timestamp in millisecond."""
+        return self._end_ms
 
     def __str__(self) -> str:
         return f'"{self._transcript}" [{self.phones}] ({self._confidence})'
@@ -72,6 +109,8 @@ class Transcript:
 class Interpretation:
     """The interpretation part of a recognition result"""
 
+    __slots__ = ("_confidence", "_type", "_value")
+
     def __init__(self, data: Dict[str, Any]) -> None:
         self._type: str = data["type"]
         self._value: Dict[str, Any] = data["value"]
@@ -102,64 +141,79 @@ class Interpretation:
 
 
 class RecogResult:
-    """When a recognition completes, this describe the result"""
+    """When a recognition completes, this describe the result.
+
+    The transcript, interpretation and alternatives are built on first access.
+    """
+
+    __slots__ = ("_alternatives", "_asr", "_data", "_nlu")
+
+    _asr: Optional[Transcript]
+    _nlu: Optional[Interpretation]
+    _alternatives: List["RecogResult"]
 
     def __init__(self, data: dict) -> None:
-        self._asr: Optional[Transcript] = (
-            None if not data["asr"] else Transcript(data["asr"])
-        )
-        self._nlu: Optional[Interpretation] = (
-            None if not data["nlu"] else Interpretation(data["nlu"])
-        )
-        self._grammar_uri: str = data["grammar_uri"]
-        if "alternatives" in data:
-            self._alternatives = [RecogResult(alt) for alt in data["alternatives"]]
+        self._data = data
 
     @property
     def asr(self) -> Optional[Transcript]:
         """The ASR part of the result ([transcription][uhlive.stream.recognition.Transcript] result)"""
-        return self._asr
+        try:
+            return self._asr
+        except AttributeError:
+            data = self._data["asr"]
+            asr = self._asr = Transcript(data) if data else None
+            return asr
 
     @property
     def nlu(self) -> Optional[Interpretation]:
         """The NLU part of the result ([interpretation][uhlive.stream.recognition.Interpretation])"""
-        return self._nlu
+        try:
+            return self._nlu
+        except AttributeError:
+            data = self._data["nlu"]
+            nlu = self._nlu = Interpretation(data) if data else None
+            return nlu
 
     @property
     def grammar_uri(self) -> str:
         """The grammar that matched, as it was given to the `RECOGNIZE` command"""
-        return self._grammar_uri
+        return self._data["grammar_uri"]
 
     @property
     def alternatives(self) -> List["RecogResult"]:
         """if N-bests were requested, the additional results besides the best one are there."""
-        return getattr(self, "_alternatives", [])
+        try:
+            return self._alternatives
+        except AttributeError:
+            alternatives = self._alternatives = [
+                RecogResult(alt) for alt in self._data.get("alternatives", ())
+            ]
+            return alternatives
 
     def __str__(self) -> str:
-        best = f"Transcript: {self._asr}\n NLU: {self._nlu}"
-        if hasattr(self, "_alternatives"):
-            alt_str = "\n   ".join(str(alt) for alt in self._alternatives)
+        best = f"Transcript: {self.asr}\n NLU: {self.nlu}"
+        if "alternatives" in self._data:
+            alt_str = "\n   ".join(str(alt) for alt in self.alternatives)
             return f"{best}\nAlternatives:\n   {alt_str}"
         else:
             return best
 
 
 class Event:
-    """Base class of all the events"""
+    """Base class of all the events.
+
+    The completion cause and the body are built on first access.
+    """
+
+    __slots__ = ("_body", "_completion_cause", "_data", "_request_id")
+
+    _completion_cause: Optional[CompletionCause]
+    _body: Optional[RecogResult]
 
     def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
         self._request_id: int = int(data["request_id"])
-        self._channel_id: str = data["channel_id"]
-        self._headers: Dict[str, Any] = data["headers"]
-        self._completion_cause: Optional[CompletionCause] = (
-            None
-            if not data["completion_cause"]
-            else CompletionCause(data["completion_cause"])
-        )
-        self._completion_reason: Optional[str] = data["completion_reason"] or None
-        self._body: Optional[RecogResult] = (
-            None if not data["body"] else RecogResult(data["body"])
-        )
 
     @property
     def request_id(self) -> int:
@@ -169,7 +223,7 @@ class Event:
     @property
     def channel_id(self) -> str:
         """The channel ID."""
-        return self._channel_id
+        return self._data["channel_id"]
 
     @property
     def headers(self) -> Dict[str, Any]:
@@ -177,115 +231,127 @@ class Event:
 
         See also the [header description](https://docs.allo-media.net/stream-h2b/output/#headers-%26-statuses).
         """
-        return self._headers
+        return self._data["headers"]
 
     @property
     def completion_cause(self) -> Optional[CompletionCause]:
         """The response [`CompletionCause`][uhlive.stream.recognition.CompletionCause]."""
-        return self._completion_cause
+        try:
+            return self._completion_cause
+        except AttributeError:
+            cause = self._data["completion_cause"]
+            completion_cause = self._completion_cause = (
+                CompletionCause(cause) if cause else None
+            )
+            return completion_cause
 
     @property
     def completion_reason(self) -> Optional[str]:
         """The completion message."""
-        return self._completion_reason
+        return self._data["completion_reason"] or None
 
     @property
     def body(self) -> Optional[RecogResult]:
         """The content of the Event is a [`RecogResult`][uhlive.stream.recognition.RecogResult] if it is a `RecognitionComplete` event."""
-        return self._body
+        try:
+            return self._body
+        except AttributeError:
+            data = self._data["body"]
+            body = self._body = RecogResult(data) if data else None
+            return body
 
     def __str__(self) -> str:
-        return f"<Event {self.__class__.__name__}: {self._completion_cause} – {self._completion_reason} – {self._headers} – {self._body}"
+        return f"<Event {self.__class__.__name__}: {self.completion_cause} – {self.completion_reason} – {self.headers} – {self.body}"
 
 
 class Opened(Event):
     """Session opened on the server"""
 
-    pass
+    __slots__ = ()
 
 
 class ParamsSet(Event):
     """The default parameters were set."""
 
-    pass
+    __slots__ = ()
 
 
 class DefaultParams(Event):
     """All the parameters and their values are in the `headers` property"""
 
-    pass
+    __slots__ = ()
 
 
 class GrammarDefined(Event):
     """The `DefineGrammar` command has been processed."""
 
-    pass
+    __slots__ = ()
 
 
 class RecognitionInProgress(Event):
     """The ASR recognition is started."""
 
-    pass
+    __slots__ = ()
 
 
 class InputTimersStarted(Event):
     """The Input Timers are started."""
 
-    pass
+    __slots__ = ()
 
 
 class Stopped(Event):
     """The ASR recognition has been stopped on the client request."""
 
-    pass
+    __slots__ = ()
 
 
 class Closed(Event):
     """The session is closed."""
 
-    pass
+    __slots__ = ()
 
 
 class StartOfInput(Event):
     """In normal recognition mode, this event is emitted when speech is detected."""
 
-    pass
+    __slots__ = ()
 
 
 class RecognitionComplete(Event):
     """The ASR recognition is complete."""
 
-    pass
+    __slots__ = ()
 
 
 class MethodNotValid(Event):
     """The server received an invalid command."""
 
-    pass
+    __slots__ = ()
 
 
 class MethodFailed(Event):
     """The server was unable to complete the command."""
 
-    pass
+    __slots__ = ()
 
 
 class InvalidParamValue(Event):
     """The server received a request to set an invalid value for a parameter."""
 
-    pass
+    __slots__ = ()
 
 
 class MissingParam(Event):
     """The command is missings some mandatory parameter."""
 
-    pass
+    __slots__ = ()
 
 
 class MethodNotAllowed(Event):
     """The command is not allowed in this state."""
 
-    pass
+    __slots__ = ()
 
 
 EVENT_MAP = {
@@ -308,7 +374,7 @@ EVENT_MAP = {
 
 
 def deserialize(data: str) -> Event:
-    jd = json.loads(data)
+    jd = loads(data)
     kind = jd["event"]
     if kind in EVENT_MAP:
         return EVENT_MAP[kind](jd)
@@ -0,0 +1,213 @@
+"""
+Correlation of the server replies with the commands.
+"""
+
+import heapq
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .events import (
+    Event,
+    InvalidParamValue,
+    MethodFailed,
+    MethodNotAllowed,
+    MethodNotValid,
+    MissingParam,
+    RecognitionComplete,
+    StartOfInput,
+)
+
+ERROR_EVENTS = (
+    MethodNotValid,
+    MethodFailed,
+    InvalidParamValue,
+    MissingParam,
+    MethodNotAllowed,
+)
+"""Events that reject a command."""
+
+ASYNC_EVENTS = (StartOfInput, RecognitionComplete)
+"""Events that are not replies, but are sent later about a `RECOGNIZE` request."""
+
+Callback = Callable[[Union[Event, BaseException]], None]
+# Anything with `set_result` and `set_exception`, like `asyncio.Future` or `concurrent.futures.Future`,
+# or a callback that receives the event or the exception.
+Waiter = Any
+
+
+class RequestFailed(Exception):
+    """The server rejected a command."""
+
+    def __init__(self, event: Event) -> None:
+        self.event = event
+        """The error event."""
+        super().__init__(
+            f"Request {event.request_id} failed: {event.__class__.__name__} – {event.completion_reason}"
+        )
+
+
+def _resolve(waiter: Waiter, outcome: Union[Event, BaseException]) -> None:
+    if hasattr(waiter, "set_result"):
+        if waiter.done():  # cancelled
+            return
+        if isinstance(outcome, BaseException):
+            waiter.set_exception(outcome)
+        else:
+            waiter.set_result(outcome)
+    else:
+        waiter(outcome)
+
+
+class PendingRequests:
+    """The table of the commands waiting for a reply.
+
+    Register a future (or a callback) for the `request_id` of each command you send
+    (see [`Recognizer.last_request_id`][uhlive.stream.recognition.Recognizer.last_request_id]),
+    then pass all the received events to [`dispatch`][uhlive.stream.recognition.PendingRequests.dispatch]:
+    the futures are resolved with their reply, or fail with
+    [`RequestFailed`][uhlive.stream.recognition.RequestFailed] if the server rejected the command,
+    or with `TimeoutError` if the reply didn't come in time. So you can send several commands without
+    waiting for each reply.
+
+    The asynchronous events of a recognition (`StartOfInput`, `RecognitionComplete`) are not replies:
+    they go to the handler registered with [`on_events`][uhlive.stream.recognition.PendingRequests.on_events]
+    for the `RECOGNIZE` request, if any.
+
+    Like the rest of the SDK, this object doesn't do any I/O: call
+    [`expire`][uhlive.stream.recognition.PendingRequests.expire] from your event loop, at
+    [`next_deadline`][uhlive.stream.recognition.PendingRequests.next_deadline].
+
+    Example:
+        ```python
+        pending = PendingRequests()
+        loop = asyncio.get_running_loop()
+        await socket.send_str(recognizer.set_params(speech_language="fr"))
+        params_set = loop.create_future()
+        pending.add(recognizer.last_request_id, params_set, timeout=5)
+        await socket.send_str(recognizer.define_grammar("speech/keywords?alternatives=yes|no", "yesno"))
+        grammar_defined = loop.create_future()
+        pending.add(recognizer.last_request_id, grammar_defined, timeout=5)
+        # meanwhile, the receiving task does:
+        #    pending.dispatch(recognizer.receive(msg.data))
+        await params_set
+        await grammar_defined
+        ```
+    """
+
+    def __init__(self, clock: Callable[[], float] = monotonic) -> None:
+        """Create an empty table.
+
+        Args:
+            clock: the time source of the deadlines, in seconds.
+        """
+        self._clock = clock
+        self._waiters: Dict[int, Tuple[Waiter, Optional[float]]] = {}
+        self._handlers: Dict[int, Callback] = {}
+        self._deadlines: List[Tuple[float, int]] = []
+
+    def add(
+        self, request_id: int, waiter: Waiter, timeout: Optional[float] = None
+    ) -> None:
+        """Wait for the reply to a command.
+
+        Args:
+            request_id: the `request_id` of the command.
+            waiter: a future, resolved with the reply event, or a callback called with the reply event
+                    or the exception.
+            timeout: if given, the waiter fails with `TimeoutError` if the reply doesn't come within
+                     that many seconds.
+
+        Raises:
+            ValueError: if the request is already waited for.
+        """
+        if request_id in self._waiters:
+            raise ValueError(f"Request {request_id} is already pending")
+        deadline = None
+        if timeout is not None:
+            deadline = self._clock() + timeout
+            heapq.heappush(self._deadlines, (deadline, request_id))
+        self._waiters[request_id] = (waiter, deadline)
+
+    def on_events(self, request_id: int, handler: Callback) -> None:
+        """Get the asynchronous events of a `RECOGNIZE` request.
+
+        The handler is called with each `StartOfInput` and `RecognitionComplete` event for that request,
+        and forgotten after `RecognitionComplete`.
+        """
+        self._handlers[request_id] = handler
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def __contains__(self, request_id: int) -> bool:
+        return request_id in self._waiters
+
+    def dispatch(self, event: Event) -> Optional[Event]:
+        """Route a received event to its waiter or handler.
+
+        Returns:
+            `None` if the event was delivered, or the event itself if nobody was waiting for it.
+        """
+        request_id = event.request_id
+        if isinstance(event, ASYNC_EVENTS):
+            if isinstance(event, RecognitionComplete):
+                handler = self._handlers.pop(request_id, None)
+            else:
+                handler = self._handlers.get(request_id)
+            if handler is None:
+                return event
+            handler(event)
+            return None
+        entry = self._waiters.pop(request_id, None)
+        if entry is None:
+            return event
+        waiter = entry[0]
+        if isinstance(event, ERROR_EVENTS):
+            self._handlers.pop(request_id, None)
+            _resolve(waiter, RequestFailed(event))
+        else:
+            _resolve(waiter, event)
+        return None
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """The earliest deadline of the pending requests, according to the clock, if any."""
+        deadlines = self._deadlines
+        waiters = self._waiters
+        while deadlines:
+            deadline, request_id = deadlines[0]
+            entry = waiters.get(request_id)
+            if entry is not None and entry[1] == deadline:
+                return deadline
+            heapq.heappop(deadlines)  # already answered
+        return None
+
+    def expire(self) -> List[int]:
+        """Fail the waiters whose deadline is passed with `TimeoutError`.
+
+        Returns:
+            The expired request ids.
+        """
+        now = self._clock()
+        deadlines = self._deadlines
+        waiters = self._waiters
+        expired = []
+        while deadlines and deadlines[0][0] <= now:
+            deadline, request_id = heapq.heappop(deadlines)
+            entry = waiters.get(request_id)
+            if entry is None or entry[1] != deadline:
+                continue
+            del waiters[request_id]
+            self._handlers.pop(request_id, None)
+            expired.append(request_id)
+            _resolve(entry[0], TimeoutError(f"No reply to request {request_id}"))
+        return expired
+
+    def fail_all(self, exc: BaseException) -> None:
+        """Fail all the waiters with `exc`, for example when the connection is lost."""
+        waiters = list(self._waiters.values())
+        self._waiters.clear()
+        self._handlers.clear()
+        self._deadlines.clear()
+        for waiter, _ in waiters:
+            _resolve(waiter, exc)
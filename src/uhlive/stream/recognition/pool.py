@@ -0,0 +1,276 @@
+"""
+Pool of ready to use H2B sessions.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type
+
+from ..transport import Transport
+from .client import ProtocolError, Recognizer
+from .events import Closed, DefaultParams, Event
+
+
+class RecognitionSession:
+    """An opened and configured H2B session, handed out by a [RecognizerPool][uhlive.stream.recognition.RecognizerPool]."""
+
+    def __init__(self, transport: Transport, recognizer: Recognizer) -> None:
+        self.transport = transport
+        self.recognizer = recognizer
+
+    async def send(self, message: str) -> None:
+        """Send a command built with the `recognizer`."""
+        await self.transport.send_str(message)
+
+    async def send_audio_chunk(self, chunk: bytes) -> None:
+        """Stream audio."""
+        await self.transport.send_bytes(self.recognizer.send_audio_chunk(chunk))
+
+    async def receive(self) -> Event:
+        """Wait for the next event.
+
+        Raises:
+            ConnectionError: if the connection is closed.
+        """
+        data = await self.transport.receive()
+        if data is None:
+            raise ConnectionError("Connection closed by the server")
+        return self.recognizer.receive(data)
+
+    async def expect(self, *event_classes: Type[Event]) -> Event:
+        """Wait for the next event, that must be of one of the given classes.
+
+        Raises:
+            ProtocolError: if the event is of another class.
+        """
+        event = await self.receive()
+        if not isinstance(event, event_classes):
+            raise ProtocolError(f"Expected one of {event_classes}, got {event}")
+        return event
+
+    async def close(self) -> None:
+        """Close the session and the connection."""
+        try:
+            if self.recognizer.in_flight == 0:
+                await self.send(self.recognizer.close())
+                while not isinstance(await self.receive(), Closed):
+                    pass
+        except (ProtocolError, ConnectionError):
+            pass
+        finally:
+            await self.transport.close()
+
+
+class RecognizerPool:
+    """Keep H2B sessions opened and configured in advance, to start recognizing as soon as a call comes in.
+
+    The pool opens `size` connections with the `connect` factory, and on each, opens a session,
+    sets the default parameters and defines the grammar aliases, all in one burst
+    (see the pipelining mode of [Recognizer][uhlive.stream.recognition.Recognizer]).
+    The idle sessions are checked with `GET-PARAMS` every `check_interval` seconds, and the dead ones
+    replaced. When a session is handed out by [`acquire`][uhlive.stream.recognition.RecognizerPool.acquire],
+    a new one is prepared in the background to replace it.
+
+    Example:
+        ```python
+        url, headers = build_connection_request(token)
+
+        async def connect():
+            return AiohttpTransport(await http_session.ws_connect(url, headers=headers))
+
+        async with RecognizerPool(
+            connect,
+            size=4,
+            params={"speech_language": "fr"},
+            grammars={"yesno": "speech/keywords?alternatives=oui|non"},
+        ) as pool:
+            ...
+            # when a call comes in
+            session = await pool.acquire()
+            await session.send(session.recognizer.recognize("session:yesno"))
+            ...
+            await session.close()
+        ```
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Transport]],
+        size: int = 2,
+        params: Optional[Dict[str, Any]] = None,
+        grammars: Optional[Dict[str, str]] = None,
+        open_params: Optional[Dict[str, Any]] = None,
+        timeout: float = 5.0,
+        retry_delay: float = 1.0,
+        check_interval: Optional[float] = 30.0,
+        check_on_acquire: bool = False,
+    ) -> None:
+        """Create a pool.
+
+        Args:
+            connect: coroutine function that opens a new websocket connection to the H2B API.
+            size: the number of sessions kept ready.
+            params: the default parameters to set, see [Recognizer.set_params][uhlive.stream.recognition.Recognizer.set_params].
+            grammars: the grammar aliases to define, as a mapping from alias to builtin URI,
+                      see [Recognizer.define_grammar][uhlive.stream.recognition.Recognizer.define_grammar].
+            open_params: the arguments of [Recognizer.open][uhlive.stream.recognition.Recognizer.open].
+            timeout: how long to wait for the server replies when preparing or checking a session, in seconds.
+            retry_delay: how long to wait before preparing a new session after a failure, in seconds.
+            check_interval: how often to check that the idle sessions are still alive, in seconds;
+                            `None` to disable.
+            check_on_acquire: also check a session when it is handed out, at the cost of a round trip
+                              to the server.
+        """
+        self._connect = connect
+        self.size = size
+        self.params = params or {}
+        self.grammars = grammars or {}
+        self.open_params = open_params or {}
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.check_interval = check_interval
+        self.check_on_acquire = check_on_acquire
+        self._ready: "asyncio.Queue[RecognitionSession]" = asyncio.Queue()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._checker: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+        self.last_error: Optional[BaseException] = None
+        """The last error while preparing or checking a session."""
+        self.created = 0
+        """The number of sessions prepared."""
+        self.discarded = 0
+        """The number of sessions discarded because they failed the health check."""
+
+    async def __aenter__(self) -> "RecognizerPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def ready(self) -> int:
+        """The number of sessions ready to be handed out."""
+        return self._ready.qsize()
+
+    def start(self) -> None:
+        """Start preparing the sessions in the background."""
+        for _ in range(self.size - self._ready.qsize() - len(self._tasks)):
+            self._replenish()
+        if self._checker is None and self.check_interval is not None:
+            self._checker = asyncio.ensure_future(self._check_idle())
+
+    async def acquire(self, timeout: Optional[float] = None) -> RecognitionSession:
+        """Get a ready session.
+
+        The session is yours: close it when you're done.
+
+        Args:
+            timeout: how long to wait for a session, in seconds, if none is ready.
+
+        Raises:
+            asyncio.TimeoutError: if no session got ready in time.
+            ProtocolError: if the pool is closed.
+        """
+        return await asyncio.wait_for(self._acquire(), timeout)
+
+    async def _acquire(self) -> RecognitionSession:
+        while True:
+            if self._closed:
+                raise ProtocolError("Pool closed!")
+            session = await self._ready.get()
+            self._replenish()
+            if not self.check_on_acquire or await self._check(session):
+                return session
+
+    async def close(self) -> None:
+        """Stop preparing sessions and close the ready ones."""
+        self._closed = True
+        tasks = list(self._tasks)
+        if self._checker is not None:
+            tasks.append(self._checker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        sessions: List[RecognitionSession] = []
+        while not self._ready.empty():
+            sessions.append(self._ready.get_nowait())
+        await asyncio.gather(
+            *(session.close() for session in sessions), return_exceptions=True
+        )
+
+    def _replenish(self) -> None:
+        if self._closed:
+            return
+        task = asyncio.ensure_future(self._prepare())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prepare(self) -> None:
+        while True:
+            try:
+                session = await asyncio.wait_for(self._open(), self.timeout)
+            except Exception as exc:
+                # Connection, protocol or decoding error: retry whatever the failure,
+                # or the pool would stay one session short.
+                self.last_error = exc
+                await asyncio.sleep(self.retry_delay)
+            else:
+                self.created += 1
+                self._ready.put_nowait(session)
+                return
+
+    async def _open(self) -> RecognitionSession:
+        transport = await self._connect()
+        try:
+            recognizer = Recognizer(pipelining=True)
+            session = RecognitionSession(transport, recognizer)
+            commands = [recognizer.open(**self.open_params)]
+            if self.params:
+                commands.append(recognizer.set_params(**self.params))
+            for alias, builtin in self.grammars.items():
+                commands.append(recognizer.define_grammar(builtin, alias))
+            for command in commands:
+                await session.send(command)
+            while recognizer.in_flight:
+                await session.receive()
+        except BaseException:
+            await transport.close()
+            raise
+        return session
+
+    async def _check_idle(self) -> None:
+        assert self.check_interval is not None
+        while True:
+            await asyncio.sleep(self.check_interval)
+            # One at a time, so that the other sessions can be acquired meanwhile.
+            for _ in range(self._ready.qsize()):
+                if self._ready.empty():
+                    break
+                session = self._ready.get_nowait()
+                if await self._check(session):
+                    self._ready.put_nowait(session)
+                else:
+                    self._replenish()
+
+    async def _check(self, session: RecognitionSession) -> bool:
+        """Check a session taken from the ready ones, close it if it is dead."""
+        try:
+            healthy = await self._healthy(session)
+        except BaseException:
+            # cancelled: nobody will get the session
+            await session.transport.close()
+            raise
+        if not healthy:
+            self.discarded += 1
+            await session.transport.close()
+        return healthy
+
+    async def _healthy(self, session: RecognitionSession) -> bool:
+        try:
+            await session.send(session.recognizer.get_params())
+            await asyncio.wait_for(session.expect(DefaultParams), self.timeout)
+        except Exception as exc:
+            # Any failure means a dead session.
+            self.last_error = exc
+            return False
+        return True
@@ -0,0 +1,60 @@
+"""
+Minimal interface between the asyncio helpers and your websocket library.
+
+The SDK doesn't depend on any websocket library: the asyncio helpers only need an object
+that implements the [`Transport`][uhlive.stream.transport.Transport] protocol. Any websocket client
+can be adapted in a few lines; an adapter for `aiohttp` is provided.
+"""
+
+from typing import Any, Optional, Protocol, Union
+
+
+class Transport(Protocol):
+    """An open websocket connection."""
+
+    async def send_str(self, data: str) -> None:
+        """Send a text message."""
+        ...
+
+    async def send_bytes(self, data: bytes) -> None:
+        """Send a binary message."""
+        ...
+
+    async def receive(self) -> Optional[Union[str, bytes]]:
+        """Wait for the next message, or `None` if the connection is closed."""
+        ...
+
+    async def close(self) -> None:
+        """Close the connection."""
+        ...
+
+
+class AiohttpTransport:
+    """[`Transport`][uhlive.stream.transport.Transport] adapter for `aiohttp` websockets.
+
+    Example:
+        ```python
+        async with session.ws_connect(url) as socket:
+            transport = AiohttpTransport(socket)
+        ```
+    """
+
+    def __init__(self, socket: Any) -> None:
+        """Wrap an `aiohttp.ClientWebSocketResponse`."""
+        self.socket = socket
+
+    async def send_str(self, data: str) -> None:
+        await self.socket.send_str(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.socket.send_bytes(data)
+
+    async def receive(self) -> Optional[Union[str, bytes]]:
+        msg = await self.socket.receive()
+        # aiohttp.WSMsgType, without importing aiohttp
+        if msg.type.name in ("TEXT", "BINARY"):
+            return msg.data
+        return None
+
+    async def close(self) -> None:
+        await self.socket.close()
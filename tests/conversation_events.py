@@ -184,6 +184,31 @@ entity_location_city_found = [
     },
 ]
 
+relation_found = [
+    S_JOIN_REF,
+    2,
+    "conversation:rtxm@test",
+    "relation_number_of_location_recognized",
+    {
+        "speaker": "Alice",
+        "start": 8560,
+        "end": 9460,
+        "length": 900,
+        "lang": "fr",
+        "confidence": 0.8,
+        "conversation": "conversation:rtxm@test",
+        "components": [
+            {"class": "entity_cardinal_number_recognized", "id": "sd3yeitr-9260"},
+            {
+                "class": "entity_location_city_recognized",
+                "id": "Entity.LocationCity-8560",
+            },
+            {"class": "entity_location_city_recognized", "id": "Entity.LocationCity-1"},
+            {"class": None, "id": "unknown"},
+        ],
+    },
+]
+
 
 join_successful = json.dumps(
     [
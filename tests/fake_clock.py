@@ -0,0 +1,20 @@
+class FakeClock:
+    """Time only passes when told: by setting `now`, sleeping, or sending if `send_time` is set."""
+
+    def __init__(self, now=1000.0, send_time=0.0):
+        self.now = now
+        self.send_time = send_time
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+    async def asleep(self, delay):
+        self.sleep(delay)
+
+    def send(self, chunk):
+        self.now += self.send_time
@@ -0,0 +1,97 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from uhlive.stream.audio import AsyncPacer, Pacer, bytes_per_second, chunk_size
+
+from .fake_clock import FakeClock
+
+
+class TestCodecSizes(TestCase):
+    def test_sizes(self):
+        self.assertEqual(bytes_per_second("linear"), 16000)
+        self.assertEqual(bytes_per_second("g711u"), 8000)
+        self.assertEqual(chunk_size("linear", 0.06), 960)
+        self.assertEqual(chunk_size("g711a", 0.06), 480)
+        with self.assertRaises(ValueError):
+            bytes_per_second("mp3")
+
+
+class TestPacer(TestCase):
+    def test_chunk_duration_from_codec(self):
+        for codec, size in (("linear", 8000), ("g711a", 4000)):
+            clock = FakeClock()
+            pacer = Pacer(codec, clock=clock, sleep=clock.sleep)
+            for chunk in pacer.paced([bytes(size)] * 3):
+                clock.send(chunk)
+            self.assertEqual(clock.sleeps, [0.5, 0.5])
+            self.assertEqual(pacer.audio_time, 1.5)
+
+    def test_no_drift(self):
+        clock = FakeClock(send_time=0.013)
+        pacer = Pacer("linear", clock=clock, sleep=clock.sleep)
+        start = clock.now
+        for chunk in pacer.paced([bytes(960)] * 1000):
+            clock.send(chunk)
+        # the sending time is absorbed: chunk n is sent at n × 60 ms, plus the last send
+        self.assertAlmostEqual(clock.now - start, 999 * 0.06 + 0.013)
+        self.assertEqual(pacer.late_chunks, 0)
+        self.assertEqual(pacer.chunks, 1000)
+
+    def test_catch_up(self):
+        clock = FakeClock()
+        pacer = Pacer("linear", clock=clock, sleep=clock.sleep)
+        pacer.wait(bytes(8000))
+        clock.now += 1.2  # stalled
+        pacer.wait(bytes(8000))
+        self.assertAlmostEqual(pacer.lag, 0.7)
+        pacer.wait(bytes(8000))
+        self.assertAlmostEqual(pacer.lag, 0.2)
+        pacer.wait(bytes(8000))
+        self.assertEqual(pacer.lag, 0.0)
+        self.assertAlmostEqual(clock.sleeps[-1], 0.3)
+        self.assertEqual(pacer.late_chunks, 2)
+        self.assertAlmostEqual(pacer.max_lag, 0.7)
+
+    def test_resync(self):
+        clock = FakeClock()
+        pacer = Pacer("linear", resync_after=0.5, clock=clock, sleep=clock.sleep)
+        pacer.wait(bytes(8000))
+        clock.now += 3.0
+        pacer.wait(bytes(8000))
+        self.assertEqual(pacer.resyncs, 1)
+        pacer.wait(bytes(8000))
+        self.assertEqual(clock.sleeps, [0.5])
+        self.assertAlmostEqual(pacer.max_lag, 2.5)
+
+    def test_speed(self):
+        clock = FakeClock()
+        pacer = Pacer("linear", speed=4, clock=clock, sleep=clock.sleep)
+        list(pacer.paced([bytes(16000)] * 3))
+        self.assertEqual(clock.sleeps, [0.25, 0.25])
+        clock = FakeClock()
+        pacer = Pacer("linear", speed=None, clock=clock, sleep=clock.sleep)
+        list(pacer.paced([bytes(16000)] * 3))
+        self.assertEqual(clock.sleeps, [])
+        self.assertEqual(pacer.audio_time, 3.0)
+
+    def test_reset(self):
+        clock = FakeClock()
+        pacer = Pacer("g711u", clock=clock, sleep=clock.sleep)
+        pacer.wait(bytes(4000))
+        clock.now += 10  # paused
+        pacer.reset()
+        pacer.wait(bytes(4000))
+        pacer.wait(bytes(4000))
+        self.assertEqual(clock.sleeps, [0.5])
+        self.assertEqual(pacer.late_chunks, 0)
+
+
+class TestAsyncPacer(IsolatedAsyncioTestCase):
+    async def test_paced(self):
+        clock = FakeClock(send_time=0.01)
+        pacer = AsyncPacer("linear", clock=clock, sleep=clock.asleep)
+        async for chunk in pacer.paced([bytes(1600)] * 5):
+            clock.send(chunk)
+        self.assertEqual(len(clock.sleeps), 4)
+        for delay in clock.sleeps:
+            self.assertAlmostEqual(delay, 0.09)
+        self.assertEqual(pacer.late_chunks, 0)
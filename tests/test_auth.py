@@ -0,0 +1,253 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import IsolatedAsyncioTestCase, TestCase
+from urllib.parse import parse_qs
+
+from uhlive.auth import (
+    AuthenticationError,
+    HTTPTokenClient,
+    TokenProvider,
+    urllib_fetch,
+)
+
+from .fake_clock import FakeClock
+
+
+class FakeServer:
+    """Stand-in for the authentication server: counts the token requests."""
+
+    def __init__(self, expires_in=300, delay=None):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, data):
+        if self.delay is not None:
+            self.delay.wait(1)
+        with self.lock:
+            self.requests.append(data)
+            n = len(self.requests)
+        if data["client_secret"] != "secret":
+            raise AuthenticationError(401, "invalid_client")
+        return {
+            "access_token": f"{data['client_id']}-{n}",
+            "expires_in": self.expires_in,
+        }
+
+    async def afetch(self, url, data):
+        await asyncio.sleep(0.01)
+        return self(url, data)
+
+
+class TestTokenProvider(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.server = FakeServer()
+        self.tokens = TokenProvider(self.server, refresh_margin=30, clock=self.clock)
+
+    def test_cache_and_refresh(self):
+        self.assertEqual(self.tokens.get("client", "secret"), "client-1")
+        self.clock.now += 269
+        self.assertEqual(self.tokens.get("client", "secret"), "client-1")
+        self.clock.now += 1
+        # in the refresh margin
+        self.assertEqual(self.tokens.get("client", "secret"), "client-2")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_per_client(self):
+        self.assertEqual(self.tokens.get("a", "secret"), "a-1")
+        self.assertEqual(self.tokens.get("b", "secret"), "b-2")
+        self.assertEqual(self.tokens.get("a", "secret", "user", "pwd"), "a-3")
+        self.assertEqual(self.server.requests[2]["grant_type"], "password")
+        self.assertEqual(self.tokens.get("a", "secret"), "a-1")
+        self.tokens.invalidate("a")
+        self.assertEqual(self.tokens.get("a", "secret"), "a-4")
+
+    def test_missing_expires_in(self):
+        self.server.expires_in = None
+        self.tokens.get("client", "secret")
+        self.clock.now += 260
+        self.tokens.get("client", "secret")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_error(self):
+        with self.assertRaises(AuthenticationError):
+            self.tokens.get("client", "wrong")
+        # not cached
+        with self.assertRaises(AuthenticationError):
+            self.tokens.get("client", "wrong")
+
+    def test_single_flight_threads(self):
+        release = threading.Event()
+        self.server.delay = release
+        results = []
+
+        def worker():
+            results.append(self.tokens.get("client", "secret"))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["client-1"] * 10)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_refresh_ahead_threads(self):
+        self.tokens.get("client", "secret")
+        self.clock.now += 280
+        release = threading.Event()
+        self.server.delay = release
+        refresher = threading.Thread(target=self.tokens.get, args=("client", "secret"))
+        refresher.start()
+        while not self.tokens._lock(("client", "")).locked():
+            pass
+        # the current token is still valid: no waiting
+        self.assertEqual(self.tokens.get("client", "secret"), "client-1")
+        release.set()
+        refresher.join()
+        self.assertEqual(self.tokens.get("client", "secret"), "client-2")
+
+
+class TestAsyncTokenProvider(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.server = FakeServer()
+
+    async def test_single_flight(self):
+        tokens = TokenProvider(afetch=self.server.afetch, clock=self.clock)
+        results = await asyncio.gather(
+            *(tokens.aget("client", "secret") for _ in range(10))
+        )
+        self.assertEqual(results, ["client-1"] * 10)
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_refresh_ahead(self):
+        tokens = TokenProvider(afetch=self.server.afetch, clock=self.clock)
+        await tokens.aget("client", "secret")
+        self.clock.now += 280
+        # renewed in the background
+        self.assertEqual(await tokens.aget("client", "secret"), "client-1")
+        self.assertEqual(await tokens.aget("client", "secret"), "client-1")
+        await asyncio.sleep(0.05)
+        self.assertEqual(await tokens.aget("client", "secret"), "client-2")
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_executor_fallback_and_error(self):
+        tokens = TokenProvider(self.server, clock=self.clock)
+        self.assertEqual(await tokens.aget("client", "secret"), "client-1")
+        with self.assertRaises(AuthenticationError):
+            await tokens.aget("other", "wrong")
+
+
+class TokenHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if form["client_secret"] == ["secret"]:
+            status, body = 200, {"access_token": "token", "expires_in": 60}
+        else:
+            status, body = 401, {"error": "invalid_client"}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUrllibFetch(TestCase):
+    def test_local_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TokenHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/token"
+            response = urllib_fetch(url, {"client_id": "c", "client_secret": "secret"})
+            self.assertEqual(response["access_token"], "token")
+            with self.assertRaises(AuthenticationError) as cm:
+                urllib_fetch(url, {"client_id": "c", "client_secret": "wrong"})
+            self.assertEqual(cm.exception.status, 401)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class KeepAliveTokenHandler(TokenHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self):
+        super().do_POST()
+        # close without telling the client, like an idle timeout
+        if self.path.endswith("?close"):
+            self.close_connection = True
+
+
+class TestHTTPTokenClient(TestCase):
+    def setUp(self):
+        KeepAliveTokenHandler.connections = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveTokenHandler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/token"
+        self.client = HTTPTokenClient()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive(self):
+        for _ in range(5):
+            response = self.client(
+                self.url, {"client_id": "c", "client_secret": "secret"}
+            )
+            self.assertEqual(response["access_token"], "token")
+        self.assertEqual(self.client.connections_opened, 1)
+        self.assertEqual(KeepAliveTokenHandler.connections, 1)
+
+    def test_error_keeps_connection(self):
+        with self.assertRaises(AuthenticationError) as cm:
+            self.client(self.url, {"client_id": "c", "client_secret": "wrong"})
+        self.assertEqual(cm.exception.status, 401)
+        self.client(self.url, {"client_id": "c", "client_secret": "secret"})
+        self.assertEqual(self.client.connections_opened, 1)
+
+    def test_reconnect(self):
+        self.client(self.url, {"client_id": "c", "client_secret": "secret"})
+        self.client(self.url + "?close", {"client_id": "c", "client_secret": "secret"})
+        response = self.client(self.url, {"client_id": "c", "client_secret": "secret"})
+        self.assertEqual(response["access_token"], "token")
+        self.assertEqual(self.client.connections_opened, 2)
+        self.assertEqual(KeepAliveTokenHandler.connections, 2)
+
+    def test_concurrent_requests(self):
+        client = HTTPTokenClient(max_connections=2)
+        results = []
+
+        def worker():
+            for _ in range(5):
+                results.append(
+                    client(self.url, {"client_id": "c", "client_secret": "secret"})
+                )
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+        self.assertEqual(len(results), 30)
+        self.assertLessEqual(client.connections_opened, 2)
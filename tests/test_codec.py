@@ -0,0 +1,152 @@
+import json
+import os
+from unittest import TestCase
+
+from uhlive.stream import codec
+from uhlive.stream.conversation import Conversation
+from uhlive.stream.recognition import Recognizer
+from uhlive.stream.recognition.events import deserialize
+
+from . import conversation_events, recog_events
+from .conversation_events import join_successful
+from .recog_events import session_opened
+
+
+def compact(obj):
+    return json.dumps(obj, ensure_ascii=False, indent=None, separators=(",", ":"))
+
+
+def conversation_frames():
+    client = Conversation("customerid", "my/conv", "jöhn")
+    frames = [client.join(model="en", country="us", origin=1629453934909)]
+    client.receive(join_successful.replace("myconv", "my/conv"))
+    frames.append(client.leave())
+    return frames
+
+
+def recognizer_frames():
+    client = Recognizer()
+    frames = [client.open("mycustomer", "mychan", "søssion")]
+    client.receive(session_opened)
+    frames.append(
+        client.set_params(
+            speech_language="fr",
+            confidence_threshold=0.7,
+            speech_complete_timeout=0.00001,
+            max_value=1e16,
+            big=2**70,
+            nan=float("nan"),
+        )
+    )
+    frames.append(
+        client.define_grammar(
+            "speech/spelling/mixed?regex=[a-z]{2}[0-9]{9}[a-z]{2}", "parcel_num"
+        )
+    )
+    frames.append(client.recognize("session:parcel_num", "builtin:speech/transcribe"))
+    frames.append(client.get_params())
+    frames.append(client.close())
+    return frames
+
+
+def fixtures():
+    messages = [
+        compact(value)
+        for name, value in vars(conversation_events).items()
+        if isinstance(value, list)
+    ]
+    messages.append(join_successful)
+    messages.extend(
+        value
+        for name, value in vars(recog_events).items()
+        if isinstance(value, str) and not name.startswith("_")
+    )
+    return messages
+
+
+class TestCodecParity(TestCase):
+    def setUp(self):
+        self.previous = codec.get_codec()
+        codec.set_codec("json")
+        self.expected_frames = conversation_frames() + recognizer_frames()
+
+    def tearDown(self):
+        codec.set_codec(self.previous)
+
+    def test_stdlib_is_always_available(self):
+        self.assertEqual(codec.available_codecs()[-1], "json")
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            codec.set_codec("pickle")
+
+    def test_frames(self):
+        for name in codec.available_codecs():
+            with self.subTest(codec=name):
+                codec.set_codec(name)
+                self.assertEqual(
+                    conversation_frames() + recognizer_frames(), self.expected_frames
+                )
+
+    def test_unicode_and_escapes(self):
+        payload = {
+            "value": 'ça "va" \\ /  \x7f\x00\n\t😀',
+            "nested": [1, -1, 2**63 - 1, -(2**63), 0.5, -0.0, True, None, {}],
+            1: "non string key",
+        }
+        for name in codec.available_codecs():
+            with self.subTest(codec=name):
+                self.assertEqual(codec.CODECS[name]().dumps(payload), compact(payload))
+        # lone surrogates: refused by some libraries, escaped by others
+        for payload in ({"a": "\ud800"}, {"é\udfff": ["x", "\udc80é"]}):
+            for name in codec.available_codecs():
+                with self.subTest(codec=name, payload=payload):
+                    self.assertEqual(
+                        codec.CODECS[name]().dumps(payload), compact(payload)
+                    )
+
+    def test_decode(self):
+        for name in codec.available_codecs():
+            with self.subTest(codec=name):
+                decoder = codec.CODECS[name]()
+                for message in fixtures():
+                    self.assertEqual(decoder.loads(message), json.loads(message))
+                    self.assertEqual(
+                        decoder.loads(message.encode("utf-8")), json.loads(message)
+                    )
+
+    def test_decode_stdlib_only(self):
+        # valid for the standard library, refused by some libraries
+        messages = [
+            '[null,"1","phoenix","phx_reply",{"status":"ok","response":{"nan":NaN}}]',
+            '{"inf":Infinity,"-inf":-Infinity,"huge":1e400}',
+        ]
+        for name in codec.available_codecs():
+            with self.subTest(codec=name):
+                decoder = codec.CODECS[name]()
+                for message in messages:
+                    expected = compact(json.loads(message))
+                    self.assertEqual(compact(decoder.loads(message)), expected)
+                    self.assertEqual(
+                        compact(decoder.loads(message.encode("utf-8"))), expected
+                    )
+                with self.assertRaises(ValueError):
+                    decoder.loads('{"truncated":')
+
+    def test_default(self):
+        # some libraries decode the integers beyond 64 bits as floats
+        message = (
+            '{"big":123456789012345678901234567890,"negative":-18446744073709551616}'
+        )
+        codec.set_codec(os.getenv("UHLIVE_JSON_CODEC") or "json")
+        if "UHLIVE_JSON_CODEC" not in os.environ:
+            self.assertEqual(codec.get_codec().name, "json")
+            self.assertEqual(codec.loads(message), json.loads(message))
+        self.assertEqual(codec.set_codec().name, codec.available_codecs()[0])
+
+    def test_events(self):
+        for name in codec.available_codecs():
+            with self.subTest(codec=name):
+                codec.set_codec(name)
+                event = deserialize(recog_events.recognition_complete)
+                self.assertEqual(event.body.nlu.value, "bc305fz")
@@ -0,0 +1,193 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from uhlive.stream.conversation import (
+    AudioSegmentDecoded,
+    Conversation,
+    Ok,
+    ProtocolError,
+    SpeakerLeft,
+)
+from uhlive.stream.conversation.aio import AsyncConversation
+from uhlive.stream.conversation.error import UhliveError
+
+from .conversation_events import segment_decoded, speaker_left
+
+
+class FakeTransport:
+    """In-process server: replies to join and leave, and can push events."""
+
+    def __init__(self, speaker, refuse=False):
+        self.speaker = speaker
+        self.refuse = refuse
+        self.incoming = asyncio.Queue()
+        self.text = []
+        self.binary = []
+        self.closed = False
+
+    def push(self, message):
+        self.incoming.put_nowait(json.dumps(message))
+
+    async def send_str(self, data):
+        self.text.append(data)
+        join_ref, ref, topic, event, _ = json.loads(data)
+        if event == "phx_join":
+            if self.refuse:
+                reply = {"status": "error", "response": {"reason": "refused"}}
+            else:
+                reply = {"status": "ok", "response": {}}
+            self.push([join_ref, ref, topic, "phx_reply", reply])
+        elif event == "phx_leave":
+            self.push(
+                [join_ref, ref, topic, "phx_reply", {"status": "ok", "response": {}}]
+            )
+            left = list(speaker_left)
+            left[2] = topic
+            left[4] = dict(left[4], speaker=self.speaker)
+            self.push(left)
+
+    async def send_bytes(self, data):
+        self.binary.append(data)
+        await asyncio.sleep(0)
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def close(self):
+        self.closed = True
+
+
+class BrokenTransport(FakeTransport):
+    async def send_bytes(self, data):
+        await asyncio.sleep(0.01)
+        raise ConnectionResetError("broken pipe")
+
+
+class TestAsyncConversation(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.transport = FakeTransport("john_test")
+        self.conversation = Conversation("customerid", "myconv", "john_test")
+
+    def segment(self):
+        event = list(segment_decoded)
+        event[2] = self.conversation.topic
+        return event
+
+    async def test_stream_and_leave(self):
+        async with AsyncConversation(self.transport, self.conversation) as client:
+            reply = await client.join()
+            self.assertIsInstance(reply, Ok)
+            self.assertTrue(client.joined)
+            for _ in range(3):
+                await client.send_audio(b"\x00" * 10)
+            self.transport.push(self.segment())
+            await client.leave()
+            events = [event async for event in client]
+            self.assertIsInstance(events[0], AudioSegmentDecoded)
+            self.assertIsInstance(events[-1], SpeakerLeft)
+            self.assertEqual(len(self.transport.binary), 3)
+            self.assertEqual(json.loads(self.transport.text[-1])[3], "phx_leave")
+            # iteration is over for good
+            self.assertEqual(await client.drain(), [])
+            with self.assertRaises(ProtocolError):
+                await client.send_audio(b"\x00")
+        self.assertTrue(self.transport.closed)
+        metrics = client.metrics
+        self.assertEqual(metrics.messages_sent, 5)
+        self.assertEqual(metrics.messages_received, 4)
+        self.assertEqual(metrics.events, 3)
+
+    async def test_close_leaves(self):
+        client = AsyncConversation(self.transport, self.conversation)
+        await client.join()
+        await client.close()
+        self.assertEqual(json.loads(self.transport.text[-1])[3], "phx_leave")
+        self.assertTrue(self.conversation.left)
+        self.assertTrue(self.transport.closed)
+        await client.close()
+
+    async def test_send_backpressure(self):
+        client = AsyncConversation(self.transport, self.conversation, send_queue_size=2)
+        await client.join()
+        client._tasks[1].cancel()  # stall the writer
+        await asyncio.sleep(0)
+        client.send_audio_nowait(b"\x00")
+        client.send_audio_nowait(b"\x00")
+        with self.assertRaises(asyncio.QueueFull):
+            client.send_audio_nowait(b"\x00")
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.send_audio(b"\x00"), 0.01)
+        self.assertEqual(client.metrics.send_waits, 1)
+        self.assertEqual(client.metrics.send_queue_peak, 2)
+        await client.close(timeout=0.01)
+
+    async def test_receive_backpressure(self):
+        client = AsyncConversation(
+            self.transport, self.conversation, receive_queue_size=2
+        )
+        await client.join()
+        for _ in range(4):
+            self.transport.push(self.segment())
+        await asyncio.sleep(0.01)
+        self.assertEqual(client.metrics.events, 2)
+        self.assertEqual(self.transport.incoming.qsize(), 1)
+        await client.__anext__()
+        await asyncio.sleep(0.01)
+        self.assertEqual(client.metrics.events, 3)
+        self.assertEqual(client.metrics.receive_waits, 2)
+        await client.close()
+
+    async def test_join_refused(self):
+        transport = FakeTransport("john_test", refuse=True)
+        client = AsyncConversation(transport, self.conversation)
+        with self.assertRaises(UhliveError):
+            await client.join()
+        with self.assertRaises(UhliveError):
+            await client.__anext__()
+        await client.close()
+        self.assertTrue(transport.closed)
+
+    async def test_connection_lost(self):
+        client = AsyncConversation(self.transport, self.conversation)
+        await client.join()
+        self.transport.push(self.segment())
+        self.transport.incoming.put_nowait(None)
+        self.assertIsInstance(await client.__anext__(), AudioSegmentDecoded)
+        with self.assertRaises(ConnectionError):
+            await client.__anext__()
+        await client.close()
+
+    async def test_send_failure(self):
+        transport = BrokenTransport("john_test")
+        client = AsyncConversation(transport, self.conversation, send_queue_size=1)
+        await client.join()
+        await client.send_audio(b"\x00")
+        await asyncio.sleep(0)  # taken by the writer
+        await client.send_audio(b"\x00")  # fills the queue
+        blocked = asyncio.ensure_future(client.send_audio(b"\x00"))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+        with self.assertRaises(ConnectionResetError):
+            await asyncio.wait_for(client.flush(), 1)
+        with self.assertRaises(ConnectionResetError):
+            await asyncio.wait_for(blocked, 1)
+        with self.assertRaises(ConnectionResetError):
+            await client.send_audio(b"\x00")
+        with self.assertRaises(ConnectionResetError):
+            await client.__anext__()
+        await client.close()
+        self.assertTrue(transport.closed)
+
+    async def test_leave_after_failure_keeps_ref(self):
+        transport = BrokenTransport("john_test")
+        client = AsyncConversation(transport, self.conversation)
+        await client.join()
+        await client.send_audio(b"\x00")
+        with self.assertRaises(ConnectionResetError):
+            await client.flush()
+        ref = self.conversation._request_id
+        with self.assertRaises(ConnectionResetError):
+            await client.leave()
+        self.assertEqual(self.conversation._request_id, ref)
+        await client.close()
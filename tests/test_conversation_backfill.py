@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from copy import deepcopy
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from uhlive.stream.conversation import AsyncBackfill, Backfill, Event
+
+from .conversation_events import segment_decoded, speaker_joined
+
+ORIGIN = 1_760_715_680_000
+SECOND = bytes(16000)  # linear
+
+
+def decoded_until(seconds):
+    message = deepcopy(segment_decoded)
+    end = ORIGIN + int(seconds * 1000)
+    message[4].update(start=end - 500, end=end, length=500)
+    return Event.from_message(message)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timeout")
+        time.sleep(0.001)
+
+
+class TestBackfill(TestCase):
+    def test_unlimited_without_window(self):
+        backfill = Backfill(window=None)
+        self.assertEqual(len(list(backfill.paced([SECOND] * 100))), 100)
+        self.assertEqual(backfill.sent, 100.0)
+        self.assertEqual(backfill.waits, 0)
+
+    def test_window(self):
+        backfill = Backfill(window=2.0, origin=ORIGIN, patience=5)
+        sent = []
+
+        def sender():
+            sent.extend(backfill.paced([SECOND] * 6))
+
+        thread = threading.Thread(target=sender)
+        thread.start()
+        wait_until(lambda: len(sent) == 3)
+        time.sleep(0.02)
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(backfill.backlog, 3.0)
+        backfill.observe(Event.from_message(speaker_joined))  # ignored
+        backfill.observe(decoded_until(1.5))
+        wait_until(lambda: len(sent) == 4)
+        backfill.observe(decoded_until(1.0))  # out of order: ignored
+        self.assertEqual(backfill.transcribed, 1.5)
+        backfill.observe(decoded_until(6.0))
+        thread.join(2)
+        self.assertEqual(len(sent), 6)
+        self.assertEqual(backfill.waits, 2)
+        self.assertEqual(backfill.stalls, 0)
+
+    def test_silence(self):
+        backfill = Backfill(window=1.0, patience=0.01)
+        self.assertEqual(len(list(backfill.paced([SECOND] * 5))), 5)
+        self.assertEqual(backfill.stalls, 2)
+
+    def test_speed(self):
+        backfill = Backfill(speed=50.0, window=None)
+        start = time.monotonic()
+        list(backfill.paced([SECOND] * 6))
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+
+class TestAsyncBackfill(IsolatedAsyncioTestCase):
+    async def test_window(self):
+        backfill = AsyncBackfill(window=2.0, origin=ORIGIN, patience=5)
+        sent = []
+
+        async def sender():
+            async for chunk in backfill.paced([SECOND] * 6):
+                sent.append(chunk)
+
+        task = asyncio.create_task(sender())
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(sent), 3)
+        backfill.observe(decoded_until(6.0))
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(len(sent), 6)
+        self.assertEqual(backfill.waits, 1)
+
+    async def test_silence(self):
+        backfill = AsyncBackfill(window=1.0, patience=0.01)
+        async for _ in backfill.paced([SECOND] * 5):
+            pass
+        self.assertEqual(backfill.stalls, 2)
+        self.assertEqual(backfill.backlog, 1.0)
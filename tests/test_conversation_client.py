@@ -1,8 +1,23 @@
+import json
 from unittest import TestCase
 
-from uhlive.stream.conversation import Conversation, Ok, ProtocolError
+from uhlive.stream.conversation import (
+    AudioSegmentDecoded,
+    AudioWordsDecoded,
+    Conversation,
+    EntityRecognized,
+    FrameBufferPool,
+    Ok,
+    ProtocolError,
+)
+from uhlive.stream.conversation.client import parse_envelope
 
-from .conversation_events import join_successful
+from .conversation_events import (
+    entity_number_found,
+    join_successful,
+    segment_decoded,
+    words_decoded,
+)
 
 
 class TestConnection(TestCase):
@@ -44,6 +59,150 @@ class TestConnection(TestCase):
             frame, r'["1","2","conversation:customerid@myconv","phx_leave",{}]'
         )
 
+    def test_audio_chunk(self):
+        client = Conversation("customerid", "myconv", "john_test")
+        client.join()
+        client.receive(join_successful)
+        frame = client.send_audio_chunk(b"\x01\x02\x03")
+        self.assertEqual(
+            frame,
+            b"\x00\x01\x01\x1e\x0b12conversation:customerid@myconvaudio_chunk\x01\x02\x03",
+        )
+        # refs keep increasing, whatever their length
+        client._request_id = 9
+        header, chunk = client.send_audio_chunk_vectored(b"\x01\x02\x03")
+        self.assertIsInstance(header, memoryview)
+        self.assertEqual(
+            bytes(header),
+            b"\x00\x01\x02\x1e\x0b110conversation:customerid@myconvaudio_chunk",
+        )
+        self.assertEqual(chunk, b"\x01\x02\x03")
+
+    def test_frame_audio_into(self):
+        client = Conversation("customerid", "myconv", "john_test")
+        buffer = bytearray(client.max_frame_size(3))
+        with self.assertRaises(ProtocolError):
+            client.frame_audio_into(buffer, b"\x01\x02\x03")
+        client.join()
+        client.receive(join_successful)
+        length = client.frame_audio_into(buffer, b"\x01\x02\x03")
+        self.assertEqual(
+            buffer[:length],
+            b"\x00\x01\x01\x1e\x0b12conversation:customerid@myconvaudio_chunk\x01\x02\x03",
+        )
+        with self.assertRaises(ValueError):
+            client.frame_audio_into(bytearray(10), b"\x01\x02\x03")
+        # The ref was not consumed by the failed attempt
+        self.assertEqual(client.request_id, "3")
+
+    def test_frame_buffer_pool(self):
+        client = Conversation("customerid", "myconv", "john_test")
+        client.join()
+        client.receive(join_successful)
+        pool = FrameBufferPool.for_conversation(client, "g711a", chunk_duration=0.06)
+        self.assertEqual(pool.chunk_size, 480)
+        buffers = pool._buffers.copy()
+        with pool.frame(client, bytes(480)) as frame:
+            self.assertEqual(len(frame), 480 + 48)
+            self.assertEqual(bytes(frame[-481:-480]), b"k")
+        # The buffers were reused
+        self.assertEqual(sorted(map(id, pool._buffers)), sorted(map(id, buffers)))
+
+    def test_send_audio_chunks(self):
+        client = Conversation("customerid", "myconv", "john_test")
+        with self.assertRaises(ProtocolError):
+            client.send_audio_chunks([b"\x01"])
+        client.join()
+        client.receive(join_successful)
+        reference = Conversation("customerid", "myconv", "john_test")
+        reference.join()
+        reference.receive(join_successful)
+        audio = bytes(range(25))
+        # Cross the 1 to 2 digit ref boundary
+        frames = list(client.send_audio_chunks(audio, chunk_size=2))
+        self.assertEqual(len(frames), 13)
+        self.assertEqual(
+            frames,
+            [reference.send_audio_chunk(audio[i : i + 2]) for i in range(0, 25, 2)],
+        )
+        frames = list(client.send_audio_chunks(iter([b"\x01", b"\x02"])))
+        self.assertEqual(
+            frames,
+            [reference.send_audio_chunk(b"\x01"), reference.send_audio_chunk(b"\x02")],
+        )
+        self.assertEqual(client.request_id, reference.request_id)
+        with self.assertRaises(ValueError):
+            client.send_audio_chunks(audio)
+
+    def test_parse_envelope(self):
+        message = json.dumps(words_decoded, indent=1)
+        join_ref, ref, topic, event, offset = parse_envelope(message)
+        self.assertEqual(
+            (join_ref, ref, topic, event),
+            ("1", 2, "conversation:rtxm@test", "audio_words_decoded"),
+        )
+        self.assertEqual(json.loads(message[offset:-1]), words_decoded[4])
+        self.assertEqual(
+            parse_envelope(r'[null,null,"phoenix","phx_\"reply",{}]')[:4],
+            (None, None, "phoenix", 'phx_"reply'),
+        )
+        self.assertIsNone(parse_envelope('{"event": "OPENED"}'))
+
+    def test_event_filter(self):
+        client = Conversation(
+            "rtxm",
+            "test",
+            "Alice",
+            event_filter=["audio_segment_decoded", EntityRecognized],
+        )
+        client.join()
+        joined = client.receive(
+            join_successful.replace("customerid@myconv", "rtxm@test")
+        )
+        self.assertIsInstance(joined, Ok)
+        self.assertFalse(client.left)
+        self.assertIsNone(client.receive_filtered(json.dumps(words_decoded)))
+        self.assertIsInstance(
+            client.receive_filtered(json.dumps(segment_decoded)), AudioSegmentDecoded
+        )
+        self.assertIsInstance(
+            client.receive_filtered(json.dumps(entity_number_found).encode("utf-8")),
+            EntityRecognized,
+        )
+        # receive() doesn't filter
+        self.assertIsInstance(
+            client.receive(json.dumps(words_decoded)), AudioWordsDecoded
+        )
+        # State transitions are still tracked
+        client.receive_filtered(
+            json.dumps(
+                [
+                    None,
+                    None,
+                    "conversation:rtxm@test",
+                    "speaker_left",
+                    {"speaker": "Alice", "timestamp": 1613129073523},
+                ]
+            )
+        )
+        self.assertTrue(client.left)
+
+    def test_lazy(self):
+        client = Conversation("rtxm", "test", "Alice", lazy=True)
+        client.join()
+        client.receive(join_successful.replace("customerid@myconv", "rtxm@test"))
+        self.assertFalse(client.left)
+        event = client.receive(json.dumps(entity_number_found, indent=2))
+        self.assertIsInstance(event, EntityRecognized)
+        self.assertEqual(event.entity_name, "cardinal_number")
+        self.assertEqual(event.ref, 2)
+        # Payload not decoded yet
+        self.assertIsInstance(event._raw, str)
+        self.assertEqual(event.source, "trois")
+        self.assertFalse(hasattr(event, "_raw"))
+        self.assertEqual(event.display, "3")
+        self.assertFalse(hasattr(event, "missing"))
+
     def receive_wrong_topic(self):
         client = Conversation("customerid", "unrelated_topic", "john_test")
         with self.assertRaises(AssertionError):
@@ -1,17 +1,24 @@
+import re
+from copy import deepcopy
 from unittest import TestCase
 
+from uhlive.stream.conversation import events
 from uhlive.stream.conversation.events import (
     AudioSegmentDecoded,
     AudioWordsDecoded,
     EntityRecognized,
     Event,
+    RelationRecognized,
     SpeakerJoined,
     SpeakerLeft,
+    Unknown,
+    register_event,
 )
 
 from .conversation_events import (
     entity_location_city_found,
     entity_number_found,
+    relation_found,
     segment_decoded,
     speaker_joined,
     speaker_left,
@@ -120,6 +127,22 @@ class TestConversationEventReceived(TestCase):
         first = event.components[0]
         for attr in ["start", "end", "length", "value", "confidence"]:
             self.assertEqual(getattr(first, attr), first[attr])
+        # Memoized
+        self.assertIs(event.components, event.components)
+
+    def test_word_columns(self):
+        event = Event.from_message(words_decoded)
+        columns = event.columns
+        self.assertIs(event.columns, columns)
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns.starts.typecode, "q")
+        self.assertEqual(columns.confidences.typecode, "d")
+        self.assertEqual(list(columns.starts), [w.start for w in event.components])
+        self.assertEqual(list(columns.ends), [w.end for w in event.components])
+        self.assertEqual(list(columns.lengths), [330, 210, 150, 300])
+        self.assertEqual(list(columns.confidences), [1.0, 1.0, 1.0, 1.0])
+        self.assertEqual(columns.values, ("bonjour", "comment", "ça", "va"))
+        self.assertEqual(memoryview(columns.starts).itemsize, 8)
 
     def test_speaker_joined(self):
         event = Event.from_message(speaker_joined)
@@ -129,9 +152,112 @@ class TestConversationEventReceived(TestCase):
         self.assertTrue(event.interim_results)
         self.assertEqual(event.timestamp, 1613129063523)
 
+    def test_compact(self):
+        for message in (words_decoded, speaker_joined, entity_number_found):
+            expected = Event.from_message(message)
+            event = Event.from_message(message)
+            event.compact()
+            self.assertFalse(hasattr(event, "__dict__"))
+            repr(event)
+            self.assertEqual(event.speaker, expected.speaker)
+        self.assertEqual(repr(event), repr(expected))
+        self.assertEqual(event.display, "3")
+        self.assertEqual(event.value, 3)
+        self.assertIsNone(event._payload.get("campaign_id"))
+
+        event = Event.from_message(words_decoded)
+        event.compact()
+        self.assertEqual(event.components, Event.from_message(words_decoded).components)
+        self.assertEqual(
+            (event.start, event.end, event.id), (1760715687595, 1760715688585, "0")
+        )
+
+        # the values built before compaction are dropped, and rebuilt on demand
+        event = Event.from_message(words_decoded)
+        components = event.components
+        columns = event.columns
+        event.compact()
+        self.assertFalse(hasattr(event, "_components"))
+        self.assertFalse(hasattr(event, "_columns"))
+        self.assertEqual(event.components, components)
+        self.assertEqual(list(event.columns.starts), list(columns.starts))
+
+        event = Event.from_message(words_decoded)
+        event.compact(keep_extra=True)
+        self.assertEqual(event._payload["campaign_id"], "titi")
+        self.assertIn("meta", event._payload)
+
     def test_instantiate_ner_event(self):
         event = Event.from_message(entity_location_city_found)
         self.assertIsInstance(event, EntityRecognized)
         self.assertEqual(event.entity_name, "location_city")
         self.assertEqual(event.source, "lyon")
         self.assertEqual(event.confidence, 0.99)
+
+
+class TestEventRegistry(TestCase):
+    def setUp(self):
+        event_map = events.EVENT_MAP.copy()
+        prefixes = events.EVENT_PREFIXES.copy()
+
+        def restore():
+            events.EVENT_MAP = event_map
+            events.EVENT_PREFIXES = prefixes
+            events._DISPATCH.clear()
+
+        self.addCleanup(restore)
+
+    def test_dispatch_cache(self):
+        self.assertEqual(
+            events.dispatch("entity_cardinal_number_recognized"),
+            (EntityRecognized, "cardinal_number"),
+        )
+        self.assertIn("entity_cardinal_number_recognized", events._DISPATCH)
+        self.assertEqual(events.dispatch("speaker_left"), (SpeakerLeft, None))
+        self.assertEqual(events.dispatch("speaker_muted"), (Unknown, None))
+
+    def test_unexpected_names(self):
+        with self.assertRaises(ValueError):
+            Event.from_message(
+                ["1", 2, "conversation:rtxm@test", "relation_found", {"start": 10}]
+            )
+        message = deepcopy(relation_found)
+        message[4]["components"][1]["class"] = "tags_set"
+        event = Event.from_message(message)
+        self.assertIsInstance(event, RelationRecognized)
+        self.assertRaises(ValueError, getattr, event, "components")
+
+    def test_register(self):
+        message = [
+            "1",
+            2,
+            "conversation:rtxm@test",
+            "speaker_muted",
+            {"speaker": "Alice"},
+        ]
+        self.assertIsInstance(Event.from_message(message), Unknown)
+
+        @register_event("speaker_muted")
+        class SpeakerMuted(Event):
+            __slots__ = ()
+
+        event = Event.from_message(message)
+        self.assertIsInstance(event, SpeakerMuted)
+        self.assertEqual(event.speaker, "Alice")
+
+    def test_register_prefix(self):
+        class Emotion(events.TimeScopedEvent):
+            __slots__ = ("_name",)
+            name_pattern = re.compile(r"emotion_(\w+)_detected")
+
+            def __init__(self, join_ref, ref, conversation, event, payload):
+                self._name = events.dispatch(event)[1]
+                super().__init__(join_ref, ref, conversation, event, payload)
+
+        register_event("emotion_", Emotion, prefix=True)
+        event = Event.from_message(
+            ["1", 2, "conversation:rtxm@test", "emotion_joy_detected", {"start": 10}]
+        )
+        self.assertIsInstance(event, Emotion)
+        self.assertEqual(event._name, "joy")
+        self.assertEqual(event.start, 10)
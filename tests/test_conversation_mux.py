@@ -0,0 +1,104 @@
+import json
+from unittest import TestCase
+
+from uhlive.stream.conversation import (
+    AudioSegmentDecoded,
+    ConversationMux,
+    Ok,
+    ProtocolError,
+)
+
+from .conversation_events import segment_decoded
+
+
+def reply(conversation, ref):
+    return json.dumps(
+        [
+            conversation.join_ref,
+            ref,
+            conversation.topic,
+            "phx_reply",
+            {"status": "ok", "response": {}},
+        ]
+    )
+
+
+def event_for(conversation, message):
+    return json.dumps([None, None, conversation.topic] + message[3:])
+
+
+class TestConversationMux(TestCase):
+    def setUp(self):
+        self.mux = ConversationMux()
+        self.alice = self.mux.conversation("customerid", "conv1", "alice")
+        self.bob = self.mux.conversation("customerid", "conv2", "bob", lazy=True)
+
+    def join(self, conversation):
+        frame = json.loads(conversation.join(readonly=True))
+        self.assertEqual(frame[0], frame[1])
+        routed, event = self.mux.receive(reply(conversation, frame[1]))
+        self.assertIs(routed, conversation)
+        self.assertIsInstance(event, Ok)
+        self.assertFalse(conversation.left)
+
+    def test_join_refs(self):
+        self.assertEqual(len(self.mux), 2)
+        self.assertNotEqual(self.alice.join_ref, self.bob.join_ref)
+        self.join(self.alice)
+        self.assertTrue(self.bob.left)
+        self.join(self.bob)
+        self.assertEqual(list(self.mux), [self.alice, self.bob])
+
+    def test_routing(self):
+        self.join(self.alice)
+        self.join(self.bob)
+        for conversation in (self.alice, self.bob):
+            routed, event = self.mux.receive(
+                event_for(conversation, segment_decoded).encode("utf-8")
+            )
+            self.assertIs(routed, conversation)
+            self.assertIsInstance(event, AudioSegmentDecoded)
+            self.assertEqual(event.conversation, conversation.topic)
+            self.assertEqual(event.value, segment_decoded[4]["value"])
+
+    def test_audio_header(self):
+        self.join(self.bob)
+        frame = self.bob.send_audio_chunk(b"\x01")
+        self.assertEqual(frame[1], 1)
+        self.assertEqual(frame[5:6], self.bob.join_ref.encode("ascii"))
+
+    def test_errors(self):
+        with self.assertRaises(ProtocolError):
+            self.mux.conversation("customerid", "conv1", "alice")
+        carol = self.mux.conversation("customerid", "conv3", "carol")
+        self.assertEqual(carol.join_ref, str(int(self.bob.join_ref) + 1))
+        self.join(self.alice)
+        with self.assertRaises(ProtocolError):
+            self.mux.remove(self.alice)
+        self.mux.remove(self.bob)
+        self.assertIsNone(self.mux.get(self.bob.topic))
+        self.assertIs(self.mux.get(self.alice.topic), self.alice)
+
+    def test_unknown_topic(self):
+        self.assertEqual(
+            self.mux.receive(
+                json.dumps([None, None, "conversation:other@conv", "phx_close", {}])
+            ),
+            (None, None),
+        )
+        self.join(self.bob)
+        self.bob.leave()
+        left = [None, None, self.bob.topic, "speaker_left", {"speaker": "bob"}]
+        self.mux.receive(json.dumps(left))
+        self.assertTrue(self.bob.left)
+        self.mux.remove(self.bob)
+        # late messages for the removed conversation
+        self.assertEqual(
+            self.mux.receive(
+                json.dumps([self.bob.join_ref, None, self.bob.topic, "phx_close", {}])
+            ),
+            (None, None),
+        )
+        self.assertEqual(
+            self.mux.receive(event_for(self.bob, segment_decoded)), (None, None)
+        )
@@ -0,0 +1,49 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from uhlive.stream.conversation import EntityStore, Event, RelationRecognized
+
+from .conversation_events import (
+    entity_location_city_found,
+    entity_number_found,
+    relation_found,
+    words_decoded,
+)
+
+
+class TestEntityStore(TestCase):
+    def setUp(self):
+        self.store = EntityStore(max_entities=2)
+        self.number = Event.from_message(entity_number_found)
+        self.city = Event.from_message(entity_location_city_found)
+        self.assertTrue(self.store.add(self.number))
+        self.assertTrue(self.store.add(self.city))
+        self.assertFalse(self.store.add(Event.from_message(words_decoded)))
+
+    def test_resolve(self):
+        relation = Event.from_message(relation_found)
+        self.assertIsInstance(relation, RelationRecognized)
+        self.assertEqual(relation.relation_name, "number_of_location")
+        refs = relation.components
+        self.assertEqual(
+            [(ref.kind, ref.id) for ref in refs],
+            [
+                ("cardinal_number", "sd3yeitr-9260"),
+                ("location_city", "Entity.LocationCity-8560"),
+                ("location_city", "Entity.LocationCity-1"),
+            ],
+        )
+        self.assertIs(self.store.resolve(refs[0]), self.number)
+        self.assertEqual(
+            self.store.resolve_relation(relation), [self.number, self.city, None]
+        )
+        self.assertIs(self.store.get("Alice", "Entity.LocationCity-8560"), self.city)
+        self.assertIsNone(self.store.get("Bob", "Entity.LocationCity-8560"))
+
+    def test_eviction(self):
+        message = deepcopy(entity_number_found)
+        message[4]["id"] = "other"
+        self.store.add(Event.from_message(message))
+        self.assertEqual(len(self.store), 2)
+        self.assertIsNone(self.store.get("Alice", "sd3yeitr-9260"))
+        self.assertIs(self.store.get("Alice", "Entity.LocationCity-8560"), self.city)
@@ -0,0 +1,68 @@
+import json
+from unittest import TestCase
+
+from uhlive.stream.conversation import ConversationMux, Heartbeat, Ok
+
+from .conversation_events import join_successful
+from .fake_clock import FakeClock
+
+
+def heartbeat_reply(ref):
+    return json.dumps(
+        [None, ref, "phoenix", "phx_reply", {"status": "ok", "response": {}}]
+    )
+
+
+class TestHeartbeat(TestCase):
+    def setUp(self):
+        self.clock = FakeClock(now=100.0)
+        self.heartbeat = Heartbeat(interval=30, timeout=10, clock=self.clock)
+
+    def test_schedule(self):
+        hb = self.heartbeat
+        self.assertEqual(hb.next_due, 130)
+        self.assertFalse(hb.due())
+        self.assertEqual(hb.delay(), 30)
+        self.clock.now = 131
+        self.assertTrue(hb.due())
+        self.assertEqual(hb.delay(), 0)
+        frame = hb.beat()
+        self.assertEqual(frame, '[null,"1","phoenix","heartbeat",{}]')
+        self.assertEqual(hb.next_due, 161)
+        self.assertTrue(hb.pending)
+
+    def test_reply(self):
+        hb = self.heartbeat
+        hb.beat()
+        self.clock.now = 100.25
+        self.assertFalse(hb.acknowledge(json.loads(heartbeat_reply("2"))))
+        self.assertTrue(hb.acknowledge(json.loads(heartbeat_reply("1"))))
+        self.assertFalse(hb.pending)
+        self.assertEqual(hb.latency, 0.25)
+        self.clock.now = 200
+        self.assertFalse(hb.expired())
+
+    def test_expired(self):
+        hb = self.heartbeat
+        hb.beat()
+        self.clock.now = 109
+        self.assertFalse(hb.expired())
+        self.clock.now = 110
+        self.assertTrue(hb.expired())
+
+    def test_conversation(self):
+        mux = ConversationMux()
+        conversation = mux.conversation("customerid", "myconv", "john_test")
+        conversation.join()
+        self.assertIsInstance(conversation.receive(join_successful), Ok)
+        ref = json.loads(conversation.heartbeat.beat())[1]
+        reply = conversation.receive(heartbeat_reply(ref))
+        self.assertIsInstance(reply, Ok)
+        self.assertEqual(reply.conversation, "phoenix")
+        self.assertFalse(conversation.heartbeat.pending)
+        ref = json.loads(conversation.heartbeat.beat())[1]
+        self.assertIsNone(conversation.receive_filtered(heartbeat_reply(ref)))
+        self.assertFalse(conversation.heartbeat.pending)
+        ref = json.loads(mux.heartbeat.beat())[1]
+        self.assertEqual(mux.receive(heartbeat_reply(ref)), (None, None))
+        self.assertFalse(mux.heartbeat.pending)
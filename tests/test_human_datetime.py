@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from uhlive.stream.conversation import human_datetime as hd
+from uhlive.stream.conversation.human_datetime import TimestampFormatter
+
+
+class TestTimestampFormatter(unittest.TestCase):
+    def reference(self, timestamp, tz):
+        return datetime.fromtimestamp(timestamp / 1000.0, tz).isoformat(sep=" ")
+
+    def test_same_output_as_isoformat(self):
+        for tz in (timezone.utc, timezone(timedelta(hours=5, minutes=30))):
+            fmt = TimestampFormatter(tz)
+            for timestamp in (
+                1_700_000_000_000,
+                1_700_000_000_001,
+                1_700_000_000_999,
+                1_700_000_001_500,
+                0,
+                -1,
+            ):
+                self.assertEqual(fmt(timestamp), self.reference(timestamp, tz))
+
+    def test_dst_change(self):
+        paris = ZoneInfo("Europe/Paris")
+        fmt = TimestampFormatter("Europe/Paris")
+        # 2023-03-26 01:59:59 UTC+1 -> 03:00:00 UTC+2
+        start = 1_679_792_399_000
+        for timestamp in range(start - 500, start + 1500, 250):
+            self.assertEqual(fmt(timestamp), self.reference(timestamp, paris))
+
+    def test_float_timestamp(self):
+        fmt = TimestampFormatter(timezone.utc)
+        self.assertEqual(
+            fmt(1_700_000_000_123.5), self.reference(1_700_000_000_123.5, timezone.utc)
+        )
+
+    def test_local_tz_is_lazy(self):
+        fmt = TimestampFormatter()
+        self.assertIsNone(fmt._tz)
+        self.assertEqual(fmt.tz, hd.local_tz)
+        self.assertEqual(
+            fmt(1_700_000_000_042), self.reference(1_700_000_000_042, hd.local_tz)
+        )
+
+    def test_set_timezone(self):
+        try:
+            hd.set_timezone(timezone.utc)
+            self.assertEqual(
+                hd.human_datetime(1_700_000_000_042), "2023-11-14 22:13:20.042000+00:00"
+            )
+        finally:
+            hd.set_timezone(None)
+
+    def test_offset_with_seconds(self):
+        # Paris local mean time was UTC+00:09:21
+        fmt = TimestampFormatter("Europe/Paris")
+        paris = ZoneInfo("Europe/Paris")
+        for timestamp in (-2_500_000_000_000, -2_500_000_000_500):
+            self.assertEqual(fmt(timestamp), self.reference(timestamp, paris))
@@ -0,0 +1,79 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from uhlive.stream.conversation import Event, InterimCoalescer
+
+from .conversation_events import segment_decoded, speaker_left, words_decoded
+
+
+def hypothesis(*values, message=words_decoded, speaker="Alice", id="0", confidence=1):
+    message = deepcopy(message)
+    payload = message[4]
+    payload["speaker"] = speaker
+    payload["id"] = id
+    payload["components"] = [
+        {
+            "start": 100 * i,
+            "end": 100 * (i + 1),
+            "length": 100,
+            "value": value,
+            "confidence": confidence,
+        }
+        for i, value in enumerate(values)
+    ]
+    return Event.from_message(message)
+
+
+class TestInterimCoalescer(TestCase):
+    def test_diffs(self):
+        coalescer = InterimCoalescer()
+        diff = coalescer.feed(hypothesis("bonjour"))
+        self.assertEqual((diff.keep, [w.value for w in diff.words]), (0, ["bonjour"]))
+        self.assertFalse(diff.final)
+        current = diff.apply([])
+
+        diff = coalescer.feed(hypothesis("bonjour", "comment", "sa"))
+        self.assertEqual(
+            (diff.keep, [w.value for w in diff.words]), (1, ["comment", "sa"])
+        )
+        current = diff.apply(current)
+
+        # No change, nothing to send
+        self.assertIsNone(coalescer.feed(hypothesis("bonjour", "comment", "sa")))
+
+        diff = coalescer.feed(hypothesis("bonjour", "comment", "ça", "va"))
+        self.assertEqual((diff.keep, [w.value for w in diff.words]), (2, ["ça", "va"]))
+        current = diff.apply(current)
+
+        diff = coalescer.feed(
+            hypothesis("bonjour", "comment", "ça", "va", message=segment_decoded)
+        )
+        self.assertTrue(diff.final)
+        self.assertEqual((diff.keep, diff.words), (4, []))
+        self.assertEqual(
+            [w.value for w in diff.apply(current)], ["bonjour", "comment", "ça", "va"]
+        )
+        self.assertEqual(len(coalescer), 0)
+        self.assertEqual(diff.to_dict()["keep"], 4)
+
+    def test_utterances(self):
+        coalescer = InterimCoalescer(max_utterances=2)
+        coalescer.feed(hypothesis("oui", id="1"))
+        coalescer.feed(hypothesis("non", id="2"))
+        coalescer.feed(hypothesis("salut", speaker="robin", id="1"))
+        self.assertEqual(len(coalescer), 2)
+        # Oldest utterance was evicted
+        diff = coalescer.feed(hypothesis("oui", id="1"))
+        self.assertEqual(diff.keep, 0)
+        coalescer.feed(Event.from_message(speaker_left))
+        self.assertEqual(len(coalescer), 1)
+        self.assertIsNone(coalescer.feed(None))
+
+    def test_confidence_change(self):
+        coalescer = InterimCoalescer()
+        coalescer.feed(hypothesis("bonjour", "comment", confidence=0.6))
+        self.assertIsNone(
+            coalescer.feed(hypothesis("bonjour", "comment", confidence=0.9))
+        )
+        diff = coalescer.feed(hypothesis("bonjour", "comment", "ça", confidence=0.8))
+        self.assertEqual((diff.keep, [w.value for w in diff.words]), (2, ["ça"]))
@@ -1,8 +1,21 @@
 from unittest import TestCase
 
-from uhlive.stream.recognition import Opened, ProtocolError, Recognizer
+from uhlive.stream.recognition import (
+    MethodFailed,
+    Opened,
+    PipelineError,
+    ProtocolError,
+    Recognizer,
+)
 
-from .recog_events import recognition_complete, recognition_in_progress, session_opened
+from .recog_events import (
+    grammar_defined,
+    method_failed,
+    params_set,
+    recognition_complete,
+    recognition_in_progress,
+    session_opened,
+)
 
 
 class TestConnection(TestCase):
@@ -92,3 +105,49 @@ class TestConnection(TestCase):
         client.receive(recognition_complete)
         # Now we can start another recognition process
         client.recognize("builtin:speech/transcribe")
+
+
+class TestPipelining(TestCase):
+    def test_serial_by_default(self):
+        client = Recognizer()
+        client.open()
+        with self.assertRaises(ProtocolError):
+            client.set_params(no_input_timeout=5000)
+
+    def test_session_setup(self):
+        client = Recognizer(pipelining=True)
+        client.open()
+        client.define_grammar("speech/keywords?alternatives=oui|non", "yesno")
+        client.set_params(no_input_timeout=5000)
+        client.recognize("session:yesno")
+        # can't open twice, even before the server confirms
+        with self.assertRaises(ProtocolError):
+            client.open()
+        with self.assertRaises(ProtocolError):
+            client.get_params()
+        self.assertEqual(client.in_flight, 4)
+        self.assertIsInstance(client.receive(session_opened), Opened)
+        self.assertEqual(client.channel_id, "testuie46e4ui6")
+        client.receive(grammar_defined)
+        client.receive(params_set)
+        client.receive(recognition_in_progress)
+        self.assertEqual(client.in_flight, 0)
+        # asynchronous events are not replies
+        client.receive(recognition_complete)
+        self.assertEqual(client.in_flight, 0)
+        client.get_params()
+        self.assertEqual(client.in_flight, 1)
+
+    def test_failure(self):
+        client = Recognizer(pipelining=True)
+        client.receive(session_opened)
+        client.define_grammar("speech/keywords?alternatives=oui|non", "yesno")
+        client.set_params(no_input_timeout=5000)
+        client.receive(grammar_defined)
+        with self.assertRaises(PipelineError) as cm:
+            client.receive(method_failed)
+        error = cm.exception
+        self.assertEqual(error.command.command, "SET-PARAMS")
+        self.assertEqual(error.command.request_id, 2)
+        self.assertIsInstance(error.event, MethodFailed)
+        self.assertEqual(client.in_flight, 0)
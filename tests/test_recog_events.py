@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import TestCase
 
 from uhlive.stream.recognition import events
@@ -62,6 +62,24 @@ class TestEventDeserialization(TestCase):
             result.asr.transcript, "attendez alors voilà baissé trois cent cinq f z"
         )
         self.assertEqual(result.asr.start, datetime(2021, 8, 20, 10, 5, 34, 909000))
+        self.assertEqual(result.asr.start_ms, 1629453934909)
+        self.assertIs(result.asr.start, result.asr.start)
+        self.assertIs(result.asr.end, result.asr.end)
+        self.assertEqual(
+            result.asr.end - result.asr.start,
+            timedelta(milliseconds=result.asr.end_ms - result.asr.start_ms),
+        )
+        self.assertEqual(result.alternatives, [])
+
+    def test_lazy_body(self):
+        event = events.deserialize(recognition_complete)
+        self.assertFalse(hasattr(event, "_body"))
+        self.assertFalse(hasattr(event, "_completion_cause"))
+        result = event.body
+        self.assertIs(event.body, result)
+        self.assertFalse(hasattr(result, "_asr"))
+        self.assertIs(result.asr, result.asr)
+        self.assertIs(result.nlu, result.nlu)
 
     def test_recognition_complete_nbests(self):
         event = events.deserialize(recognition_complete_nbests)
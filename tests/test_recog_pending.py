@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import Future
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from uhlive.stream.recognition import (
+    GrammarDefined,
+    ParamsSet,
+    PendingRequests,
+    RecognitionComplete,
+    RecognitionInProgress,
+    Recognizer,
+    RequestFailed,
+    events,
+)
+
+from .fake_clock import FakeClock
+from .recog_events import (
+    grammar_defined,
+    method_failed,
+    params_set,
+    recognition_complete,
+    recognition_in_progress,
+    session_opened,
+)
+
+
+class TestPendingRequests(TestCase):
+    def setUp(self):
+        self.clock = FakeClock(now=0.0)
+        self.pending = PendingRequests(clock=self.clock)
+
+    def test_last_request_id(self):
+        client = Recognizer()
+        client.receive(session_opened)
+        client.set_params(no_input_timeout=5000)
+        self.assertEqual(client.last_request_id, 1)
+        client.define_grammar("speech/keywords?alternatives=oui|non", "yesno")
+        self.assertEqual(client.last_request_id, 2)
+
+    def test_out_of_order_replies(self):
+        grammar = Future()
+        params = Future()
+        self.pending.add(1, grammar)
+        self.pending.add(2, params)
+        self.assertEqual(len(self.pending), 2)
+        self.assertIsNone(self.pending.dispatch(events.deserialize(params_set)))
+        self.assertIsInstance(params.result(0), ParamsSet)
+        self.assertFalse(grammar.done())
+        self.assertIsNone(self.pending.dispatch(events.deserialize(grammar_defined)))
+        self.assertIsInstance(grammar.result(0), GrammarDefined)
+        self.assertEqual(len(self.pending), 0)
+        # not waited for
+        event = events.deserialize(params_set)
+        self.assertIs(self.pending.dispatch(event), event)
+
+    def test_failure(self):
+        received = []
+        self.pending.add(2, received.append)
+        self.pending.dispatch(events.deserialize(method_failed))
+        (error,) = received
+        self.assertIsInstance(error, RequestFailed)
+        self.assertIsInstance(error.event, events.MethodFailed)
+
+    def test_async_events(self):
+        reply = Future()
+        completions = []
+        self.pending.add(3, reply)
+        self.pending.on_events(3, completions.append)
+        complete = events.deserialize(recognition_complete)
+        self.assertIsNone(self.pending.dispatch(complete))
+        # the asynchronous event doesn't resolve the reply
+        self.assertFalse(reply.done())
+        self.pending.dispatch(events.deserialize(recognition_in_progress))
+        self.assertIsInstance(reply.result(0), RecognitionInProgress)
+        self.assertEqual(completions, [complete])
+        # handler is forgotten after completion
+        self.assertIs(self.pending.dispatch(complete), complete)
+
+    def test_deadlines(self):
+        first = Future()
+        second = Future()
+        self.pending.add(1, first, timeout=5)
+        self.pending.add(2, second, timeout=2)
+        self.pending.add(3, Future())
+        self.assertEqual(self.pending.next_deadline, 2)
+        self.pending.dispatch(events.deserialize(params_set))
+        self.assertEqual(self.pending.next_deadline, 5)
+        self.clock.now = 4
+        self.assertEqual(self.pending.expire(), [])
+        self.clock.now = 5
+        self.assertEqual(self.pending.expire(), [1])
+        with self.assertRaises(TimeoutError):
+            first.result(0)
+        self.assertIsNone(self.pending.next_deadline)
+        self.assertIn(3, self.pending)
+
+    def test_fail_all(self):
+        waiter = Future()
+        self.pending.add(1, waiter, timeout=1)
+        self.pending.fail_all(ConnectionError("lost"))
+        with self.assertRaises(ConnectionError):
+            waiter.result(0)
+        self.assertEqual(len(self.pending), 0)
+
+
+class TestPendingRequestsAsyncio(IsolatedAsyncioTestCase):
+    async def test_futures(self):
+        pending = PendingRequests()
+        loop = asyncio.get_running_loop()
+        reply = loop.create_future()
+        completion = loop.create_future()
+        pending.add(3, reply)
+        pending.on_events(3, completion.set_result)
+        cancelled = loop.create_future()
+        pending.add(1, cancelled)
+        cancelled.cancel()
+        pending.dispatch(events.deserialize(grammar_defined))
+        pending.dispatch(events.deserialize(recognition_in_progress))
+        pending.dispatch(events.deserialize(recognition_complete))
+        self.assertIsInstance(await reply, RecognitionInProgress)
+        self.assertIsInstance(await completion, RecognitionComplete)
@@ -0,0 +1,166 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from uhlive.stream.recognition import (
+    DefaultParams,
+    RecognitionInProgress,
+    RecognizerPool,
+)
+
+REPLIES = {
+    "OPEN": "OPENED",
+    "SET-PARAMS": "PARAMS-SET",
+    "GET-PARAMS": "DEFAULT-PARAMS",
+    "DEFINE-GRAMMAR": "GRAMMAR-DEFINED",
+    "RECOGNIZE": "RECOGNITION-IN-PROGRESS",
+    "CLOSE": "CLOSED",
+}
+
+
+class FakeH2B:
+    """In-process H2B server connection."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.mute = False
+        self.incoming = asyncio.Queue()
+        self.commands = []
+        self.closed = False
+
+    async def send_str(self, data):
+        command = json.loads(data)
+        self.commands.append(command["command"])
+        if self.mute:
+            return
+        if command["command"] == self.fail_on:
+            event = "METHOD-FAILED"
+        else:
+            event = REPLIES[command["command"]]
+        self.incoming.put_nowait(
+            json.dumps(
+                {
+                    "event": event,
+                    "request_id": command["request_id"],
+                    "channel_id": "chan",
+                    "headers": {},
+                    "completion_cause": None,
+                    "completion_reason": None,
+                    "body": None,
+                }
+            )
+        )
+
+    async def send_bytes(self, data):
+        pass
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def close(self):
+        self.closed = True
+        self.incoming.put_nowait(None)
+
+
+class TestRecognizerPool(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.connections = []
+        self.failures = []
+
+    async def connect(self):
+        transport = FakeH2B(self.failures.pop() if self.failures else None)
+        self.connections.append(transport)
+        return transport
+
+    def pool(self, **kwargs):
+        return RecognizerPool(
+            self.connect,
+            size=2,
+            params={"speech_language": "fr"},
+            grammars={"yesno": "speech/keywords?alternatives=oui|non", "num": "number"},
+            **{"retry_delay": 0, **kwargs},
+        )
+
+    async def wait_ready(self, pool, count):
+        while pool.ready < count:
+            await asyncio.sleep(0)
+
+    async def test_prewarmed(self):
+        async with self.pool() as pool:
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            self.assertEqual(
+                self.connections[0].commands,
+                ["OPEN", "SET-PARAMS", "DEFINE-GRAMMAR", "DEFINE-GRAMMAR"],
+            )
+            session = await pool.acquire(timeout=1)
+            # not checked by default: no round trip
+            self.assertEqual(
+                session.transport.commands,
+                ["OPEN", "SET-PARAMS", "DEFINE-GRAMMAR", "DEFINE-GRAMMAR"],
+            )
+            self.assertEqual(session.recognizer.in_flight, 0)
+            await session.send(session.recognizer.recognize("session:yesno"))
+            self.assertIsInstance(await session.receive(), RecognitionInProgress)
+            # replaced in the background
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            self.assertEqual(pool.created, 3)
+        self.assertTrue(all(c.closed for c in self.connections[1:]))
+        self.assertEqual(self.connections[1].commands[-1], "CLOSE")
+        self.assertFalse(session.transport.closed)
+
+    async def test_setup_failure_is_retried(self):
+        self.failures = ["DEFINE-GRAMMAR"]
+        async with self.pool() as pool:
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            self.assertEqual(len(self.connections), 3)
+            self.assertTrue(self.connections[0].closed)
+            self.assertIsNotNone(pool.last_error)
+
+    async def test_connect_error_is_retried(self):
+        attempts = []
+
+        async def connect():
+            attempts.append(1)
+            if len(attempts) <= 2:
+                raise OSError("Name or service not known")
+            return await self.connect()
+
+        async with RecognizerPool(connect, size=1, retry_delay=0) as pool:
+            session = await pool.acquire(timeout=1)
+            self.assertIsInstance(pool.last_error, OSError)
+            self.assertGreaterEqual(len(attempts), 3)
+            await session.close()
+
+    async def test_idle_check(self):
+        async with self.pool(check_interval=0.01) as pool:
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            dead = self.connections[0]
+            dead.fail_on = "GET-PARAMS"
+            while pool.discarded == 0:
+                await asyncio.sleep(0.005)
+            self.assertTrue(dead.closed)
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            self.assertIn("GET-PARAMS", self.connections[1].commands)
+
+    async def test_cancelled_check_closes_session(self):
+        async with self.pool(check_on_acquire=True, check_interval=None) as pool:
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            self.connections[0].mute = True
+            with self.assertRaises(asyncio.TimeoutError):
+                await pool.acquire(timeout=0.05)
+            self.assertTrue(self.connections[0].closed)
+
+    async def test_health_check(self):
+        async with self.pool(check_on_acquire=True) as pool:
+            await asyncio.wait_for(self.wait_ready(pool, 2), 1)
+            # the server dropped the first session
+            dead = self.connections[0]
+            dead.fail_on = "GET-PARAMS"
+            session = await pool.acquire(timeout=1)
+            self.assertIsNot(session.transport, dead)
+            self.assertTrue(dead.closed)
+            self.assertEqual(pool.discarded, 1)
+            await session.send(session.recognizer.get_params())
+            self.assertIsInstance(await session.receive(), DefaultParams)
+            await session.close()
+            self.assertTrue(session.transport.closed)
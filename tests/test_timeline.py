@@ -0,0 +1,111 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from uhlive.stream.conversation import (
+    EntityRecognized,
+    Event,
+    TagsSet,
+    TimelineIndex,
+)
+
+from .conversation_events import (
+    entity_location_city_found,
+    entity_number_found,
+    segment_decoded,
+    speaker_joined,
+    words_decoded,
+)
+
+
+def event_at(message, start, end):
+    message = deepcopy(message)
+    message[4].update(start=start, end=end, length=end - start)
+    return Event.from_message(message)
+
+
+def tags_at(start, end):
+    return Event.from_message(
+        [
+            "1",
+            2,
+            "conversation:rtxm@test",
+            "tags_set",
+            {
+                "speaker": "Alice",
+                "start": start,
+                "end": end,
+                "length": end - start,
+                "lang": "fr",
+                "country": "fr",
+                "confidence": 0.8,
+                "components": [
+                    {"value": "greeting", "display": "Greeting", "confidence": 0.8}
+                ],
+            },
+        ]
+    )
+
+
+class TestTimelineIndex(TestCase):
+    def setUp(self):
+        self.timeline = TimelineIndex()
+        self.segment = event_at(segment_decoded, 8000, 10000)
+        self.city = Event.from_message(entity_location_city_found)  # 8560 - 8860
+        self.number = Event.from_message(entity_number_found)  # 9260 - 9460
+        self.tags = tags_at(0, 12000)
+        for event in (self.segment, self.city, self.number):
+            self.assertTrue(self.timeline.add(event))
+        # Late, long event
+        self.assertTrue(self.timeline.add(self.tags))
+
+    def test_ignored(self):
+        self.assertFalse(self.timeline.add(Event.from_message(words_decoded)))
+        self.assertFalse(self.timeline.add(Event.from_message(speaker_joined)))
+        self.assertFalse(self.timeline.add(None))
+        self.assertEqual(len(self.timeline), 4)
+
+    def test_at(self):
+        self.assertEqual(self.timeline.at(8600), [self.tags, self.segment, self.city])
+        self.assertEqual(
+            self.timeline.at(9460, EntityRecognized, TagsSet), [self.tags, self.number]
+        )
+        self.assertEqual(self.timeline.at(12001), [])
+
+    def test_overlapping(self):
+        self.assertEqual(
+            self.timeline.overlapping(8900, 9300, EntityRecognized), [self.number]
+        )
+        self.assertEqual(self.timeline.overlapping(8000, 8559, EntityRecognized), [])
+
+    def test_retention(self):
+        timeline = TimelineIndex(retention=1000)
+        timeline.add(self.city)
+        timeline.add(self.number)
+        self.assertEqual(len(timeline), 2)
+        timeline.add(event_at(entity_number_found, 11000, 11200))
+        self.assertEqual(len(timeline), 1)
+        self.assertEqual(timeline.at(9300), [])
+
+    def test_retention_by_end_time(self):
+        timeline = TimelineIndex(retention=60_000)
+        for i in range(10):
+            start = 1000 + i * 3000
+            timeline.add(event_at(entity_number_found, start, start + 200))
+        # started first, ends later: must not keep the short entities after it
+        long = event_at(entity_number_found, 0, 40_000)
+        timeline.add(long)
+        self.assertEqual(timeline.at(500), [long])
+        for i in range(1000):
+            start = 40_000 + i * 3000
+            timeline.add(event_at(entity_number_found, start, start + 200))
+        self.assertLessEqual(len(timeline), 21)
+        self.assertEqual(timeline.at(20_000), [])
+        index = timeline._indexes[type(long)]
+        self.assertEqual(index.max_length, 200)
+        self.assertEqual(len(index.starts), len(timeline))
+
+    def test_retention_late_event(self):
+        timeline = TimelineIndex(retention=60_000)
+        self.assertTrue(timeline.add(event_at(segment_decoded, 0, 3_600_000)))
+        self.assertFalse(timeline.add(event_at(entity_number_found, 1000, 1200)))
+        self.assertEqual(len(timeline), 1)
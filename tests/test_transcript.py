@@ -0,0 +1,105 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from uhlive.stream.conversation import Event, TranscriptBuffer
+
+from .conversation_events import segment_decoded, words_decoded
+
+
+def segment(speaker, start, *values, event=segment_decoded):
+    message = deepcopy(event)
+    payload = message[4]
+    payload["speaker"] = speaker
+    payload["components"] = [
+        {
+            "start": start + 100 * i,
+            "end": start + 100 * (i + 1),
+            "length": 100,
+            "value": value,
+            "confidence": 0.9,
+        }
+        for i, value in enumerate(values)
+    ]
+    payload["value"] = " ".join(values)
+    return Event.from_message(message)
+
+
+class TestTranscriptBuffer(TestCase):
+    def setUp(self):
+        self.transcript = TranscriptBuffer()
+        self.assertTrue(self.transcript.add(segment("Alice", 1000, "bonjour", "bob")))
+        self.assertTrue(self.transcript.add(segment("Bob", 1150, "salut", "alice")))
+        self.assertTrue(self.transcript.add(segment("Alice", 2000, "ça", "va")))
+
+    def test_ignored(self):
+        self.assertFalse(self.transcript.add(Event.from_message(words_decoded)))
+        self.assertFalse(self.transcript.add(None))
+        self.assertEqual(len(self.transcript), 6)
+        self.assertEqual(self.transcript.speakers, ["Alice", "Bob"])
+
+    def test_words(self):
+        words = self.transcript.words(1100, 1300)
+        self.assertEqual(
+            [(speaker, word.value) for speaker, word in words],
+            [("Alice", "bob"), ("Bob", "salut"), ("Bob", "alice")],
+        )
+        word = words[0][1]
+        self.assertEqual((word.start, word.end, word.length), (1100, 1200, 100))
+        self.assertAlmostEqual(word.confidence, 0.9)
+        self.assertEqual(
+            self.transcript.text(0, 10000, speaker="Alice"), "bonjour bob ça va"
+        )
+        self.assertEqual(self.transcript.text(0, 10000, speaker="Carol"), "")
+        # Bounds: overlapping words only
+        self.assertEqual(self.transcript.text(1200, 2000, speaker="Alice"), "")
+        self.assertEqual(self.transcript.text(1199, 2001, speaker="Alice"), "bob ça")
+
+    def test_text_around(self):
+        self.assertEqual(
+            self.transcript.text_around(2050, before=100, after=100), "ça va"
+        )
+
+    def test_late_segment(self):
+        self.transcript.add(segment("Alice", 1500, "euh"))
+        self.assertEqual(
+            self.transcript.text(0, 10000, speaker="Alice"), "bonjour bob euh ça va"
+        )
+        # interleaved with the words already there
+        self.transcript.add(segment("Alice", 1050, "hum", "oui"))
+        self.assertEqual(
+            self.transcript.text(0, 10000, speaker="Alice"),
+            "bonjour hum bob oui euh ça va",
+        )
+        self.assertEqual(self.transcript.text(1210, 1250, speaker="Alice"), "oui")
+
+    def test_normalized(self):
+        transcript = TranscriptBuffer(normalized=True)
+        self.assertFalse(transcript.add(segment("Alice", 1000, "trois")))
+        normalized = deepcopy(segment_decoded)
+        normalized[3] = "audio_segment_normalized"
+        self.assertTrue(transcript.add(segment("Alice", 1000, "3", event=normalized)))
+        self.assertEqual(transcript.text(0, 2000), "3")
+
+    def test_length_field_ignored(self):
+        # The queries rely on start and end: a wrong `length` must not hide a word,
+        # but the word keeps the server's `length`.
+        message = deepcopy(segment_decoded)
+        message[4]["speaker"] = "Carol"
+        message[4]["components"] = [
+            {"start": 5000, "end": 6000, "length": 0, "value": "long", "confidence": 1}
+        ]
+        transcript = TranscriptBuffer()
+        transcript.add(Event.from_message(message))
+        self.assertEqual(transcript.text(5900, 5950), "long")
+        self.assertEqual(transcript.words(5900, 5950)[0][1].length, 0)
+
+    def test_long_word(self):
+        message = deepcopy(segment_decoded)
+        message[4]["speaker"] = "Alice"
+        message[4]["components"] = [
+            {"start": 500, "end": 9000, "length": 8500, "value": "euh", "confidence": 1}
+        ]
+        self.transcript.add(Event.from_message(message))
+        self.assertEqual(self.transcript.text(2150, 2160, speaker="Alice"), "euh va")
+        self.assertEqual(self.transcript.text(8990, 10000), "euh")
+        self.assertEqual(self.transcript.text(9000, 10000), "")